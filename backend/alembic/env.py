@@ -10,7 +10,8 @@ from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from app.core.config import settings
-from app.models import Base
+from app.core.database import Base
+import app.models  # noqa: F401  (registers the models on Base.metadata)
 
 # Alembic Config object
 config = context.config
@@ -3,11 +3,13 @@ Initial database schema migration.
 
 Creates all tables with optimized indexes for the Vibe PDF Platform.
 """
+from datetime import date
 from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
+from pgvector.sqlalchemy import Vector
 
 # revision identifiers
 revision: str = '001_initial_schema'
@@ -15,42 +17,190 @@ down_revision: Union[str, None] = None
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+# Dimension of chapter content embeddings (OpenAI text-embedding-3-small)
+EMBEDDING_DIMENSIONS = 1536
+
+# Monthly user_interactions partitions created up front, starting with the
+# current month. Later months are created ahead of time by the
+# create_interaction_partitions task; rows outside the created ranges land in
+# user_interactions_default.
+INTERACTION_PARTITION_MONTHS = 12
+
+# chapters is hash-partitioned by book_id so a book's chapters share one
+# partition and each partition is vacuumed and analyzed independently.
+CHAPTER_PARTITIONS = 16
+
+# Time-ordered UUIDs (RFC 9562 version 7) keep primary key inserts appending
+# to the right-most btree page instead of splitting random pages.
+UUIDV7_FUNCTION = """
+CREATE OR REPLACE FUNCTION uuidv7() RETURNS uuid AS $$
+    SELECT encode(
+        set_bit(
+            set_bit(
+                overlay(
+                    uuid_send(gen_random_uuid())
+                    PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                    FROM 1 FOR 6
+                ),
+                52, 1
+            ),
+            53, 1
+        ),
+        'hex'
+    )::uuid
+$$ LANGUAGE sql VOLATILE
+"""
+
+ID_DEFAULT = sa.text('uuidv7()')
+
+# Indexes created after the tables, as (name, "table [USING method] (columns)")
+# pairs.
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so these
+# are built in an autocommit block at the end of upgrade().
+INDEXES: list[tuple[str, str]] = [
+    # Indexes for users
+    ('ix_users_email', 'users (email)'),
+    ('ix_users_google_id', 'users (google_id)'),
+
+    # Indexes for books (optimized for common queries). user_id- and
+    # category-only lookups are served by the composite indexes below,
+    # whose leading column matches.
+    # Partial index over the in-flight books only; terminal statuses make up
+    # most of the table and are never filtered on by status alone.
+    (
+        'ix_books_active_status',
+        "books (status, updated_at) WHERE status NOT IN ('completed', 'failed', 'cancelled')",
+    ),
+    ('ix_books_user_status', 'books (user_id, status)'),
+    ('ix_books_user_created', 'books (user_id, created_at)'),
+    # created_at grows with insertion order, so a BRIN index serves time-range
+    # scans at a fraction of the size of a btree
+    ('ix_books_created_at_brin', 'books USING brin (created_at) WITH (pages_per_range = 32)'),
+    ('ix_books_tags_gin', 'books USING gin (tags)'),
+    # Trigram index so title ILIKE '%term%' searches avoid a sequential scan
+    ('ix_books_title_trgm', 'books USING gin (title gin_trgm_ops)'),
+
+    # Indexes for chapter_content
+    # ANN index for ORDER BY content_embedding <=> :query_vec LIMIT k
+    (
+        'ix_chapter_content_embedding_hnsw',
+        'chapter_content USING hnsw (content_embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)',
+    ),
+
+    # Indexes for generation_tasks
+    ('ix_generation_tasks_book_id', 'generation_tasks (book_id)'),
+    ('ix_generation_tasks_celery_id', 'generation_tasks (celery_task_id)'),
+    # Partial index over tasks that are still queued or running
+    (
+        'ix_gen_tasks_active',
+        "generation_tasks (status, started_at) WHERE status IN ('pending', 'started', 'progress', 'retry')",
+    ),
+
+    # Indexes for reviews (book_id lookups use ix_reviews_book_user)
+    ('ix_reviews_user_id', 'reviews (user_id)'),
+    ('ix_reviews_book_user', 'reviews (book_id, user_id)'),
+    ('ix_reviews_rating', 'reviews (rating)'),
+
+    # Create composite indexes for common query patterns
+    # For recommendations: books by category with interactions
+    ('ix_books_category_status', 'books (category, status)'),
+
+    # For dashboard: books by user with status. The INCLUDE columns let the
+    # dashboard list be answered by an index-only scan.
+    (
+        'ix_books_user_status_covering',
+        "books (user_id, status) INCLUDE (title, cover_url, progress_percentage, updated_at) "
+        "WHERE status <> 'cancelled'",
+    ),
+]
+
+UNIQUE_INDEXES = {'ix_reviews_book_user'}
+
+# Indexes on the partitioned chapters and user_interactions tables. Postgres
+# cannot build these CONCURRENTLY on a partitioned parent, so they are created
+# in the migration transaction (while the tables are still empty) and
+# propagate to every partition. A unique index on a partitioned table must
+# include the partition key, which would make a (user, book, type) key
+# meaningless, so that rule lives in user_book_interaction_flags instead.
+PARTITIONED_INDEXES: list[tuple[str, str]] = [
+    # Indexes for chapters (book_id lookups use the uq_chapter_number_per_book
+    # index on (book_id, chapter_number))
+    ('ix_chapters_parent_id', 'chapters (parent_chapter_id)'),
+
+    # Indexes for user_interactions
+    # user_id lookups use ix_interactions_user_book_type
+    ('ix_user_interactions_book_id', 'user_interactions (book_id)'),
+    ('ix_interactions_user_book_type', 'user_interactions (user_id, book_id, interaction_type)'),
+    ('ix_user_interactions_type', 'user_interactions (interaction_type)'),
+    ('ix_user_interactions_created_brin', 'user_interactions USING brin (created_at) WITH (pages_per_range = 32)'),
+    ('ix_user_interactions_metadata_gin', 'user_interactions USING gin (metadata)'),
+]
+
+
+def _month_starts(first: date, count: int) -> list[date]:
+    """Return the first day of `count` consecutive months starting at `first`."""
+    months = []
+    year, month = first.year, first.month
+    for _ in range(count):
+        months.append(date(year, month, 1))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _create_enums_sql(*enums: postgresql.ENUM) -> str:
+    """Return a DO block that creates each enum type unless it already exists."""
+    statements = []
+    for enum in enums:
+        labels = ', '.join(f"'{label}'" for label in enum.enums)
+        statements.append(
+            f"    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = '{enum.name}') THEN\n"
+            f"        CREATE TYPE {enum.name} AS ENUM ({labels});\n"
+            f"    END IF;"
+        )
+    return "DO $$\nBEGIN\n" + "\n".join(statements) + "\nEND\n$$"
+
 
 def upgrade() -> None:
-    # Create enum types
+    # pgvector provides the vector type used for chapter embeddings
+    op.execute('CREATE EXTENSION IF NOT EXISTS vector')
+    # gen_random_uuid() for the ORM's server-side id defaults (built in on
+    # PG13+, pgcrypto keeps older servers working)
+    op.execute('CREATE EXTENSION IF NOT EXISTS pgcrypto')
+    # pg_trgm provides gin_trgm_ops for substring title search
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Primary key default for every table
+    op.execute(UUIDV7_FUNCTION)
+
+    # Enum types used by the columns below. They are created together in a
+    # single DO block rather than one existence check per type.
     book_status = postgresql.ENUM(
         'draft', 'outlining', 'generating_content', 'generating_infographics',
         'compiling_pdf', 'uploading_to_drive', 'completed', 'failed', 'cancelled',
         name='bookstatus',
         create_type=False
     )
-    book_status.create(op.get_bind(), checkfirst=True)
-
     input_method = postgresql.ENUM(
         'topic_description', 'structured_outline', 'existing_document',
         name='inputmethod',
         create_type=False
     )
-    input_method.create(op.get_bind(), checkfirst=True)
-
     task_status = postgresql.ENUM(
         'pending', 'started', 'progress', 'success', 'failure', 'revoked', 'retry',
         name='taskstatus',
         create_type=False
     )
-    task_status.create(op.get_bind(), checkfirst=True)
-
     interaction_type = postgresql.ENUM(
         'view', 'like', 'bookmark', 'download', 'share',
         name='interactiontype',
         create_type=False
     )
-    interaction_type.create(op.get_bind(), checkfirst=True)
+    op.execute(_create_enums_sql(book_status, input_method, task_status, interaction_type))
 
     # Create users table
     op.create_table(
         'users',
-        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=ID_DEFAULT),
         sa.Column('email', sa.String(255), nullable=False),
         sa.Column('hashed_password', sa.String(255), nullable=True),
         sa.Column('name', sa.String(255), nullable=False),
@@ -65,81 +215,97 @@ def upgrade() -> None:
         sa.UniqueConstraint('google_id'),
     )
 
-    # Indexes for users
-    op.create_index('ix_users_email', 'users', ['email'])
-    op.create_index('ix_users_google_id', 'users', ['google_id'])
-
     # Create books table
     op.create_table(
         'books',
-        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=ID_DEFAULT),
         sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
         sa.Column('title', sa.String(500), nullable=False),
         sa.Column('topic', sa.String(1000), nullable=True),
         sa.Column('status', book_status, nullable=False, server_default='draft'),
         sa.Column('input_method', input_method, nullable=False),
-        sa.Column('input_data', postgresql.JSON(astext_type=sa.Text()), nullable=False, server_default='{}'),
+        sa.Column('input_data', postgresql.JSONB(), nullable=False, server_default='{}'),
         sa.Column('page_count', sa.Integer(), nullable=True),
         sa.Column('drive_url', sa.String(500), nullable=True),
         sa.Column('cover_url', sa.String(500), nullable=True),
-        sa.Column('progress_percentage', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('progress_percentage', sa.SmallInteger(), nullable=False, server_default='0'),
         sa.Column('current_step', sa.String(255), nullable=True),
         sa.Column('error_message', sa.Text(), nullable=True),
         sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
-        sa.Column('tags', postgresql.JSON(astext_type=sa.Text()), nullable=False, server_default='[]'),
+        sa.Column('tags', postgresql.JSONB(), nullable=False, server_default='[]'),
         sa.Column('category', sa.String(100), nullable=True),
         sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id'),
+        sa.CheckConstraint('progress_percentage BETWEEN 0 AND 100', name='ck_books_progress'),
     )
-
-    # Indexes for books (optimized for common queries)
-    op.create_index('ix_books_user_id', 'books', ['user_id'])
-    op.create_index('ix_books_status', 'books', ['status'])
-    op.create_index('ix_books_category', 'books', ['category'])
-    op.create_index('ix_books_user_status', 'books', ['user_id', 'status'])
-    op.create_index('ix_books_user_created', 'books', ['user_id', 'created_at'])
-    op.create_index('ix_books_created_at', 'books', ['created_at'])
+    # Vacuum books more often so the visibility map stays current enough for
+    # index-only scans on ix_books_user_status_covering to skip the heap
+    op.execute('ALTER TABLE books SET (autovacuum_vacuum_scale_factor = 0.05)')
 
     # Create chapters table
     op.create_table(
         'chapters',
-        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=ID_DEFAULT),
         sa.Column('book_id', postgresql.UUID(as_uuid=True), nullable=False),
-        sa.Column('chapter_number', sa.Integer(), nullable=False),
+        sa.Column('chapter_number', sa.SmallInteger(), nullable=False),
         sa.Column('title', sa.String(500), nullable=False),
-        sa.Column('content', sa.Text(), nullable=True),
-        sa.Column('content_summary', sa.Text(), nullable=True),
         sa.Column('parent_chapter_id', postgresql.UUID(as_uuid=True), nullable=True),
-        sa.Column('level', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('level', sa.SmallInteger(), nullable=False, server_default='1'),
         sa.Column('infographic_url', sa.String(500), nullable=True),
-        sa.Column('page_start', sa.Integer(), nullable=True),
-        sa.Column('page_end', sa.Integer(), nullable=True),
-        sa.Column('content_embedding', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('page_start', sa.SmallInteger(), nullable=True),
+        sa.Column('page_end', sa.SmallInteger(), nullable=True),
         sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
-        sa.ForeignKeyConstraint(['parent_chapter_id'], ['chapters.id'], ondelete='SET NULL'),
-        sa.PrimaryKeyConstraint('id'),
+        # The partition key must be part of the primary key
+        sa.PrimaryKeyConstraint('id', 'book_id'),
         sa.UniqueConstraint('book_id', 'chapter_number', name='uq_chapter_number_per_book'),
+        sa.CheckConstraint('level >= 1', name='ck_chapters_level'),
+        postgresql_partition_by='HASH (book_id)',
+    )
+
+    for remainder in range(CHAPTER_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS chapters_p{remainder:02d} PARTITION OF chapters "
+            f"FOR VALUES WITH (MODULUS {CHAPTER_PARTITIONS}, REMAINDER {remainder})"
+        )
+
+    # id alone is no longer unique on the partitioned table, so a parent
+    # chapter is referenced by (id, book_id) within the same book. Deleting
+    # the parent only clears parent_chapter_id.
+    op.execute(
+        'ALTER TABLE chapters ADD CONSTRAINT fk_chapters_parent_chapter '
+        'FOREIGN KEY (parent_chapter_id, book_id) REFERENCES chapters (id, book_id) '
+        'ON DELETE SET NULL (parent_chapter_id)'
     )
 
-    # Indexes for chapters
-    op.create_index('ix_chapters_book_id', 'chapters', ['book_id'])
-    op.create_index('ix_chapters_book_number', 'chapters', ['book_id', 'chapter_number'])
-    op.create_index('ix_chapters_parent_id', 'chapters', ['parent_chapter_id'])
+    # Create chapter_content table. The large per-chapter columns live here so
+    # that table-of-contents and navigation scans over chapters stay narrow.
+    op.create_table(
+        'chapter_content',
+        sa.Column('chapter_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('book_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('content_summary', sa.Text(), nullable=True),
+        sa.Column('content_embedding', Vector(EMBEDDING_DIMENSIONS), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['chapter_id', 'book_id'], ['chapters.id', 'chapters.book_id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('chapter_id'),
+    )
 
     # Create generation_tasks table
     op.create_table(
         'generation_tasks',
-        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=ID_DEFAULT),
         sa.Column('book_id', postgresql.UUID(as_uuid=True), nullable=False),
         sa.Column('celery_task_id', sa.String(255), nullable=False),
         sa.Column('status', task_status, nullable=False, server_default='pending'),
-        sa.Column('progress', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('progress', sa.SmallInteger(), nullable=False, server_default='0'),
         sa.Column('current_step', sa.String(255), nullable=True),
-        sa.Column('result', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('result', postgresql.JSONB(), nullable=True),
         sa.Column('error', sa.Text(), nullable=True),
         sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
         sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
@@ -148,113 +314,94 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('celery_task_id'),
+        sa.CheckConstraint('progress BETWEEN 0 AND 100', name='ck_generation_tasks_progress'),
     )
 
-    # Indexes for generation_tasks
-    op.create_index('ix_generation_tasks_book_id', 'generation_tasks', ['book_id'])
-    op.create_index('ix_generation_tasks_celery_id', 'generation_tasks', ['celery_task_id'])
-    op.create_index('ix_generation_tasks_status', 'generation_tasks', ['status'])
-
     # Create reviews table
     op.create_table(
         'reviews',
-        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=ID_DEFAULT),
         sa.Column('book_id', postgresql.UUID(as_uuid=True), nullable=False),
         sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
-        sa.Column('rating', sa.Integer(), nullable=False),
+        sa.Column('rating', sa.SmallInteger(), nullable=False),
         sa.Column('title', sa.String(255), nullable=True),
         sa.Column('content', sa.Text(), nullable=False),
         sa.Column('sentiment_score', sa.Numeric(5, 4), nullable=True),
         sa.Column('sentiment_label', sa.String(20), nullable=True),
-        sa.Column('aspect_sentiments', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('aspect_sentiments', postgresql.JSONB(), nullable=True),
         sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
         sa.PrimaryKeyConstraint('id'),
+        sa.CheckConstraint('rating BETWEEN 1 AND 5', name='ck_reviews_rating'),
     )
 
-    # Indexes for reviews
-    op.create_index('ix_reviews_book_id', 'reviews', ['book_id'])
-    op.create_index('ix_reviews_user_id', 'reviews', ['user_id'])
-    op.create_index('ix_reviews_book_user', 'reviews', ['book_id', 'user_id'], unique=True)
-    op.create_index('ix_reviews_rating', 'reviews', ['rating'])
-
     # Create user_interactions table
     op.create_table(
         'user_interactions',
-        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=ID_DEFAULT),
         sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
         sa.Column('book_id', postgresql.UUID(as_uuid=True), nullable=False),
         sa.Column('interaction_type', interaction_type, nullable=False),
-        sa.Column('metadata', postgresql.JSON(astext_type=sa.Text()), nullable=False, server_default='{}'),
+        sa.Column('metadata', postgresql.JSONB(), nullable=False, server_default='{}'),
         sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
         sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
         sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id'),
+        # The partition key must be part of the primary key
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)',
     )
 
-    # Indexes for user_interactions
-    op.create_index('ix_user_interactions_user_id', 'user_interactions', ['user_id'])
-    op.create_index('ix_user_interactions_book_id', 'user_interactions', ['book_id'])
-    op.create_index(
-        'ix_interactions_user_book_type',
-        'user_interactions',
-        ['user_id', 'book_id', 'interaction_type'],
-        unique=True
-    )
-    op.create_index('ix_user_interactions_type', 'user_interactions', ['interaction_type'])
-    op.create_index('ix_user_interactions_created', 'user_interactions', ['created_at'])
+    # Monthly partitions for user_interactions
+    bounds = _month_starts(date.today(), INTERACTION_PARTITION_MONTHS + 1)
+    for start, end in zip(bounds, bounds[1:]):
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS user_interactions_{start:%Y_%m} "
+            f"PARTITION OF user_interactions FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    op.execute('CREATE TABLE IF NOT EXISTS user_interactions_default PARTITION OF user_interactions DEFAULT')
 
-    # Create composite indexes for common query patterns
-    # For recommendations: books by category with interactions
-    op.create_index(
-        'ix_books_category_status',
-        'books',
-        ['category', 'status']
+    # One row per (user, book, interaction type). user_interactions is an
+    # append-only event log and cannot carry this unique key, so writers
+    # insert here with ON CONFLICT DO NOTHING and only record the event when
+    # the flag row was new.
+    op.create_table(
+        'user_book_interaction_flags',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('book_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('interaction_type', interaction_type, nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'book_id', 'interaction_type'),
     )
 
-    # For dashboard: books by user with status
-    op.create_index(
-        'ix_books_user_status_progress',
-        'books',
-        ['user_id', 'status', 'progress_percentage']
-    )
+    for name, definition in PARTITIONED_INDEXES:
+        unique = 'UNIQUE ' if name in UNIQUE_INDEXES else ''
+        op.execute(f"CREATE {unique}INDEX IF NOT EXISTS {name} ON {definition}")
+
+    # Build indexes outside the migration transaction so they do not hold
+    # ACCESS EXCLUSIVE locks on the tables while they are being built.
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            unique = 'UNIQUE ' if name in UNIQUE_INDEXES else ''
+            op.execute(f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
 
 
 def downgrade() -> None:
     # Drop indexes
-    op.drop_index('ix_books_user_status_progress', table_name='books')
-    op.drop_index('ix_books_category_status', table_name='books')
-    op.drop_index('ix_user_interactions_created', table_name='user_interactions')
-    op.drop_index('ix_user_interactions_type', table_name='user_interactions')
-    op.drop_index('ix_interactions_user_book_type', table_name='user_interactions')
-    op.drop_index('ix_user_interactions_book_id', table_name='user_interactions')
-    op.drop_index('ix_user_interactions_user_id', table_name='user_interactions')
-    op.drop_index('ix_reviews_rating', table_name='reviews')
-    op.drop_index('ix_reviews_book_user', table_name='reviews')
-    op.drop_index('ix_reviews_user_id', table_name='reviews')
-    op.drop_index('ix_reviews_book_id', table_name='reviews')
-    op.drop_index('ix_generation_tasks_status', table_name='generation_tasks')
-    op.drop_index('ix_generation_tasks_celery_id', table_name='generation_tasks')
-    op.drop_index('ix_generation_tasks_book_id', table_name='generation_tasks')
-    op.drop_index('ix_chapters_parent_id', table_name='chapters')
-    op.drop_index('ix_chapters_book_number', table_name='chapters')
-    op.drop_index('ix_chapters_book_id', table_name='chapters')
-    op.drop_index('ix_books_created_at', table_name='books')
-    op.drop_index('ix_books_user_created', table_name='books')
-    op.drop_index('ix_books_user_status', table_name='books')
-    op.drop_index('ix_books_category', table_name='books')
-    op.drop_index('ix_books_status', table_name='books')
-    op.drop_index('ix_books_user_id', table_name='books')
-    op.drop_index('ix_users_google_id', table_name='users')
-    op.drop_index('ix_users_email', table_name='users')
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
 
     # Drop tables
+    op.drop_table('user_book_interaction_flags')
     op.drop_table('user_interactions')
     op.drop_table('reviews')
     op.drop_table('generation_tasks')
+    op.drop_table('chapter_content')
     op.drop_table('chapters')
     op.drop_table('books')
     op.drop_table('users')
@@ -264,3 +411,5 @@ def downgrade() -> None:
     op.execute('DROP TYPE IF EXISTS taskstatus')
     op.execute('DROP TYPE IF EXISTS inputmethod')
     op.execute('DROP TYPE IF EXISTS bookstatus')
+
+    op.execute('DROP FUNCTION IF EXISTS uuidv7()')
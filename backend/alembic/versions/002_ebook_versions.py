@@ -0,0 +1,85 @@
+"""
+Move ebook version history into the ebook_versions table.
+
+Each earlier version used to be an entry in the ebooks.previous_versions
+JSONB list. The entries are copied into ebook_versions as full-content rows
+and the column is dropped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers
+revision: str = '002_ebook_versions'
+down_revision: Union[str, None] = '001_initial_schema'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The ebooks table may come from the model metadata at startup, which may
+# also have created ebook_versions already, so every statement tolerates
+# both. On a fresh database both tables are created by 008_orm_tables.
+CREATE_EBOOK_VERSIONS = """
+DO $$
+BEGIN
+    IF to_regclass('ebooks') IS NOT NULL THEN
+        CREATE TABLE IF NOT EXISTS ebook_versions (
+            ebook_id UUID NOT NULL REFERENCES ebooks (id) ON DELETE CASCADE,
+            version INTEGER NOT NULL,
+            content TEXT,
+            delta JSONB,
+            updated_at TIMESTAMP WITH TIME ZONE,
+            PRIMARY KEY (ebook_id, version)
+        );
+    END IF;
+END
+$$
+"""
+
+COPY_PREVIOUS_VERSIONS = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'ebooks' AND column_name = 'previous_versions'
+    ) THEN
+        INSERT INTO ebook_versions (ebook_id, version, content, updated_at)
+        SELECT e.id, (v ->> 'version')::integer, v ->> 'content', (v ->> 'updated_at')::timestamptz
+        FROM ebooks e, jsonb_array_elements(e.previous_versions) AS v
+        WHERE v ->> 'version' IS NOT NULL
+        ON CONFLICT (ebook_id, version) DO NOTHING;
+
+        ALTER TABLE ebooks DROP COLUMN previous_versions;
+    END IF;
+END
+$$
+"""
+
+# Only rows that still hold full content can be turned back into list
+# entries; rows stored as deltas need app.core.versioning to rebuild.
+RESTORE_PREVIOUS_VERSIONS = """
+UPDATE ebooks e
+SET previous_versions = v.entries
+FROM (
+    SELECT ebook_id, jsonb_agg(
+        jsonb_build_object('version', version, 'content', content, 'updated_at', updated_at)
+        ORDER BY version
+    ) AS entries
+    FROM ebook_versions
+    WHERE delta IS NULL
+    GROUP BY ebook_id
+) v
+WHERE e.id = v.ebook_id
+"""
+
+
+def upgrade() -> None:
+    op.execute(CREATE_EBOOK_VERSIONS)
+    op.execute(COPY_PREVIOUS_VERSIONS)
+
+
+def downgrade() -> None:
+    op.execute(
+        "ALTER TABLE ebooks ADD COLUMN IF NOT EXISTS previous_versions JSONB NOT NULL DEFAULT '[]'::jsonb"
+    )
+    op.execute(RESTORE_PREVIOUS_VERSIONS)
+    op.execute('DROP TABLE IF EXISTS ebook_versions')
@@ -0,0 +1,35 @@
+"""
+Add the stored_files table for MCP file metadata.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers
+revision: str = '003_stored_files'
+down_revision: Union[str, None] = '002_ebook_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The model metadata may already have created the table at startup
+CREATE_STORED_FILES = """
+CREATE TABLE IF NOT EXISTS stored_files (
+    file_id VARCHAR(36) PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    file_name VARCHAR(500) NOT NULL,
+    mime_type VARCHAR(255) NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    file_path VARCHAR(1000) NOT NULL,
+    created_time TIMESTAMP WITH TIME ZONE DEFAULT now(),
+    modified_time TIMESTAMP WITH TIME ZONE DEFAULT now()
+)
+"""
+
+
+def upgrade() -> None:
+    op.execute(CREATE_STORED_FILES)
+    op.execute('CREATE INDEX IF NOT EXISTS ix_stored_files_user_id ON stored_files (user_id)')
+
+
+def downgrade() -> None:
+    op.execute('DROP TABLE IF EXISTS stored_files')
@@ -0,0 +1,93 @@
+"""
+Store the ORM status columns as varchar with CHECK constraints.
+
+ebooks.status, users.profile_visibility and generation_tasks.status/task_type
+were Postgres enum types holding the enum NAMES ('DRAFT', 'PUBLIC'). The
+models now read and write the lowercase values, so the columns are converted
+to varchar(20) with lower(), the enum types are dropped and the models' CHECK
+constraints are added.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers
+revision: str = '004_status_strings'
+down_revision: Union[str, None] = '003_stored_files'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, enum type the previous models created, CHECK name, CHECK expression)
+STATUS_COLUMNS: list[tuple[str, str, str, str, str]] = [
+    ('ebooks', 'status', 'bookstatus', 'ck_ebook_status', "status IN ('draft', 'published', 'archived')"),
+    (
+        'users', 'profile_visibility', 'userprofilevisibility', 'ck_user_profile_visibility',
+        "profile_visibility IN ('public', 'private', 'friends')",
+    ),
+    (
+        'generation_tasks', 'status', 'generationstatus', 'ck_generation_task_status',
+        "status IN ('pending', 'processing', 'completed', 'failed', 'cancelled')",
+    ),
+    (
+        'generation_tasks', 'task_type', 'generationtype', 'ck_generation_task_type',
+        "task_type IN ('full_book', 'chapter', 'summary', 'outline')",
+    ),
+]
+
+
+def _convert_column_sql(table: str, column: str, enum_name: str, check_name: str, check: str) -> str:
+    """Return a DO block converting one enum column to varchar(20) with a CHECK.
+
+    The tables come from the model metadata at startup, so the column is only
+    touched when it exists and still uses the enum type. 001's own books and
+    generation_tasks tables use different enum types and are left alone.
+    """
+    return f"""
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = '{table}' AND column_name = '{column}' AND udt_name = '{enum_name}'
+    ) THEN
+        ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT;
+        ALTER TABLE {table} ALTER COLUMN {column} TYPE VARCHAR(20) USING lower({column}::text);
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = '{table}' AND column_name = '{column}' AND data_type = 'character varying'
+    ) AND NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = '{check_name}'
+    ) THEN
+        ALTER TABLE {table} ADD CONSTRAINT {check_name} CHECK ({check});
+    END IF;
+END
+$$
+"""
+
+
+# 001 also defines a bookstatus type for its books table, so a type is only
+# dropped once no column uses it any more.
+DROP_UNUSED_TYPE = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE udt_name = '{name}') THEN
+        DROP TYPE IF EXISTS {name};
+    END IF;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    for table, column, enum_name, check_name, check in STATUS_COLUMNS:
+        op.execute(_convert_column_sql(table, column, enum_name, check_name, check))
+    for enum_name in dict.fromkeys(enum_name for _, _, enum_name, _, _ in STATUS_COLUMNS):
+        op.execute(DROP_UNUSED_TYPE.format(name=enum_name))
+
+
+def downgrade() -> None:
+    # The columns stay varchar: the old types stored the enum names and
+    # bookstatus cannot be recreated while 001's books table still owns it.
+    for table, _, _, check_name, _ in reversed(STATUS_COLUMNS):
+        op.execute(f'ALTER TABLE IF EXISTS {table} DROP CONSTRAINT IF EXISTS {check_name}')
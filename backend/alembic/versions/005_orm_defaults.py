@@ -0,0 +1,87 @@
+"""
+Give the ORM tables server-side id and timestamp defaults.
+
+The models used to fill id with uuid.uuid4 and the timestamps with
+datetime.utcnow in Python; they now rely on gen_random_uuid() and now() in
+the database. Tables built from the old models have no such defaults and
+store naive UTC timestamps, so every id gets a gen_random_uuid() default and
+every timestamp column becomes timestamptz with a now() default.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers
+revision: str = '005_orm_defaults'
+down_revision: Union[str, None] = '004_status_strings'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Timestamp columns the models declare with server_default=func.now()
+TIMESTAMP_COLUMNS: dict[str, list[str]] = {
+    'users': ['created_at', 'updated_at'],
+    'refresh_tokens': ['created_at'],
+    'email_verifications': ['created_at'],
+    'password_resets': ['created_at'],
+    'ebooks': ['created_at', 'updated_at'],
+    'chapters': ['created_at', 'updated_at'],
+    'reviews': ['created_at', 'updated_at'],
+    'review_reactions': ['created_at'],
+    'reading_progress': ['last_read_at', 'created_at', 'updated_at'],
+    'bookmarks': ['created_at', 'updated_at'],
+    'highlights': ['created_at', 'updated_at'],
+    'notes': ['created_at', 'updated_at'],
+    'generation_tasks': ['created_at'],
+    'oauth_accounts': ['created_at', 'updated_at'],
+    'user_sessions': ['created_at', 'last_active_at'],
+}
+
+# The tables come from the model metadata at startup and 001's tables already
+# have both defaults, so each column is only changed when it exists and still
+# lacks the default or the time zone. The old values were written with
+# utcnow(), so they are read back as UTC.
+SET_DEFAULTS = """
+DO $$
+DECLARE
+    col record;
+BEGIN
+    FOR col IN
+        SELECT table_name, column_name, data_type, column_default
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = '{table}'
+          AND column_name IN ('id', {timestamps})
+    LOOP
+        IF col.column_name = 'id' THEN
+            IF col.column_default IS NULL THEN
+                EXECUTE format('ALTER TABLE %I ALTER COLUMN id SET DEFAULT gen_random_uuid()', col.table_name);
+            END IF;
+        ELSE
+            IF col.data_type = 'timestamp without time zone' THEN
+                EXECUTE format(
+                    'ALTER TABLE %I ALTER COLUMN %I TYPE timestamptz USING %I AT TIME ZONE ''UTC''',
+                    col.table_name, col.column_name, col.column_name
+                );
+            END IF;
+            IF col.column_default IS NULL THEN
+                EXECUTE format('ALTER TABLE %I ALTER COLUMN %I SET DEFAULT now()', col.table_name, col.column_name);
+            END IF;
+        END IF;
+    END LOOP;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    # gen_random_uuid() is built in from PG13; pgcrypto provides it before that
+    op.execute('CREATE EXTENSION IF NOT EXISTS pgcrypto')
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        timestamps = ', '.join(f"'{column}'" for column in columns)
+        op.execute(SET_DEFAULTS.format(table=table, timestamps=timestamps))
+
+
+def downgrade() -> None:
+    # The old models supply id and the timestamps themselves, so the server
+    # defaults and timestamptz columns do not get in their way, and 001's
+    # tables had them from the start.
+    pass
@@ -0,0 +1,66 @@
+"""
+Store auth tokens as sha256 hashes.
+
+refresh_tokens, email_verifications and password_resets kept the raw token in
+a unique token column; the models now store only token_hash, the sha256
+digest. The raw tokens are not carried over, so the existing rows are
+deleted: signed-in users sign in again and outstanding verification and
+reset links have to be requested anew.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers
+revision: str = '006_token_hashes'
+down_revision: Union[str, None] = '005_orm_defaults'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TOKEN_TABLES = ['refresh_tokens', 'email_verifications', 'password_resets']
+
+# The tables come from the model metadata at startup, which creates them with
+# token_hash already, so only tables that still have the token column change.
+REPLACE_TOKEN_COLUMN = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = '{table}' AND column_name = 'token'
+    ) THEN
+        DELETE FROM {table};
+        ALTER TABLE {table} DROP COLUMN token;
+        ALTER TABLE {table} ADD COLUMN IF NOT EXISTS token_hash BYTEA NOT NULL;
+    END IF;
+    IF to_regclass('{table}') IS NOT NULL THEN
+        CREATE UNIQUE INDEX IF NOT EXISTS ix_{table}_token_hash ON {table} (token_hash);
+    END IF;
+END
+$$
+"""
+
+RESTORE_TOKEN_COLUMN = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = '{table}' AND column_name = 'token_hash'
+    ) THEN
+        DELETE FROM {table};
+        ALTER TABLE {table} DROP COLUMN token_hash;
+        ALTER TABLE {table} ADD COLUMN token VARCHAR(500) NOT NULL;
+        CREATE UNIQUE INDEX ix_{table}_token ON {table} (token);
+    END IF;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    for table in TOKEN_TABLES:
+        op.execute(REPLACE_TOKEN_COLUMN.format(table=table))
+
+
+def downgrade() -> None:
+    for table in reversed(TOKEN_TABLES):
+        op.execute(RESTORE_TOKEN_COLUMN.format(table=table))
@@ -0,0 +1,72 @@
+"""
+Move the ORM chapter text into the chapter_bodies table.
+
+The Chapter model reads its text from chapter_bodies so that listing and
+navigation queries over chapters stay narrow. The existing chapters.content
+values are copied across and the column is dropped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers
+revision: str = '007_chapter_bodies'
+down_revision: Union[str, None] = '006_token_hashes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Only the model's chapters table (keyed by ebook_id) has a unique id to
+# reference; 001's partitioned chapters keeps its text in chapter_content.
+# The model metadata may already have created chapter_bodies at startup.
+MOVE_CHAPTER_CONTENT = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'chapters' AND column_name = 'ebook_id'
+    ) THEN
+        CREATE TABLE IF NOT EXISTS chapter_bodies (
+            chapter_id UUID PRIMARY KEY REFERENCES chapters (id) ON DELETE CASCADE,
+            content TEXT
+        );
+
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'chapters' AND column_name = 'content'
+        ) THEN
+            INSERT INTO chapter_bodies (chapter_id, content)
+            SELECT id, content FROM chapters
+            WHERE content IS NOT NULL
+            ON CONFLICT (chapter_id) DO NOTHING;
+
+            ALTER TABLE chapters DROP COLUMN content;
+        END IF;
+    END IF;
+END
+$$
+"""
+
+RESTORE_CHAPTER_CONTENT = """
+DO $$
+BEGIN
+    IF to_regclass('chapter_bodies') IS NOT NULL THEN
+        ALTER TABLE chapters ADD COLUMN IF NOT EXISTS content TEXT;
+
+        UPDATE chapters c
+        SET content = b.content
+        FROM chapter_bodies b
+        WHERE c.id = b.chapter_id;
+
+        DROP TABLE chapter_bodies;
+    END IF;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    op.execute(MOVE_CHAPTER_CONTENT)
+
+
+def downgrade() -> None:
+    op.execute(RESTORE_CHAPTER_CONTENT)
@@ -0,0 +1,260 @@
+"""
+Create the tables the application models use that 001 does not define.
+
+Until now these tables only came from the model metadata at startup. They are
+created here in their current model shape so that startup no longer needs
+create_all outside development. users, chapters, reviews and generation_tasks
+are defined by 001 and keep its shape.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers
+revision: str = '008_orm_tables'
+down_revision: Union[str, None] = '007_chapter_bodies'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Databases that ran create_all at startup already have every table, so each
+# statement tolerates existing objects. Tables are listed in dependency order.
+CREATE_TABLES: list[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS ebooks (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        author_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        title VARCHAR(500) NOT NULL,
+        description TEXT,
+        cover_image_url VARCHAR(500),
+        status VARCHAR(20) NOT NULL,
+        content TEXT,
+        genre VARCHAR(100),
+        tags JSONB NOT NULL DEFAULT '[]'::jsonb,
+        version INTEGER,
+        view_count INTEGER,
+        download_count INTEGER,
+        rating_average FLOAT,
+        rating_count INTEGER,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        published_at TIMESTAMP WITHOUT TIME ZONE,
+        CONSTRAINT ck_ebook_status CHECK (status IN ('draft', 'published', 'archived'))
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ebook_versions (
+        ebook_id UUID NOT NULL REFERENCES ebooks (id) ON DELETE CASCADE,
+        version INTEGER NOT NULL,
+        content TEXT,
+        delta JSONB,
+        updated_at TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (ebook_id, version)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS refresh_tokens (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        token_hash BYTEA NOT NULL,
+        expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        is_revoked BOOLEAN
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS email_verifications (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        token_hash BYTEA NOT NULL,
+        expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        is_used BOOLEAN
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS password_resets (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        token_hash BYTEA NOT NULL,
+        expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        is_used BOOLEAN
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS oauth_accounts (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        provider VARCHAR(50) NOT NULL,
+        provider_account_id VARCHAR(255) NOT NULL,
+        access_token TEXT,
+        refresh_token TEXT,
+        expires_at TIMESTAMP WITHOUT TIME ZONE,
+        token_type VARCHAR(50),
+        provider_data JSONB NOT NULL DEFAULT '{}'::jsonb,
+        scope JSONB NOT NULL DEFAULT '[]'::jsonb,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        CONSTRAINT uq_oauth_provider_account UNIQUE (provider, provider_account_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_sessions (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        device_info JSONB NOT NULL DEFAULT '{}'::jsonb,
+        ip_address VARCHAR(45),
+        user_agent TEXT,
+        location JSONB NOT NULL DEFAULT '{}'::jsonb,
+        session_token VARCHAR(255) NOT NULL,
+        is_active BOOLEAN,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        last_active_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS review_reactions (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        review_id UUID NOT NULL REFERENCES reviews (id) ON DELETE CASCADE,
+        user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        reaction_type VARCHAR(50) NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reading_progress (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        ebook_id UUID NOT NULL REFERENCES ebooks (id) ON DELETE CASCADE,
+        chapter_id UUID,
+        progress_percent FLOAT,
+        last_position INTEGER,
+        last_read_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bookmarks (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        ebook_id UUID NOT NULL REFERENCES ebooks (id) ON DELETE CASCADE,
+        chapter_id UUID,
+        position INTEGER NOT NULL,
+        note TEXT,
+        title VARCHAR(255),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS highlights (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        ebook_id UUID NOT NULL REFERENCES ebooks (id) ON DELETE CASCADE,
+        chapter_id UUID,
+        start_position INTEGER NOT NULL,
+        end_position INTEGER NOT NULL,
+        highlighted_text TEXT NOT NULL,
+        color VARCHAR(50),
+        note TEXT,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS notes (
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        user_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        ebook_id UUID NOT NULL REFERENCES ebooks (id) ON DELETE CASCADE,
+        chapter_id UUID,
+        title VARCHAR(255),
+        content TEXT NOT NULL,
+        position INTEGER,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+    )
+    """,
+]
+
+INDEXES: list[tuple[str, str]] = [
+    ('ix_ebooks_author_id', 'ebooks (author_id)'),
+    ('ix_ebooks_title_trgm', 'ebooks USING gin (title gin_trgm_ops)'),
+    ('ix_ebooks_description_trgm', 'ebooks USING gin (description gin_trgm_ops)'),
+    ('ix_refresh_tokens_user_id', 'refresh_tokens (user_id)'),
+    ('ix_refresh_tokens_token_hash', 'refresh_tokens (token_hash)'),
+    ('ix_email_verifications_user_id', 'email_verifications (user_id)'),
+    ('ix_email_verifications_token_hash', 'email_verifications (token_hash)'),
+    ('ix_password_resets_user_id', 'password_resets (user_id)'),
+    ('ix_password_resets_token_hash', 'password_resets (token_hash)'),
+    ('ix_oauth_user_provider', 'oauth_accounts (user_id, provider)'),
+    ('ix_user_sessions_user_id', 'user_sessions (user_id)'),
+    ('ix_user_sessions_session_token', 'user_sessions (session_token)'),
+    ('ix_review_reactions_review_user', 'review_reactions (review_id, user_id)'),
+    ('ix_review_reactions_user_id', 'review_reactions (user_id)'),
+    ('ix_progress_user_ebook', 'reading_progress (user_id, ebook_id)'),
+    ('ix_bookmarks_user_ebook', 'bookmarks (user_id, ebook_id)'),
+    ('ix_highlights_user_ebook', 'highlights (user_id, ebook_id)'),
+    ('ix_notes_user_ebook', 'notes (user_id, ebook_id)'),
+]
+
+UNIQUE_INDEXES = {
+    'ix_refresh_tokens_token_hash',
+    'ix_email_verifications_token_hash',
+    'ix_password_resets_token_hash',
+    'ix_user_sessions_session_token',
+    'ix_progress_user_ebook',
+}
+
+CHAPTER_TABLES = ['reading_progress', 'bookmarks', 'highlights', 'notes']
+
+# The chapter references need the model's chapters table, whose id is unique
+# on its own. 001's partitioned chapters is keyed by (id, book_id), so there
+# the chapter_id columns stay unconstrained.
+ADD_CHAPTER_REFERENCES = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'chapters' AND column_name = 'ebook_id'
+    ) THEN
+        CREATE TABLE IF NOT EXISTS chapter_bodies (
+            chapter_id UUID PRIMARY KEY REFERENCES chapters (id) ON DELETE CASCADE,
+            content TEXT
+        );
+{references}
+    END IF;
+END
+$$
+"""
+
+ADD_CHAPTER_REFERENCE = """
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.table_constraints tc
+            JOIN information_schema.constraint_column_usage ccu
+              ON ccu.constraint_name = tc.constraint_name
+            WHERE tc.table_name = '{table}' AND tc.constraint_type = 'FOREIGN KEY'
+              AND ccu.table_name = 'chapters'
+        ) THEN
+            ALTER TABLE {table} ADD CONSTRAINT {table}_chapter_id_fkey
+                FOREIGN KEY (chapter_id) REFERENCES chapters (id) ON DELETE CASCADE;
+        END IF;"""
+
+
+def upgrade() -> None:
+    # gen_random_uuid() is built in from PG13; pgcrypto provides it before that
+    op.execute('CREATE EXTENSION IF NOT EXISTS pgcrypto')
+    for statement in CREATE_TABLES:
+        op.execute(statement)
+    for name, definition in INDEXES:
+        unique = 'UNIQUE ' if name in UNIQUE_INDEXES else ''
+        op.execute(f"CREATE {unique}INDEX IF NOT EXISTS {name} ON {definition}")
+    references = ''.join(ADD_CHAPTER_REFERENCE.format(table=table) for table in CHAPTER_TABLES)
+    op.execute(ADD_CHAPTER_REFERENCES.format(references=references))
+
+
+def downgrade() -> None:
+    # The tables may hold data written before this revision, when startup
+    # created them, so they are left in place.
+    pass
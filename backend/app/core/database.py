@@ -1,14 +1,37 @@
 """Database setup and session management."""
+from fastapi import Depends
+from sqlalchemy import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
+# Cache prepared statements per connection and skip JIT for short queries
+ASYNCPG_CONNECT_ARGS = {
+    "statement_cache_size": 1024,
+    "prepared_statement_cache_size": 1024,
+    "server_settings": {
+        "jit": "off",
+        "application_name": settings.APP_NAME,
+    },
+}
+
+# The async engine needs the asyncio-aware pool; a plain QueuePool blocks
+# the event loop while waiting for a connection
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    connect_args=(
+        ASYNCPG_CONNECT_ARGS
+        if make_url(settings.DATABASE_URL).get_driver_name() == "asyncpg"
+        else {}
+    ),
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -22,20 +45,31 @@ AsyncSessionLocal = async_sessionmaker(
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
-    pass
+
+    # Fetch server-generated ids and timestamps with RETURNING on flush
+    __mapper_args__ = {"eager_defaults": True}
 
 
 async def get_db() -> AsyncSession:
-    """Get database session."""
+    """Get database session.
+    
+    Nothing is committed implicitly, so read-only requests never send a
+    COMMIT. Routes that write commit themselves or depend on get_db_tx;
+    anything left uncommitted is rolled back when the session closes.
+    """
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+        yield session
+
+
+async def get_db_tx(db: AsyncSession = Depends(get_db)) -> AsyncSession:
+    """Get the request's database session, committed when the route returns.
+    
+    It is the same session as get_db, so dependencies such as
+    get_current_user share its connection. Nothing is committed if the
+    route raises.
+    """
+    yield db
+    await db.commit()
 
 
 async def init_db():
@@ -0,0 +1,86 @@
+"""Redis cache for the public ebook detail and list responses.
+
+Detail responses are cached per ebook and deleted when the ebook changes.
+List pages are keyed under a generation number that every ebook change
+bumps, so stale pages are never read again and simply expire.
+"""
+import hashlib
+import logging
+from typing import Optional
+from redis.exceptions import RedisError
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+EBOOK_CACHE_TTL = 300  # 5 minutes
+
+_LIST_GENERATION_KEY = "ebooks:list:gen"
+
+
+def detail_cache_key(ebook_id) -> str:
+    """Redis key for a cached ebook detail response."""
+    return f"ebook:{ebook_id}"
+
+
+def _list_key(generation: int, *params) -> str:
+    """Redis key for a cached list page under a list generation."""
+    digest = hashlib.blake2b(repr(params).encode(), digest_size=16).hexdigest()
+    return f"ebooks:list:{generation}:{digest}"
+
+
+async def get_cached_ebook(ebook_id) -> Optional[bytes]:
+    """Get a cached ebook detail response."""
+    try:
+        return await get_redis().get(detail_cache_key(ebook_id))
+    except RedisError as e:
+        logger.warning(f"Ebook cache get error for {ebook_id}: {e}")
+        return None
+
+
+async def cache_ebook(ebook_id, payload: bytes) -> None:
+    """Cache an ebook detail response."""
+    try:
+        await get_redis().setex(detail_cache_key(ebook_id), EBOOK_CACHE_TTL, payload)
+    except RedisError as e:
+        logger.warning(f"Ebook cache set error for {ebook_id}: {e}")
+
+
+async def list_cache_key(*params) -> Optional[str]:
+    """Key for a list page with the given query parameters.
+
+    Returns None if Redis is unavailable, in which case the page is not cached.
+    """
+    try:
+        generation = await get_redis().get(_LIST_GENERATION_KEY)
+    except RedisError as e:
+        logger.warning(f"Ebook list cache generation error: {e}")
+        return None
+    return _list_key(int(generation or 0), *params)
+
+
+async def get_cached_list(key: str) -> Optional[bytes]:
+    """Get a cached list page."""
+    try:
+        return await get_redis().get(key)
+    except RedisError as e:
+        logger.warning(f"Ebook list cache get error: {e}")
+        return None
+
+
+async def cache_list(key: str, payload: bytes) -> None:
+    """Cache a list page."""
+    try:
+        await get_redis().setex(key, EBOOK_CACHE_TTL, payload)
+    except RedisError as e:
+        logger.warning(f"Ebook list cache set error: {e}")
+
+
+async def invalidate_ebook(ebook_id) -> None:
+    """Drop an ebook's cached detail and every cached list page."""
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.delete(detail_cache_key(ebook_id))
+            pipe.incr(_LIST_GENERATION_KEY)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Ebook cache invalidation error for {ebook_id}: {e}")
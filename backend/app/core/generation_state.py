@@ -0,0 +1,164 @@
+"""Book generation state shared between workers through Redis.
+
+Each book's latest generation is a Redis hash at generation:{book_id}, so
+progress, cancel and retry requests can land on any worker. The hash
+fields are the GenerationProgressResponse fields plus a cancelled flag;
+None is stored as an empty string. Every change is also published, as the
+full decoded state in JSON, on the pub/sub channel of the same name for
+clients streaming progress.
+"""
+import json
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from app.core.redis_client import get_redis
+
+# Generation state is kept for a day after its last update
+GENERATION_STATE_TTL = 86400
+
+# Statuses after which a generation no longer changes
+FINISHED_STATUSES = {"completed", "failed", "cancelled"}
+
+# Set fields on a generation hash only while its id is still ARGV[1], so a
+# superseded generation cannot write over the one that replaced it. ARGV[2]
+# is the TTL and the rest are field/value pairs. Returns the updated hash,
+# or nil if the generation was replaced.
+_UPDATE_IF_CURRENT = """
+if redis.call('HGET', KEYS[1], 'id') ~= ARGV[1] then
+    return nil
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return redis.call('HGETALL', KEYS[1])
+"""
+
+
+def _generation_key(book_id) -> str:
+    """Redis key for a book's generation state."""
+    return f"generation:{book_id}"
+
+
+def _decode(state: dict) -> Optional[dict]:
+    """Decode a hash read from Redis, or None if it is empty."""
+    if not state:
+        return None
+    return {
+        field.decode(): (value.decode() or None)
+        for field, value in state.items()
+    }
+
+
+def _encode(value) -> str:
+    """Encode a field value for the Redis hash."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if hasattr(value, "value"):
+        return str(value.value)
+    return str(value)
+
+
+async def start_generation(book_id, total_chapters: Optional[int]) -> uuid.UUID:
+    """Record a new pending generation for a book, replacing any earlier one."""
+    generation_id = uuid.uuid4()
+    key = _generation_key(book_id)
+    state = {
+        "id": generation_id,
+        "book_id": book_id,
+        "status": "pending",
+        "progress_percent": 0,
+        "current_chapter": None,
+        "total_chapters": total_chapters,
+        "error_message": None,
+        "started_at": None,
+        "completed_at": None,
+        "cancelled": False,
+        "created_at": datetime.utcnow(),
+    }
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.delete(key)
+        pipe.hset(key, mapping={field: _encode(value) for field, value in state.items()})
+        pipe.expire(key, GENERATION_STATE_TTL)
+        pipe.hgetall(key)
+        *_, state = await pipe.execute()
+    await _publish(book_id, state)
+    return generation_id
+
+
+async def update_generation(book_id, generation_id: uuid.UUID, **fields) -> bool:
+    """Update fields of a book's generation state.
+    
+    Returns False, changing nothing, if the generation has been replaced by
+    a newer one.
+    """
+    args = [str(generation_id), GENERATION_STATE_TTL]
+    for field, value in fields.items():
+        args.extend((field, _encode(value)))
+    state = await get_redis().eval(_UPDATE_IF_CURRENT, 1, _generation_key(book_id), *args)
+    if state is None:
+        return False
+    await _publish(book_id, dict(zip(state[::2], state[1::2])))
+    return True
+
+
+async def _publish(book_id, state: dict) -> None:
+    """Publish a book's generation state to its stream subscribers."""
+    await get_redis().publish(_generation_key(book_id), json.dumps(_decode(state)))
+
+
+async def get_generation(book_id) -> Optional[dict]:
+    """Get a book's generation state, or None if it has none."""
+    return _decode(await get_redis().hgetall(_generation_key(book_id)))
+
+
+async def should_stop(book_id, generation_id: uuid.UUID) -> bool:
+    """Whether a running generation was cancelled or replaced by a newer one."""
+    current_id, cancelled = await get_redis().hmget(
+        _generation_key(book_id), "id", "cancelled"
+    )
+    return cancelled == b"1" or current_id != str(generation_id).encode()
+
+
+async def cancel_generation(book_id) -> bool:
+    """Flag a book's generation as cancelled; False if it has none."""
+    key = _generation_key(book_id)
+    redis = get_redis()
+    if not await redis.exists(key):
+        return False
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping={"cancelled": "1", "status": "cancelled"})
+        pipe.hgetall(key)
+        _, state = await pipe.execute()
+    await _publish(book_id, state)
+    return True
+
+
+async def generation_events(book_id, keepalive: float = 15.0) -> AsyncIterator[Optional[dict]]:
+    """Yield a book's generation state now and after every change.
+
+    Yields None after ``keepalive`` seconds without a change, so callers
+    can keep the connection open. Stops once the generation has finished,
+    and yields nothing if the book has no generation.
+    """
+    async with get_redis().pubsub() as pubsub:
+        # Subscribe before reading the current state so no change is missed
+        await pubsub.subscribe(_generation_key(book_id))
+        state = await get_generation(book_id)
+        if state is None:
+            return
+        yield state
+        if state["status"] in FINISHED_STATUSES:
+            return
+        
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=keepalive)
+            if message is None:
+                yield None
+                continue
+            state = json.loads(message["data"])
+            yield state
+            if state["status"] in FINISHED_STATUSES:
+                return
@@ -0,0 +1,22 @@
+"""Shared Redis connection."""
+from typing import Optional
+import redis.asyncio as redis
+from app.core.config import settings
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Get or create the shared Redis connection (raw bytes responses)."""
+    global _client
+    if _client is None:
+        _client = redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the shared Redis connection."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
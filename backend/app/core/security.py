@@ -1,21 +1,52 @@
 """Security utilities for authentication and authorization."""
+import hashlib
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
+import anyio
+import orjson
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import make_transient_to_detached
+from redis.exceptions import RedisError
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_COST,
+)
+
+# bcrypt is CPU-bound; run it in worker threads, at most one per core
+_hash_limiter = anyio.CapacityLimiter(os.cpu_count() or 1)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Authenticated users are cached in Redis for the lifetime of an access token
+USER_CACHE_TTL = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+# Never copy the password hash into the cache
+_USER_CACHE_EXCLUDE = frozenset({"hashed_password"})
+
+# Verified JWT payloads by raw token, so a token is only verified once
+# while it is valid. Bounded; least recently used tokens are dropped first.
+DECODED_TOKEN_CACHE_SIZE = 8192
+_decoded_tokens: "OrderedDict[str, dict]" = OrderedDict()
+
 
 def hash_password(password: str) -> str:
     """Hash a password."""
@@ -27,6 +58,30 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a bcrypt hash was made with a cost other than BCRYPT_COST."""
+    # bcrypt hashes look like $2b$<cost>$<salt+digest>
+    parts = hashed_password.split("$")
+    return len(parts) < 4 or parts[2] != f"{settings.BCRYPT_COST:02d}"
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in a worker thread without blocking the event loop."""
+    return await anyio.to_thread.run_sync(hash_password, password, limiter=_hash_limiter)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread without blocking the event loop."""
+    return await anyio.to_thread.run_sync(
+        verify_password, plain_password, hashed_password, limiter=_hash_limiter
+    )
+
+
+def hash_token(token: str) -> bytes:
+    """Return the sha256 digest under which a token is stored and looked up."""
+    return hashlib.sha256(token.encode()).digest()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -44,22 +99,152 @@ def create_refresh_token(data: dict) -> str:
     """Create a JWT refresh token."""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    # iat keeps sub-second precision so it can be compared with a revocation
+    # cutoff taken in the same second
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex, "type": "refresh"})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 
 def decode_token(token: str) -> dict:
     """Decode and verify a JWT token."""
+    payload = _decoded_tokens.get(token)
+    if payload is not None:
+        if payload["exp"] > time.time():
+            _decoded_tokens.move_to_end(token)
+            return dict(payload)
+        del _decoded_tokens[token]
+    
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    # Tokens without an expiry are never cached
+    if isinstance(payload.get("exp"), (int, float)):
+        _decoded_tokens[token] = payload
+        if len(_decoded_tokens) > DECODED_TOKEN_CACHE_SIZE:
+            _decoded_tokens.popitem(last=False)
+    return dict(payload)
+
+
+def _spent_refresh_key(jti: str) -> str:
+    """Redis key marking a refresh token as rotated or logged out."""
+    return f"auth:refresh:spent:{jti}"
+
+
+def _refresh_cutoff_key(user_id) -> str:
+    """Redis key holding the earliest iat still accepted for a user."""
+    return f"auth:refresh:cutoff:{user_id}"
+
+
+def _seconds_until(exp: int) -> int:
+    """Seconds left before a token's exp, at least one."""
+    return max(int(exp - time.time()), 1)
+
+
+async def spend_refresh_token(payload: dict) -> bool:
+    """Mark a decoded refresh token as used.
+
+    Returns False when its jti was already spent or the user's tokens were
+    revoked after it was issued. The spent marker lives only as long as the
+    token itself could.
+    """
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.set(_spent_refresh_key(payload["jti"]), 1, ex=_seconds_until(payload["exp"]), nx=True)
+    pipe.get(_refresh_cutoff_key(payload["sub"]))
+    first_use, cutoff = await pipe.execute()
+    if not first_use:
+        return False
+    return cutoff is None or payload["iat"] >= float(cutoff)
+
+
+async def revoke_refresh_token(payload: dict) -> None:
+    """Spend a decoded refresh token without issuing a new one."""
+    await get_redis().set(
+        _spent_refresh_key(payload["jti"]), 1, ex=_seconds_until(payload["exp"])
+    )
+
+
+async def revoke_user_refresh_tokens(user_id) -> None:
+    """Reject every refresh token issued to a user so far."""
+    await get_redis().set(
+        _refresh_cutoff_key(user_id),
+        time.time(),
+        ex=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+    )
+
+
+def _user_cache_key(user_id) -> str:
+    """Redis key for a cached authenticated user."""
+    return f"auth:user:{user_id}"
+
+
+def _user_to_cache(user) -> bytes:
+    """Serialize a user's column values for the cache."""
+    return orjson.dumps({
+        attr.key: getattr(user, attr.key)
+        for attr in user.__mapper__.column_attrs
+        if attr.key not in _USER_CACHE_EXCLUDE
+    })
+
+
+def _user_from_cache(user_cls, raw: bytes):
+    """Rebuild a detached user from cached column values."""
+    data = orjson.loads(raw)
+    columns = user_cls.__mapper__.columns
+    for key, value in data.items():
+        if value is None:
+            continue
+        column_type = columns[key].type
+        if isinstance(column_type, UUID):
+            data[key] = uuid.UUID(value)
+        elif isinstance(column_type, DateTime):
+            data[key] = datetime.fromisoformat(value)
+    user = user_cls(**data)
+    make_transient_to_detached(user)
+    return user
+
+
+async def invalidate_cached_user(user_id) -> None:
+    """Drop a user from the authentication cache after it changes."""
+    try:
+        await get_redis().delete(_user_cache_key(user_id))
+    except RedisError as e:
+        logger.warning(f"User cache delete error for {user_id}: {e}")
+
+
+async def load_user(db: AsyncSession, user_id):
+    """Load a user by id, going through the Redis user cache."""
+    from app.models.user import User
+    
+    redis = get_redis()
+    cache_key = _user_cache_key(user_id)
+    try:
+        cached = await redis.get(cache_key)
+    except RedisError as e:
+        logger.warning(f"User cache get error for {user_id}: {e}")
+        cached = None
+    
+    if cached is not None:
+        # Attach the cached copy to the session without a SELECT, so handlers
+        # can still modify and commit it like a loaded user
+        user = await db.merge(_user_from_cache(User, cached), load=False)
+    else:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        
+        if user is not None:
+            try:
+                await redis.setex(cache_key, USER_CACHE_TTL, _user_to_cache(user))
+            except RedisError as e:
+                logger.warning(f"User cache set error for {user_id}: {e}")
+    
+    return user
 
 
 async def get_current_user(
@@ -67,8 +252,6 @@ async def get_current_user(
     db: AsyncSession = Depends(get_db)
 ):
     """Get current authenticated user from JWT token."""
-    from app.models.user import User
-    
     payload = decode_token(token)
     user_id: str = payload.get("sub")
     if user_id is None:
@@ -77,8 +260,7 @@ async def get_current_user(
             detail="Could not validate credentials",
         )
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await load_user(db, user_id)
     
     if user is None:
         raise HTTPException(
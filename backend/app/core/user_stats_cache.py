@@ -0,0 +1,46 @@
+"""Redis cache for the per-user profile statistics.
+
+Entries are short-lived and also dropped whenever the user writes a book,
+review or reading progress entry, so dashboards polling the stats endpoint
+mostly read from Redis.
+"""
+import json
+import logging
+from typing import Optional
+from redis.exceptions import RedisError
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+USER_STATS_CACHE_TTL = 30  # seconds
+
+
+def _stats_key(user_id) -> str:
+    """Redis key for a user's cached statistics."""
+    return f"stats:{user_id}"
+
+
+async def get_cached_stats(user_id) -> Optional[dict]:
+    """Get a user's cached statistics."""
+    try:
+        cached = await get_redis().get(_stats_key(user_id))
+    except RedisError as e:
+        logger.warning(f"User stats cache get error for {user_id}: {e}")
+        return None
+    return json.loads(cached) if cached is not None else None
+
+
+async def cache_stats(user_id, stats: dict) -> None:
+    """Cache a user's statistics."""
+    try:
+        await get_redis().setex(_stats_key(user_id), USER_STATS_CACHE_TTL, json.dumps(stats))
+    except RedisError as e:
+        logger.warning(f"User stats cache set error for {user_id}: {e}")
+
+
+async def invalidate_user_stats(user_id) -> None:
+    """Drop a user's cached statistics."""
+    try:
+        await get_redis().delete(_stats_key(user_id))
+    except RedisError as e:
+        logger.warning(f"User stats cache invalidation error for {user_id}: {e}")
@@ -0,0 +1,127 @@
+"""Ebook version history stored as reverse deltas.
+
+The newest row in ebook_versions always holds full content. When a newer
+version is recorded, the row before it is rewritten as a line delta that
+rebuilds its content from the next stored version, unless its version
+number is a multiple of SNAPSHOT_INTERVAL, in which case it stays a full
+snapshot. Rebuilding any version therefore applies at most
+SNAPSHOT_INTERVAL deltas.
+"""
+from difflib import SequenceMatcher
+from typing import List, Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+SNAPSHOT_INTERVAL = 20
+
+
+def make_delta(newer: str, older: str) -> list:
+    """Line delta that turns ``newer`` back into ``older``.
+
+    Each op is ``[start, end, text]``: lines ``start:end`` of ``newer`` are
+    replaced by ``text``.
+    """
+    newer_lines = newer.splitlines(keepends=True)
+    older_lines = older.splitlines(keepends=True)
+    matcher = SequenceMatcher(None, newer_lines, older_lines, autojunk=False)
+    return [
+        [i1, i2, "".join(older_lines[j1:j2])]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_delta(newer: str, delta: list) -> str:
+    """Rebuild the older text from ``newer`` and a delta from make_delta."""
+    lines = newer.splitlines(keepends=True)
+    pieces = []
+    position = 0
+    for start, end, text in delta:
+        pieces.extend(lines[position:start])
+        pieces.append(text)
+        position = end
+    pieces.extend(lines[position:])
+    return "".join(pieces)
+
+
+async def record_ebook_version(db: AsyncSession, ebook) -> None:
+    """Store the ebook's current content as a version before it is replaced."""
+    from app.models.user import EbookVersion
+    
+    result = await db.execute(
+        select(EbookVersion)
+        .where(EbookVersion.ebook_id == ebook.id)
+        .order_by(EbookVersion.version.desc())
+        .limit(1)
+    )
+    latest = result.scalar_one_or_none()
+
+    # The previous newest row becomes a delta against the content stored now
+    if (
+        latest is not None
+        and latest.delta is None
+        and latest.version % SNAPSHOT_INTERVAL != 0
+        and latest.content is not None
+        and ebook.content is not None
+    ):
+        latest.delta = make_delta(ebook.content, latest.content)
+        latest.content = None
+
+    db.add(EbookVersion(
+        ebook_id=ebook.id,
+        version=ebook.version,
+        content=ebook.content,
+        updated_at=ebook.updated_at,
+    ))
+
+
+def _rebuild(rows: list) -> List[tuple]:
+    """(row, content) pairs for rows ordered newest first, ending at a full row."""
+    rebuilt = []
+    content = None
+    for row in rows:
+        content = row.content if row.delta is None else apply_delta(content, row.delta)
+        rebuilt.append((row, content))
+    return rebuilt
+
+
+async def load_ebook_versions(db: AsyncSession, ebook_id) -> List[tuple]:
+    """(row, content) pairs for every stored version, oldest first."""
+    from app.models.user import EbookVersion
+    
+    result = await db.execute(
+        select(EbookVersion)
+        .where(EbookVersion.ebook_id == ebook_id)
+        .order_by(EbookVersion.version.desc())
+    )
+    return list(reversed(_rebuild(result.scalars().all())))
+
+
+async def load_ebook_version(db: AsyncSession, ebook_id, version: int) -> Optional[tuple]:
+    """(row, content) for one stored version, or None if it does not exist."""
+    from app.models.user import EbookVersion
+    
+    # Only the rows between the version and the nearest full row above it
+    nearest_full = (
+        select(func.min(EbookVersion.version))
+        .where(
+            EbookVersion.ebook_id == ebook_id,
+            EbookVersion.version >= version,
+            EbookVersion.delta.is_(None)
+        )
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(EbookVersion)
+        .where(
+            EbookVersion.ebook_id == ebook_id,
+            EbookVersion.version >= version,
+            EbookVersion.version <= nearest_full
+        )
+        .order_by(EbookVersion.version.desc())
+    )
+    rebuilt = _rebuild(result.scalars().all())
+
+    if not rebuilt or rebuilt[-1][0].version != version:
+        return None
+    return rebuilt[-1]
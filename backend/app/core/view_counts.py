@@ -0,0 +1,30 @@
+"""Ebook view counters buffered in Redis.
+
+Views are counted with INCR on the read path and folded into
+ebooks.view_count periodically by the flush_view_counts task, so reading
+an ebook never takes a write transaction.
+"""
+import logging
+from redis.exceptions import RedisError
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+VIEW_COUNT_KEY_PREFIX = "ebooks:views:"
+
+
+def view_count_key(ebook_id) -> str:
+    """Redis key holding an ebook's views not yet written to the database."""
+    return f"{VIEW_COUNT_KEY_PREFIX}{ebook_id}"
+
+
+async def record_view(ebook_id) -> int:
+    """Count one view and return the views still pending for the ebook.
+
+    Returns 0 if Redis is unavailable; the view is then not counted.
+    """
+    try:
+        return await get_redis().incr(view_count_key(ebook_id))
+    except RedisError:
+        logger.warning("Could not record view for ebook %s", ebook_id, exc_info=True)
+        return 0
@@ -7,6 +7,7 @@ from app.db.session import (
     db_manager,
     get_db,
     get_db_context,
+    get_db_tx,
     health_check,
     init_db,
 )
@@ -17,6 +18,7 @@ __all__ = [
     "db_manager",
     "get_db",
     "get_db_context",
+    "get_db_tx",
     "health_check",
     "init_db",
 ]
@@ -2,9 +2,12 @@
 Database session management with connection pooling.
 """
 import asyncio
+import time
 from contextlib import asynccontextmanager
+from types import SimpleNamespace
 from typing import AsyncGenerator, Optional
 
+from sqlalchemy import make_url, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -14,6 +17,28 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.core.config import settings
+from app.core.database import ASYNCPG_CONNECT_ARGS
+
+# Engine configuration, resolved from settings once at import
+_ENGINE_CFG = SimpleNamespace(
+    url=settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    # NullPool when testing
+    use_null_pool=settings.TESTING,
+    asyncpg_connect_args=ASYNCPG_CONNECT_ARGS,
+)
+
+# A successful health check is reused for this many seconds so frequent
+# liveness probes do not each check out a pooled connection.
+HEALTH_CHECK_TTL = 0.5
+
+_health_lock = asyncio.Lock()
+_last_ok_ts = 0.0
 
 
 class DatabaseManager:
@@ -39,35 +64,30 @@ class DatabaseManager:
 
     def _create_engine(self) -> AsyncEngine:
         """Create the database engine with connection pooling."""
-        # Pool configuration
-        pool_size = getattr(settings, "DB_POOL_SIZE", 10)
-        max_overflow = getattr(settings, "DB_MAX_OVERFLOW", 20)
-        pool_timeout = getattr(settings, "DB_POOL_TIMEOUT", 30)
-        pool_recycle = getattr(settings, "DB_POOL_RECYCLE", 3600)
-        pool_pre_ping = getattr(settings, "DB_POOL_PRE_PING", True)
-
-        # Check if we should use NullPool (for testing)
-        use_null_pool = getattr(settings, "TESTING", False)
+        cfg = _ENGINE_CFG
 
         engine_args = {
-            "echo": getattr(settings, "DB_ECHO", False),
-            "poolclass": NullPool if use_null_pool else AsyncAdaptedQueuePool,
+            "echo": cfg.echo,
+            "poolclass": NullPool if cfg.use_null_pool else AsyncAdaptedQueuePool,
         }
 
-        if not use_null_pool:
+        if not cfg.use_null_pool:
             engine_args.update(
                 {
-                    "pool_size": pool_size,
-                    "max_overflow": max_overflow,
-                    "pool_timeout": pool_timeout,
-                    "pool_recycle": pool_recycle,
-                    "pool_pre_ping": pool_pre_ping,
+                    "pool_size": cfg.pool_size,
+                    "max_overflow": cfg.max_overflow,
+                    "pool_timeout": cfg.pool_timeout,
+                    "pool_recycle": cfg.pool_recycle,
+                    "pool_pre_ping": cfg.pool_pre_ping,
                 }
             )
 
+        if make_url(cfg.url).get_driver_name() == "asyncpg":
+            engine_args["connect_args"] = cfg.asyncpg_connect_args
+
         # Create async engine
         return create_async_engine(
-            settings.DATABASE_URL,
+            cfg.url,
             **engine_args,
         )
 
@@ -111,20 +131,34 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency for getting database sessions.
 
+    Nothing is committed implicitly, so read-only routes never send a COMMIT.
+    Routes that write either commit themselves or depend on get_db_tx;
+    anything left uncommitted is rolled back when the session closes.
+
     Usage:
         @router.get("/items")
         async def get_items(db: AsyncSession = Depends(get_db)):
             ...
     """
     async with db_manager.session_factory() as session:
-        try:
+        yield session
+
+
+async def get_db_tx() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for mutating routes that run in a single transaction.
+
+    The transaction is committed when the route returns and rolled back if
+    it raises.
+
+    Usage:
+        @router.post("/items")
+        async def create_item(db: AsyncSession = Depends(get_db_tx)):
+            ...
+    """
+    async with db_manager.session_factory() as session:
+        async with session.begin():
             yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
 
 
 @asynccontextmanager
@@ -149,20 +183,36 @@ async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
 
 async def init_db() -> None:
     """Initialize the database connection pool."""
+    # The engine connects lazily on the first real query, so only probe
+    # eagerly outside production to surface misconfiguration early.
+    if settings.APP_ENV == "production":
+        return
+
     # Prime the connection pool
     async with db_manager.engine.begin() as conn:
         # Just verify the connection works
-        await conn.execute("SELECT 1")
+        await conn.execute(text("SELECT 1"))
 
 
 async def health_check() -> bool:
     """Check if the database connection is healthy."""
-    try:
-        async with db_manager.engine.begin() as conn:
-            await conn.execute("SELECT 1")
+    global _last_ok_ts
+
+    if time.monotonic() - _last_ok_ts < HEALTH_CHECK_TTL:
+        return True
+
+    async with _health_lock:
+        # Another caller may have refreshed the result while we waited
+        if time.monotonic() - _last_ok_ts < HEALTH_CHECK_TTL:
+            return True
+        try:
+            async with db_manager.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except Exception:
+            _last_ok_ts = 0.0
+            return False
+        _last_ok_ts = time.monotonic()
         return True
-    except Exception:
-        return False
 
 
 # Async session type for dependency injection
@@ -1,35 +1,48 @@
 """
 Main application entry point for Vibe PDF Platform.
 """
-import os
+import asyncio
 from contextlib import asynccontextmanager
+from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.core.config import settings
+from app.core.config import settings, API_V1_PREFIX, CORS_ORIGINS
 from app.core.database import engine, Base
+from app.core.redis_client import close_redis
 from app.routers import auth, users, ebooks, progress, reviews, generation, books, profile, mcp
 from app.middleware.logging import LoggingMiddleware
 
+# Upload directories
+UPLOAD_DIR = Path(getattr(settings, "UPLOAD_DIR", "/tmp/vibepdf/uploads"))
+UPLOAD_SUBDIRS = ("avatars", "books", "files")
+
+
+def _create_upload_dirs() -> None:
+    """Create the upload directory tree (blocking; run in a worker thread)."""
+    for sub in UPLOAD_SUBDIRS:
+        (UPLOAD_DIR / sub).mkdir(parents=True, exist_ok=True)
+
 
 # Create tables on startup
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup
-    async with engine.begin() as conn:
-        # Create tables if they don't exist
-        await conn.run_sync(Base.metadata.create_all)
+    # Alembic owns the schema everywhere else; create_all is a development
+    # convenience only, since it introspects pg_catalog on every boot.
+    if settings.APP_ENV == "development" and not settings.TESTING:
+        async with engine.begin() as conn:
+            # Create tables if they don't exist
+            await conn.run_sync(Base.metadata.create_all)
     
-    # Upload directories
-    upload_dir = getattr(settings, "UPLOAD_DIR", "/tmp/vibepdf/uploads")
-    os.makedirs(os.path.join(upload_dir, "avatars"), exist_ok=True)
-    os.makedirs(os.path.join(upload_dir, "books"), exist_ok=True)
-    os.makedirs(os.path.join(upload_dir, "files"), exist_ok=True)
+    # Upload directories, created off the event loop
+    await asyncio.to_thread(_create_upload_dirs)
     
     yield
     
     # Shutdown
+    await close_redis()
     await engine.dispose()
 
 
@@ -44,7 +57,7 @@ app = FastAPI(
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -53,21 +66,19 @@ app.add_middleware(
 # Logging middleware
 app.add_middleware(LoggingMiddleware)
 
-# Static files
-upload_dir = getattr(settings, "UPLOAD_DIR", "/tmp/vibepdf/uploads")
-if os.path.exists(upload_dir):
-    app.mount("/uploads", StaticFiles(directory=upload_dir), name="uploads")
+# Static files (the directory is created in lifespan, after the mount)
+app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR, check_dir=False), name="uploads")
 
 # Include routers
-app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
-app.include_router(users.router, prefix=settings.API_V1_PREFIX)
-app.include_router(ebooks.router, prefix=settings.API_V1_PREFIX)
-app.include_router(progress.router, prefix=settings.API_V1_PREFIX)
-app.include_router(reviews.router, prefix=settings.API_V1_PREFIX)
-app.include_router(generation.router, prefix=settings.API_V1_PREFIX)
-app.include_router(books.router, prefix=settings.API_V1_PREFIX)
-app.include_router(profile.router, prefix=settings.API_V1_PREFIX)
-app.include_router(mcp.router, prefix=settings.API_V1_PREFIX)
+app.include_router(auth.router, prefix=API_V1_PREFIX)
+app.include_router(users.router, prefix=API_V1_PREFIX)
+app.include_router(ebooks.router, prefix=API_V1_PREFIX)
+app.include_router(progress.router, prefix=API_V1_PREFIX)
+app.include_router(reviews.router, prefix=API_V1_PREFIX)
+app.include_router(generation.router, prefix=API_V1_PREFIX)
+app.include_router(books.router, prefix=API_V1_PREFIX)
+app.include_router(profile.router, prefix=API_V1_PREFIX)
+app.include_router(mcp.router, prefix=API_V1_PREFIX)
 
 
 # Health check endpoint
@@ -5,51 +5,163 @@ Provides comprehensive request/response logging with correlation IDs,
 performance metrics, and structured JSON output for production observability.
 """
 
-import json
+import atexit
+import io
 import logging
+import queue
+import sys
 import time
 import uuid
 from contextvars import ContextVar
-from typing import Any, Callable, Optional
+from typing import Any, Optional
 
-from fastapi import FastAPI, Request, Response
+import orjson
+from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# picologging is a C drop-in for the stdlib logging core; use it when it is
+# installed and fall back to the stdlib otherwise.
+try:
+    import picologging as _logging
+    from picologging.handlers import QueueHandler, QueueListener
+except ImportError:
+    _logging = logging
+    from logging.handlers import QueueHandler, QueueListener
 
 # Context variable for storing request-specific data
 request_id_var: ContextVar[str] = ContextVar("request_id", default="")
 user_id_var: ContextVar[Optional[str]] = ContextVar("user_id", default=None)
 
 
+def _encode(payload: dict[str, Any]) -> str:
+    """Encode a log payload as compact JSON."""
+    # orjson serializes datetimes and UUIDs natively; anything else falls
+    # back to its string form rather than dropping the log line.
+    return orjson.dumps(payload, default=str, option=orjson.OPT_UTC_Z).decode()
+
+
+# (epoch second, formatted timestamp) of the last formatted second
+_TS_CACHE: list = [0, ""]
+
+
+def _utc_ts() -> str:
+    """Return the current UTC time as ISO-8601, formatted at most once a second."""
+    now = int(time.time())
+    if now != _TS_CACHE[0]:
+        _TS_CACHE[0] = now
+        _TS_CACHE[1] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+    return _TS_CACHE[1]
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    Queue handler that enqueues records untouched.
+
+    The stock handler formats each record in the calling thread; here JSON
+    encoding is left to the listener thread along with the write.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+_LOG_QUEUE: queue.SimpleQueue = queue.SimpleQueue()
+_queue_handler: Optional[_RecordQueueHandler] = None
+
+# Size of the write buffer in front of stderr
+LOG_BUFFER_SIZE = 65536
+
+
+class _BufferedStreamHandler(_logging.Handler):
+    """
+    Stream handler that batches writes into a buffered stream.
+
+    It runs on the listener thread and flushes only once the queue is
+    drained, so a burst of records costs one write() instead of one each.
+    """
+
+    def __init__(self, stream: io.TextIOBase):
+        super().__init__()
+        self.stream = stream
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + "\n")
+            if _LOG_QUEUE.empty():
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _buffered_stderr() -> io.TextIOBase:
+    """Return a block-buffered text stream over stderr's file descriptor."""
+    try:
+        return io.open(
+            sys.stderr.fileno(), "w", buffering=LOG_BUFFER_SIZE, encoding="utf-8", closefd=False
+        )
+    except (AttributeError, OSError, ValueError):
+        # stderr replaced by an object without a real descriptor
+        return sys.stderr
+
+
+def _get_queue_handler() -> _RecordQueueHandler:
+    """Return the shared queue handler, starting the writer thread on first use."""
+    global _queue_handler
+    if _queue_handler is None:
+        # Console handler with JSON formatter, driven by a single listener
+        # thread so stream writes stay off the request path
+        console_handler = _BufferedStreamHandler(_buffered_stderr())
+        console_handler.setFormatter(JsonFormatter())
+        listener = QueueListener(_LOG_QUEUE, console_handler)
+        listener.start()
+        # On interpreter exit, drain queued records, then flush the buffer
+        # (atexit runs callbacks in reverse order of registration)
+        atexit.register(console_handler.flush)
+        atexit.register(listener.stop)
+        _queue_handler = _RecordQueueHandler(_LOG_QUEUE)
+    return _queue_handler
+
+
 class StructuredLogger:
     """
     Structured logger with JSON output for production environments.
     """
     
     def __init__(self, name: str, level: int = logging.INFO):
-        self.logger = logging.getLogger(name)
+        self.logger = _logging.getLogger(name)
         self.logger.setLevel(level)
         self._setup_handlers()
     
     def _setup_handlers(self):
         """Configure handlers for structured logging."""
-        # Console handler with JSON formatter
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(JsonFormatter())
-        self.logger.addHandler(console_handler)
+        # The underlying logger is shared per name; configure it only once
+        if self.logger.handlers:
+            return
+        # Records are fully handled here, not again by ancestor handlers
+        self.logger.propagate = False
+
+        self.logger.addHandler(_get_queue_handler())
     
     def _build_log(
         self,
         level: str,
         message: str,
-        extra: Optional[dict[str, Any]] = None
+        extra: Optional[dict[str, Any]] = None,
+        args: tuple[Any, ...] = (),
     ) -> dict[str, Any]:
-        """Build structured log message."""
+        """Build structured log message.
+        
+        `args` are %-style arguments for `message`; level methods only get
+        here once the level is enabled, so the interpolation is never wasted.
+        """
         log_data = {
-            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "timestamp": _utc_ts(),
             "level": level,
-            "message": message,
+            "message": message % args if args else message,
             "request_id": request_id_var.get(),
             "user_id": user_id_var.get(),
         }
@@ -59,54 +171,63 @@ class StructuredLogger:
         
         return log_data
     
-    def debug(self, message: str, **kwargs: Any):
+    def debug(self, message: str, *args: Any, **kwargs: Any):
         """Log debug message."""
-        self.logger.debug(json.dumps(self._build_log("DEBUG", message, kwargs)))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(self._build_log("DEBUG", message, kwargs, args))
     
-    def info(self, message: str, **kwargs: Any):
+    def info(self, message: str, *args: Any, **kwargs: Any):
         """Log info message."""
-        self.logger.info(json.dumps(self._build_log("INFO", message, kwargs)))
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(self._build_log("INFO", message, kwargs, args))
     
-    def warning(self, message: str, **kwargs: Any):
+    def warning(self, message: str, *args: Any, **kwargs: Any):
         """Log warning message."""
-        self.logger.warning(json.dumps(self._build_log("WARNING", message, kwargs)))
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(self._build_log("WARNING", message, kwargs, args))
     
-    def error(self, message: str, **kwargs: Any):
+    def error(self, message: str, *args: Any, **kwargs: Any):
         """Log error message."""
-        self.logger.error(json.dumps(self._build_log("ERROR", message, kwargs)))
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.error(self._build_log("ERROR", message, kwargs, args))
     
-    def critical(self, message: str, **kwargs: Any):
+    def critical(self, message: str, *args: Any, **kwargs: Any):
         """Log critical message."""
-        self.logger.critical(json.dumps(self._build_log("CRITICAL", message, kwargs)))
+        if self.logger.isEnabledFor(logging.CRITICAL):
+            self.logger.critical(self._build_log("CRITICAL", message, kwargs, args))
     
-    def exception(self, message: str, **kwargs: Any):
+    def exception(self, message: str, *args: Any, **kwargs: Any):
         """Log exception with traceback."""
-        self.logger.exception(json.dumps(self._build_log("ERROR", message, kwargs)))
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.exception(self._build_log("ERROR", message, kwargs, args))
 
 
-class JsonFormatter(logging.Formatter):
+class JsonFormatter(_logging.Formatter):
     """
     Custom JSON formatter for structured logging.
     """
     
-    def format(self, record: logging.LogRecord) -> str:
+    def format(self, record: _logging.LogRecord) -> str:
         """Format log record as JSON."""
-        try:
-            log_data = json.loads(record.getMessage())
-            return json.dumps(log_data)
-        except json.JSONDecodeError:
-            return json.dumps({
-                "timestamp": self.formatTime(record),
-                "level": record.levelname,
-                "message": record.getMessage(),
-                "logger": record.name,
-            })
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
+        # StructuredLogger passes the ready-built payload as the record
+        # message. (picologging drops `extra`, so it cannot ride there.)
+        if isinstance(record.msg, dict):
+            return _encode(record.msg)
+        return _encode({
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(record.created)),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "logger": record.name,
+        })
+
+
+class LoggingMiddleware:
     """
     FastAPI middleware for comprehensive request/response logging.
     
+    Implemented as a plain ASGI middleware rather than BaseHTTPMiddleware,
+    which runs every request through an extra task and memory stream.
+    
     Features:
     - Request ID correlation
     - Performance metrics
@@ -122,20 +243,23 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         log_response_body: bool = False,
         exclude_paths: Optional[list[str]] = None,
     ):
-        super().__init__(app)
-        self.logger = logger or StructuredLogger("vibe-pdf")
+        self.app = app
+        self.logger = logger or get_logger("vibe-pdf")
         self.log_request_body = log_request_body
         self.log_response_body = log_response_body
         self.exclude_paths = exclude_paths or ["/health", "/metrics", "/favicon.ico"]
     
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[..., Any]
-    ) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request and log details."""
-        # Generate or extract request ID
-        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope)
+        
+        # Generate or extract request ID (dashless hex; IDs are only used
+        # for correlation)
+        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
         request_id_var.set(request_id)
         
         # Start timing
@@ -145,14 +269,18 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         request_info = {
             "method": request.method,
             "path": request.url.path,
-            "query_params": dict(request.query_params),
             "client_ip": request.client.host if request.client else None,
             "user_agent": request.headers.get("user-agent"),
         }
+        if scope["query_string"]:
+            request_info["query_params"] = dict(request.query_params)
         
-        # Log request
+        # Log request (with its own copy: records are encoded later, on the
+        # listener thread, and request_info is reused for the final log)
         self.logger.info(
-            f"Request started: {request.method} {request.url.path}",
+            "Request started: %s %s",
+            request_info["method"],
+            request_info["path"],
             extra={
                 **request_info,
                 "type": "request_start",
@@ -160,11 +288,24 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         )
         
         # Process request
-        response: Optional[Response] = None
+        status_code: Optional[int] = None
         error: Optional[Exception] = None
+        request_id_header = (b"x-request-id", request_id.encode("latin-1"))
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add request ID to response headers by appending the raw
+                # header pair instead of wrapping them in MutableHeaders
+                headers = message.setdefault("headers", [])
+                if not isinstance(headers, list):
+                    headers = message["headers"] = list(headers)
+                headers.append(request_id_header)
+            await send(message)
         
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             error = e
             raise
@@ -173,58 +314,59 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             duration = time.perf_counter() - start_time
             duration_ms = round(duration * 1000, 2)
             
-            # Build response log
-            response_info = {
-                "status_code": response.status_code if response else 500,
-                "duration_ms": duration_ms,
-                "request_id": request_id,
-            }
+            # Build response log on top of the request fields
+            log_extra = request_info
+            log_extra["status_code"] = status_code if status_code is not None else 500
+            log_extra["duration_ms"] = duration_ms
+            log_extra["request_id"] = request_id
             
             if error:
+                log_extra["error_type"] = type(error).__name__
+                log_extra["error_message"] = str(error)
+                log_extra["type"] = "request_error"
                 self.logger.error(
-                    f"Request failed: {request.method} {request.url.path}",
-                    extra={
-                        **request_info,
-                        **response_info,
-                        "error_type": type(error).__name__,
-                        "error_message": str(error),
-                        "type": "request_error",
-                    }
+                    "Request failed: %s %s",
+                    log_extra["method"],
+                    log_extra["path"],
+                    extra=log_extra,
                 )
             else:
-                log_level = "info" if response.status_code < 400 else "warning"
-                getattr(self.logger, log_level)(
-                    f"Request completed: {request.method} {request.url.path}",
-                    extra={
-                        **request_info,
-                        **response_info,
-                        "type": "request_complete",
-                    }
+                log_extra["type"] = "request_complete"
+                log = self.logger.info if log_extra["status_code"] < 400 else self.logger.warning
+                log(
+                    "Request completed: %s %s",
+                    log_extra["method"],
+                    log_extra["path"],
+                    extra=log_extra,
                 )
-        
-        # Add request ID to response headers
-        if response:
-            response.headers["X-Request-ID"] = request_id
-        
-        return response
+
+
+_LOGGERS: dict[str, StructuredLogger] = {}
 
 
 def get_logger(name: str) -> StructuredLogger:
-    """Get a structured logger instance."""
-    return StructuredLogger(name)
+    """Get the structured logger instance for `name`, creating it once."""
+    logger = _LOGGERS.get(name)
+    if logger is None:
+        logger = _LOGGERS[name] = StructuredLogger(name)
+    return logger
+
+
+# Loggers used by the helpers below, resolved once at import
+_startup_logger = get_logger("vibe-pdf.startup")
+_health_logger = get_logger("vibe-pdf.health")
+_error_logger = get_logger("vibe-pdf.errors")
 
 
 # Application lifecycle logging
 async def log_startup(app: FastAPI):
     """Log application startup."""
-    logger = get_logger("vibe-pdf.startup")
-    logger.info("Application starting up")
+    _startup_logger.info("Application starting up")
 
 
 async def log_shutdown(app: FastAPI):
     """Log application shutdown."""
-    logger = get_logger("vibe-pdf.startup")
-    logger.info("Application shutting down")
+    _startup_logger.info("Application shutting down")
 
 
 # Health check logging utility
@@ -235,9 +377,10 @@ async def log_health_check(
     details: Optional[dict[str, Any]] = None
 ):
     """Log health check result."""
-    logger = get_logger("vibe-pdf.health")
-    logger.info(
-        f"Health check: {name} - {status}",
+    _health_logger.info(
+        "Health check: %s - %s",
+        name,
+        status,
         extra={
             "check_name": name,
             "status": status,
@@ -254,9 +397,9 @@ async def log_error(
     context: Optional[dict[str, Any]] = None
 ):
     """Log error with context."""
-    logger = get_logger("vibe-pdf.errors")
-    logger.error(
-        f"Error occurred: {type(error).__name__}",
+    _error_logger.error(
+        "Error occurred: %s",
+        type(error).__name__,
         extra={
             "error_type": type(error).__name__,
             "error_message": str(error),
@@ -5,7 +5,9 @@ from app.models.user import (
     EmailVerification,
     PasswordReset,
     Ebook,
+    EbookVersion,
     Chapter,
+    ChapterContent,
     Review,
     ReviewReaction,
     ReadingProgress,
@@ -21,8 +23,8 @@ from app.models.generation_task import (
     GenerationType,
 )
 from app.models.oauth import OAuthAccount
+from app.models.stored_file import StoredFile
 from app.models.user_session import UserSession
-from app.models.book import Book, BookChapter
 
 __all__ = [
     # User models
@@ -32,9 +34,9 @@ __all__ = [
     "PasswordReset",
     # Book models
     "Ebook",
-    "Book",
+    "EbookVersion",
     "Chapter",
-    "BookChapter",
+    "ChapterContent",
     "BookStatus",
     # Review models
     "Review",
@@ -52,6 +54,8 @@ __all__ = [
     "GenerationType",
     # OAuth models
     "OAuthAccount",
+    # File models
+    "StoredFile",
     # Session models
     "UserSession",
 ]
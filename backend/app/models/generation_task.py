@@ -1,7 +1,5 @@
 """Generation task models."""
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, DateTime, Text, SmallInteger, ForeignKey, CheckConstraint, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 import enum
@@ -29,16 +27,16 @@ class GenerationTask(Base):
     """Generation task model for async book generation."""
     __tablename__ = "generation_tasks"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Task details
-    task_type = Column(SQLEnum(GenerationType), nullable=False)
-    status = Column(SQLEnum(GenerationStatus), default=GenerationStatus.PENDING)
+    task_type = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default=GenerationStatus.PENDING.value)
     
     # Input parameters
     prompt = Column(Text, nullable=True)
-    parameters = Column(JSONB, default=dict)
+    parameters = Column(JSONB, server_default=text("'{}'::jsonb"), nullable=False)
     
     # Output
     result = Column(JSONB, nullable=True)
@@ -46,13 +44,27 @@ class GenerationTask(Base):
     error_message = Column(Text, nullable=True)
     
     # Progress tracking
-    progress_percent = Column(Integer, default=0)
+    progress_percent = Column(SmallInteger, default=0)
     current_step = Column(String(255), nullable=True)
     
     # Celery task ID for tracking
     celery_task_id = Column(String(255), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    user = relationship("User", back_populates="generation_tasks")
+    
+    __table_args__ = (
+        CheckConstraint(
+            "task_type IN ('full_book', 'chapter', 'summary', 'outline')",
+            name="ck_generation_task_type",
+        ),
+        CheckConstraint(
+            "status IN ('pending', 'processing', 'completed', 'failed', 'cancelled')",
+            name="ck_generation_task_status",
+        ),
+    )
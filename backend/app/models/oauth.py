@@ -1,7 +1,5 @@
 """OAuth account models."""
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, Boolean, ForeignKey, Index, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -11,7 +9,7 @@ class OAuthAccount(Base):
     """OAuth account model for storing third-party OAuth credentials."""
     __tablename__ = "oauth_accounts"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # OAuth provider
@@ -25,19 +23,21 @@ class OAuthAccount(Base):
     token_type = Column(String(50), default="Bearer")
     
     # Additional provider data
-    provider_data = Column(JSONB, default=dict)
+    provider_data = Column(JSONB, server_default=text("'{}'::jsonb"), nullable=False)
     
     # Scope granted by user
-    scope = Column(JSONB, default=list)
+    scope = Column(JSONB, server_default=text("'[]'::jsonb"), nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="oauth_accounts")
     
     # Unique constraint on provider + provider_account_id
     __table_args__ = (
+        UniqueConstraint("provider", "provider_account_id", name="uq_oauth_provider_account"),
+        Index("ix_oauth_user_provider", "user_id", "provider"),
         {"sqlite_autoincrement": True},
     )
@@ -0,0 +1,22 @@
+"""Stored file models."""
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class StoredFile(Base):
+    """Metadata for a file uploaded or produced through the MCP endpoints."""
+    __tablename__ = "stored_files"
+    
+    file_id = Column(String(36), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    # File details
+    file_name = Column(String(500), nullable=False)
+    mime_type = Column(String(255), nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    file_path = Column(String(1000), nullable=False)
+    
+    # Timestamps
+    created_time = Column(DateTime(timezone=True), server_default=func.now())
+    modified_time = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,7 +1,5 @@
 """Database models."""
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, Float, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Integer, SmallInteger, Float, LargeBinary, ForeignKey, Index, CheckConstraint, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 import enum
@@ -26,7 +24,7 @@ class User(Base):
     """User model."""
     __tablename__ = "users"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     email = Column(String(255), unique=True, index=True, nullable=False)
     username = Column(String(100), unique=True, index=True, nullable=True)
     hashed_password = Column(String(255), nullable=True)  # Nullable for OAuth users
@@ -35,7 +33,7 @@ class User(Base):
     bio = Column(Text, nullable=True)
     
     # Profile settings
-    profile_visibility = Column(SQLEnum(UserProfileVisibility), default=UserProfileVisibility.PUBLIC)
+    profile_visibility = Column(String(20), nullable=False, default=UserProfileVisibility.PUBLIC.value)
     
     # Auth status
     is_active = Column(Boolean, default=True)
@@ -43,8 +41,8 @@ class User(Base):
     is_superuser = Column(Boolean, default=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     last_login = Column(DateTime, nullable=True)
     
     # OAuth fields
@@ -61,17 +59,24 @@ class User(Base):
     generation_tasks = relationship("GenerationTask", back_populates="user", cascade="all, delete-orphan")
     oauth_accounts = relationship("OAuthAccount", back_populates="user", cascade="all, delete-orphan")
     sessions = relationship("UserSession", back_populates="user", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        CheckConstraint(
+            "profile_visibility IN ('public', 'private', 'friends')",
+            name="ck_user_profile_visibility",
+        ),
+    )
 
 
 class RefreshToken(Base):
     """Refresh token model."""
     __tablename__ = "refresh_tokens"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    token = Column(String(500), unique=True, index=True, nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(LargeBinary(32), unique=True, index=True, nullable=False)  # sha256 of the token
     expires_at = Column(DateTime, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     is_revoked = Column(Boolean, default=False)
     
     # Relationships
@@ -82,11 +87,11 @@ class EmailVerification(Base):
     """Email verification token model."""
     __tablename__ = "email_verifications"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    token = Column(String(255), unique=True, index=True, nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(LargeBinary(32), unique=True, index=True, nullable=False)  # sha256 of the token
     expires_at = Column(DateTime, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     is_used = Column(Boolean, default=False)
     
     # Relationships
@@ -97,11 +102,11 @@ class PasswordReset(Base):
     """Password reset token model."""
     __tablename__ = "password_resets"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    token = Column(String(255), unique=True, index=True, nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(LargeBinary(32), unique=True, index=True, nullable=False)  # sha256 of the token
     expires_at = Column(DateTime, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     is_used = Column(Boolean, default=False)
     
     # Relationships
@@ -112,21 +117,20 @@ class Ebook(Base):
     """Ebook model."""
     __tablename__ = "ebooks"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    author_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    author_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     title = Column(String(500), nullable=False)
     description = Column(Text, nullable=True)
     cover_image_url = Column(String(500), nullable=True)
-    status = Column(SQLEnum(BookStatus), default=BookStatus.DRAFT)
+    status = Column(String(20), nullable=False, default=BookStatus.DRAFT.value)
     
     # Content
     content = Column(Text, nullable=True)
     genre = Column(String(100), nullable=True)
-    tags = Column(JSONB, default=list)
+    tags = Column(JSONB, server_default=text("'[]'::jsonb"), nullable=False)
     
-    # Versioning
+    # Versioning; earlier versions are kept in ebook_versions
     version = Column(Integer, default=1)
-    previous_versions = Column(JSONB, default=list)
     
     # Stats
     view_count = Column(Integer, default=0)
@@ -135,51 +139,139 @@ class Ebook(Base):
     rating_count = Column(Integer, default=0)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     published_at = Column(DateTime, nullable=True)
     
     # Relationships
     author = relationship("User", back_populates="ebooks")
-    chapters = relationship("Chapter", back_populates="ebook", cascade="all, delete-orphan")
+    # Load explicitly with selectinload(Ebook.chapters) where needed
+    chapters = relationship(
+        "Chapter",
+        back_populates="ebook",
+        order_by="Chapter.chapter_number",
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
     reviews = relationship("Review", back_populates="ebook", cascade="all, delete-orphan")
     reading_progress = relationship("ReadingProgress", back_populates="ebook", cascade="all, delete-orphan")
     bookmarks = relationship("Bookmark", back_populates="ebook", cascade="all, delete-orphan")
     highlights = relationship("Highlight", back_populates="ebook", cascade="all, delete-orphan")
     notes = relationship("Note", back_populates="ebook", cascade="all, delete-orphan")
+    versions = relationship(
+        "EbookVersion",
+        back_populates="ebook",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    
+    __table_args__ = (
+        CheckConstraint("status IN ('draft', 'published', 'archived')", name="ck_ebook_status"),
+        # Serve title/description ILIKE '%term%' searches (requires pg_trgm)
+        Index(
+            "ix_ebooks_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_ebooks_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+    )
+
+
+class EbookVersion(Base):
+    """Earlier version of an ebook's content, one row per version.
+    
+    A row holds either the full content or, when delta is set, a line
+    delta against the next stored version (see app.core.versioning).
+    """
+    __tablename__ = "ebook_versions"
+    
+    ebook_id = Column(UUID(as_uuid=True), ForeignKey("ebooks.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, primary_key=True)
+    content = Column(Text, nullable=True)
+    delta = Column(JSONB(none_as_null=True), nullable=True)
+    # When this version was replaced
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    ebook = relationship("Ebook", back_populates="versions")
 
 
 class Chapter(Base):
     """Chapter model."""
     __tablename__ = "chapters"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     ebook_id = Column(UUID(as_uuid=True), ForeignKey("ebooks.id", ondelete="CASCADE"), nullable=False)
-    chapter_number = Column(Integer, nullable=False)
+    chapter_number = Column(SmallInteger, nullable=False)
     title = Column(String(500), nullable=False)
-    content = Column(Text, nullable=True)
     
     # Versioning
     version = Column(Integer, default=1)
-    previous_versions = Column(JSONB, default=list)
+    previous_versions = Column(JSONB, server_default=text("'[]'::jsonb"), nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     ebook = relationship("Ebook", back_populates="chapters")
+    # The chapter text lives in chapter_bodies so listing and navigation
+    # queries never touch it. Load it explicitly with
+    # joinedload/selectinload(Chapter.body) where the content is needed.
+    body = relationship(
+        "ChapterContent",
+        back_populates="chapter",
+        uselist=False,
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    
+    __table_args__ = (
+        # Also serves ebook_id lookups and ordering by chapter_number
+        UniqueConstraint("ebook_id", "chapter_number", name="uq_chapter_number_per_book"),
+    )
+    
+    @property
+    def content(self):
+        """Chapter text, read from and written to the side table."""
+        return self.body.content if self.body is not None else None
+    
+    @content.setter
+    def content(self, value):
+        if self.body is None:
+            self.body = ChapterContent(content=value)
+        else:
+            self.body.content = value
+
+
+class ChapterContent(Base):
+    """Chapter content model, split from chapters to keep that table narrow."""
+    __tablename__ = "chapter_bodies"
+    
+    chapter_id = Column(UUID(as_uuid=True), ForeignKey("chapters.id", ondelete="CASCADE"), primary_key=True)
+    content = Column(Text, nullable=True)
+    
+    # Relationships
+    chapter = relationship("Chapter", back_populates="body")
 
 
 class Review(Base):
     """Review model."""
     __tablename__ = "reviews"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     ebook_id = Column(UUID(as_uuid=True), ForeignKey("ebooks.id", ondelete="CASCADE"), nullable=False)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
-    rating = Column(Integer, nullable=False)  # 1-5
+    rating = Column(SmallInteger, nullable=False)  # 1-5
     title = Column(String(255), nullable=True)
     content = Column(Text, nullable=True)
     
@@ -188,59 +280,71 @@ class Review(Base):
     is_featured = Column(Boolean, default=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     ebook = relationship("Ebook", back_populates="reviews")
     user = relationship("User", back_populates="reviews")
     reactions = relationship("ReviewReaction", back_populates="review", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_reviews_ebook_user", "ebook_id", "user_id", unique=True),
+    )
 
 
 class ReviewReaction(Base):
     """Review reaction model."""
     __tablename__ = "review_reactions"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     review_id = Column(UUID(as_uuid=True), ForeignKey("reviews.id", ondelete="CASCADE"), nullable=False)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     reaction_type = Column(String(50), nullable=False)  # "helpful", "funny", "insightful"
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     review = relationship("Review", back_populates="reactions")
     user = relationship("User")
+    
+    __table_args__ = (
+        Index("ix_review_reactions_review_user", "review_id", "user_id"),
+    )
 
 
 class ReadingProgress(Base):
     """Reading progress model."""
     __tablename__ = "reading_progress"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     ebook_id = Column(UUID(as_uuid=True), ForeignKey("ebooks.id", ondelete="CASCADE"), nullable=False)
     chapter_id = Column(UUID(as_uuid=True), ForeignKey("chapters.id", ondelete="CASCADE"), nullable=True)
     
     progress_percent = Column(Float, default=0.0)  # 0-100
     last_position = Column(Integer, default=0)  # Character position
-    last_read_at = Column(DateTime, default=datetime.utcnow)
+    last_read_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="reading_progress")
     ebook = relationship("Ebook", back_populates="reading_progress")
     chapter = relationship("Chapter")
+    
+    __table_args__ = (
+        Index("ix_progress_user_ebook", "user_id", "ebook_id", unique=True),
+    )
 
 
 class Bookmark(Base):
     """Bookmark model."""
     __tablename__ = "bookmarks"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     ebook_id = Column(UUID(as_uuid=True), ForeignKey("ebooks.id", ondelete="CASCADE"), nullable=False)
     chapter_id = Column(UUID(as_uuid=True), ForeignKey("chapters.id", ondelete="CASCADE"), nullable=True)
@@ -250,20 +354,24 @@ class Bookmark(Base):
     title = Column(String(255), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="bookmarks")
     ebook = relationship("Ebook", back_populates="bookmarks")
     chapter = relationship("Chapter")
+    
+    __table_args__ = (
+        Index("ix_bookmarks_user_ebook", "user_id", "ebook_id"),
+    )
 
 
 class Highlight(Base):
     """Highlight model."""
     __tablename__ = "highlights"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     ebook_id = Column(UUID(as_uuid=True), ForeignKey("ebooks.id", ondelete="CASCADE"), nullable=False)
     chapter_id = Column(UUID(as_uuid=True), ForeignKey("chapters.id", ondelete="CASCADE"), nullable=True)
@@ -275,20 +383,24 @@ class Highlight(Base):
     note = Column(Text, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="highlights")
     ebook = relationship("Ebook", back_populates="highlights")
     chapter = relationship("Chapter")
+    
+    __table_args__ = (
+        Index("ix_highlights_user_ebook", "user_id", "ebook_id"),
+    )
 
 
 class Note(Base):
     """Note model."""
     __tablename__ = "notes"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     ebook_id = Column(UUID(as_uuid=True), ForeignKey("ebooks.id", ondelete="CASCADE"), nullable=False)
     chapter_id = Column(UUID(as_uuid=True), ForeignKey("chapters.id", ondelete="CASCADE"), nullable=True)
@@ -298,10 +410,14 @@ class Note(Base):
     position = Column(Integer, nullable=True)  # Optional position in text
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="notes")
     ebook = relationship("Ebook", back_populates="notes")
     chapter = relationship("Chapter")
+    
+    __table_args__ = (
+        Index("ix_notes_user_ebook", "user_id", "ebook_id"),
+    )
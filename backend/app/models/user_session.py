@@ -1,7 +1,5 @@
 """User session models."""
-import uuid
-from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, ForeignKey, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -11,16 +9,16 @@ class UserSession(Base):
     """User session model for tracking active sessions."""
     __tablename__ = "user_sessions"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Session info
-    device_info = Column(JSONB, default=dict)  # {browser, os, device_type, ip}
+    device_info = Column(JSONB, server_default=text("'{}'::jsonb"), nullable=False)  # {browser, os, device_type, ip}
     ip_address = Column(String(45), nullable=True)  # IPv6 compatible
     user_agent = Column(Text, nullable=True)
     
     # Location (if available)
-    location = Column(JSONB, default=dict)  # {city, country, lat, lon}
+    location = Column(JSONB, server_default=text("'{}'::jsonb"), nullable=False)  # {city, country, lat, lon}
     
     # Session tokens
     session_token = Column(String(255), unique=True, index=True, nullable=False)
@@ -29,8 +27,8 @@ class UserSession(Base):
     is_active = Column(Boolean, default=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    last_active_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_active_at = Column(DateTime(timezone=True), server_default=func.now())
     expires_at = Column(DateTime, nullable=False)
     
     # Relationships
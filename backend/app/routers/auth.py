@@ -1,20 +1,30 @@
 """Authentication endpoints."""
+import base64
+import os
 import uuid
-import secrets
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, or_
+from sqlalchemy.exc import IntegrityError
+from redis.exceptions import RedisError
+from sqlalchemy.orm import joinedload, selectinload
 from app.core.database import get_db
 from app.core.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
     create_access_token,
     create_refresh_token,
     decode_token,
+    hash_token,
     get_current_user,
+    invalidate_cached_user,
+    load_user,
+    revoke_refresh_token,
+    revoke_user_refresh_tokens,
+    spend_refresh_token,
 )
 from app.core.config import settings
 from app.models.user import User, RefreshToken, EmailVerification, PasswordReset, UserProfileVisibility
@@ -36,14 +46,9 @@ from app.schemas.schemas import (
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-def generate_verification_token() -> str:
-    """Generate a secure verification token."""
-    return secrets.token_urlsafe(32)
-
-
-def generate_password_reset_token() -> str:
-    """Generate a secure password reset token."""
-    return secrets.token_urlsafe(32)
+def _new_token(prefix: str) -> str:
+    """Generate a secure single-use token (192 bits) tagged with its purpose."""
+    return prefix + base64.urlsafe_b64encode(os.urandom(24)).rstrip(b"=").decode("ascii")
 
 
 async def send_verification_email(email: str, token: str):
@@ -62,51 +67,60 @@ async def send_password_reset_email(email: str, token: str):
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """Register a new user."""
-    # Check if email already exists
-    result = await db.execute(select(User).where(User.email == user_data.email))
-    if result.scalar_one_or_none():
+    # Check email and username uniqueness in a single round-trip
+    conditions = [User.email == user_data.email]
+    if user_data.username:
+        conditions.append(User.username == user_data.username)
+    result = await db.execute(
+        select(User.email, User.username).where(or_(*conditions)).limit(2)
+    )
+    existing = result.all()
+    if any(row.email == user_data.email for row in existing):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
-    # Check if username already exists (if provided)
-    if user_data.username:
-        result = await db.execute(select(User).where(User.username == user_data.username))
-        if result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already taken"
+        )
     
     # Create user
     user = User(
         email=user_data.email,
         username=user_data.username,
         full_name=user_data.full_name,
-        hashed_password=hash_password(user_data.password),
+        hashed_password=await hash_password_async(user_data.password),
         is_active=True,
         is_verified=False,  # Requires email verification
     )
     
-    db.add(user)
-    await db.flush()
-    
-    # Generate verification token
-    verification_token = generate_verification_token()
+    # Generate verification token; the relationship lets both rows go out
+    # in the same flush as the user
+    verification_token = _new_token("vr_")
     email_verification = EmailVerification(
-        user_id=user.id,
-        token=verification_token,
+        user=user,
+        token_hash=hash_token(verification_token),
         expires_at=datetime.utcnow() + timedelta(days=7)
     )
-    db.add(email_verification)
-    await db.commit()
+    db.add_all([user, email_verification])
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Lost a race against a concurrent registration
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email or username already registered"
+        )
     
-    # Send verification email
-    await send_verification_email(user.email, verification_token)
+    # Send verification email after the response is returned
+    background_tasks.add_task(send_verification_email, user.email, verification_token)
     
     return user
 
@@ -131,7 +145,7 @@ async def login(
         )
     
     # Verify password
-    if not verify_password(login_data.password, user.hashed_password):
+    if not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -143,9 +157,14 @@ async def login(
             detail="Account is disabled"
         )
     
+    # Upgrade hashes made with a previous BCRYPT_COST while the plain
+    # password is at hand
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(login_data.password)
+    
     # Update last login
-    user.last_login = datetime.utcnow()
-    await db.commit()
+    now = datetime.utcnow()
+    user.last_login = now
     
     # Generate tokens
     access_token = create_access_token(data={"sub": str(user.id)})
@@ -154,8 +173,8 @@ async def login(
     # Store refresh token
     db_refresh_token = RefreshToken(
         user_id=user.id,
-        token=refresh_token,
-        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        token_hash=hash_token(refresh_token),
+        expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     )
     db.add(db_refresh_token)
     await db.commit()
@@ -179,6 +198,24 @@ async def login_oauth2(
     )
 
 
+async def _revoke_stored_refresh_token(db: AsyncSession, token: str, user_id) -> bool:
+    """Revoke a refresh token recorded in the database; False if not usable."""
+    result = await db.execute(
+        select(RefreshToken).where(
+            RefreshToken.token_hash == hash_token(token),
+            RefreshToken.user_id == user_id,
+            RefreshToken.is_revoked == False
+        )
+    )
+    stored_token = result.scalar_one_or_none()
+    
+    if not stored_token or stored_token.expires_at < datetime.utcnow():
+        return False
+    
+    stored_token.is_revoked = True
+    return True
+
+
 # Refresh token
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(
@@ -196,28 +233,26 @@ async def refresh_token(
     
     user_id = payload.get("sub")
     
-    # Check if token exists and is valid
-    result = await db.execute(
-        select(RefreshToken).where(
-            RefreshToken.token == token_data.refresh_token,
-            RefreshToken.user_id == user_id,
-            RefreshToken.is_revoked == False
-        )
-    )
-    stored_token = result.scalar_one_or_none()
+    if "jti" in payload:
+        # Each refresh token can be spent once; this is checked in Redis only
+        try:
+            valid = await spend_refresh_token(payload)
+        except RedisError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Token service unavailable"
+            )
+    else:
+        # Tokens issued before jti rotation are checked against the table
+        valid = await _revoke_stored_refresh_token(db, token_data.refresh_token, user_id)
     
-    if not stored_token or stored_token.expires_at < datetime.utcnow():
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token"
         )
     
-    # Revoke old token
-    stored_token.is_revoked = True
-    
-    # Get user
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await load_user(db, user_id)
     
     if not user or not user.is_active:
         raise HTTPException(
@@ -229,10 +264,10 @@ async def refresh_token(
     access_token = create_access_token(data={"sub": str(user.id)})
     new_refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
-    # Store new refresh token
+    # Record the new refresh token (kept for auditing and logout)
     db_refresh_token = RefreshToken(
         user_id=user.id,
-        token=new_refresh_token,
+        token_hash=hash_token(new_refresh_token),
         expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     )
     db.add(db_refresh_token)
@@ -252,10 +287,17 @@ async def logout(
     db: AsyncSession = Depends(get_db)
 ):
     """Logout and revoke refresh token."""
+    try:
+        payload = decode_token(token_data.refresh_token)
+    except HTTPException:
+        payload = {}
+    if "jti" in payload and payload.get("sub") == str(current_user.id):
+        await revoke_refresh_token(payload)
+    
     # Revoke the refresh token
     result = await db.execute(
         select(RefreshToken).where(
-            RefreshToken.token == token_data.refresh_token,
+            RefreshToken.token_hash == hash_token(token_data.refresh_token),
             RefreshToken.user_id == current_user.id
         )
     )
@@ -264,6 +306,7 @@ async def logout(
     if stored_token:
         stored_token.is_revoked = True
         await db.commit()
+    await invalidate_cached_user(current_user.id)
     
     return MessageResponse(message="Logged out successfully")
 
@@ -272,6 +315,7 @@ async def logout(
 @router.post("/password-reset", response_model=MessageResponse)
 async def request_password_reset(
     request: PasswordResetRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """Request password reset."""
@@ -282,17 +326,17 @@ async def request_password_reset(
     # Always return success to prevent email enumeration
     if user:
         # Generate password reset token
-        reset_token = generate_password_reset_token()
+        reset_token = _new_token("pr_")
         password_reset = PasswordReset(
             user_id=user.id,
-            token=reset_token,
+            token_hash=hash_token(reset_token),
             expires_at=datetime.utcnow() + timedelta(hours=1)
         )
         db.add(password_reset)
         await db.commit()
         
-        # Send password reset email
-        await send_password_reset_email(user.email, reset_token)
+        # Send password reset email after the response is returned
+        background_tasks.add_task(send_password_reset_email, user.email, reset_token)
     
     return MessageResponse(
         message="If the email exists, a password reset link has been sent"
@@ -306,10 +350,12 @@ async def confirm_password_reset(
     db: AsyncSession = Depends(get_db)
 ):
     """Confirm password reset with new password."""
-    # Find password reset token
+    # Find password reset token together with its user
     result = await db.execute(
-        select(PasswordReset).where(
-            PasswordReset.token == request.token,
+        select(PasswordReset)
+        .options(joinedload(PasswordReset.user))
+        .where(
+            PasswordReset.token_hash == hash_token(request.token),
             PasswordReset.is_used == False
         )
     )
@@ -328,8 +374,7 @@ async def confirm_password_reset(
         )
     
     # Update user password
-    result = await db.execute(select(User).where(User.id == password_reset.user_id))
-    user = result.scalar_one_or_none()
+    user = password_reset.user
     
     if not user:
         raise HTTPException(
@@ -337,21 +382,30 @@ async def confirm_password_reset(
             detail="User not found"
         )
     
-    user.hashed_password = hash_password(request.new_password)
+    user.hashed_password = await hash_password_async(request.new_password)
     password_reset.is_used = True
-    await db.commit()
     
     # Revoke all refresh tokens for the user
-    result = await db.execute(
-        select(RefreshToken).where(
+    await db.execute(
+        update(RefreshToken)
+        .where(
             RefreshToken.user_id == user.id,
             RefreshToken.is_revoked == False
         )
+        .values(is_revoked=True)
+        .execution_options(synchronize_session=False)
     )
-    tokens = result.scalars().all()
-    for token in tokens:
-        token.is_revoked = True
+    # The reset is only committed once the Redis revocation succeeded, so
+    # the token stays usable for a retry
+    try:
+        await revoke_user_refresh_tokens(user.id)
+    except RedisError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token service unavailable"
+        )
     await db.commit()
+    await invalidate_cached_user(user.id)
     
     return MessageResponse(message="Password reset successfully")
 
@@ -360,6 +414,7 @@ async def confirm_password_reset(
 @router.post("/verify-email", response_model=MessageResponse)
 async def request_email_verification(
     request: EmailVerificationRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -371,17 +426,17 @@ async def request_email_verification(
         )
     
     # Generate verification token
-    verification_token = generate_verification_token()
+    verification_token = _new_token("vr_")
     email_verification = EmailVerification(
         user_id=current_user.id,
-        token=verification_token,
+        token_hash=hash_token(verification_token),
         expires_at=datetime.utcnow() + timedelta(days=7)
     )
     db.add(email_verification)
     await db.commit()
     
-    # Send verification email
-    await send_verification_email(current_user.email, verification_token)
+    # Send verification email after the response is returned
+    background_tasks.add_task(send_verification_email, current_user.email, verification_token)
     
     return MessageResponse(message="Verification email sent")
 
@@ -393,10 +448,12 @@ async def confirm_email_verification(
     db: AsyncSession = Depends(get_db)
 ):
     """Confirm email verification."""
-    # Find verification token
+    # Find verification token together with its user
     result = await db.execute(
-        select(EmailVerification).where(
-            EmailVerification.token == request.token,
+        select(EmailVerification)
+        .options(joinedload(EmailVerification.user))
+        .where(
+            EmailVerification.token_hash == hash_token(request.token),
             EmailVerification.is_used == False
         )
     )
@@ -415,8 +472,7 @@ async def confirm_email_verification(
         )
     
     # Update user
-    result = await db.execute(select(User).where(User.id == email_verification.user_id))
-    user = result.scalar_one_or_none()
+    user = email_verification.user
     
     if not user:
         raise HTTPException(
@@ -427,6 +483,7 @@ async def confirm_email_verification(
     user.is_verified = True
     email_verification.is_used = True
     await db.commit()
+    await invalidate_cached_user(user.id)
     
     return MessageResponse(message="Email verified successfully")
 
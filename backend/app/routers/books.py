@@ -1,33 +1,75 @@
 """Books CRUD API endpoints."""
+import hashlib
 import uuid
 from datetime import datetime
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional
+import asyncpg
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.core.config import settings
-from app.models.user import User, Ebook, Chapter, BookStatus
+from app.core.ebook_cache import invalidate_ebook
+from app.core.user_stats_cache import invalidate_user_stats
+from app.core.versioning import record_ebook_version
+from app.models.user import User, Ebook, Chapter, ChapterContent, BookStatus
 from app.schemas.schemas import (
     BookCreate,
     BookUpdate,
     BookResponse,
     BookListResponse,
     ChapterCreateInBook,
+    ChapterBulkCreateInBook,
     ChapterInBookResponse,
     ChapterListResponse,
-    UserPublicResponse,
     BookStatusEnum,
     MessageResponse,
 )
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
+# Validates a whole page of books in one call
+_book_list_adapter = TypeAdapter(List[BookResponse])
+
+
+def _book_resp(book: Ebook, author: User) -> Ebook:
+    """Attach the already-loaded author to a book for its response.
+
+    Every book served here belongs to the current user, so the author is
+    set directly instead of being loaded with another query.
+    """
+    set_committed_value(book, "author", author)
+    return book
+
+
+# Clients must revalidate every read, but may reuse their copy on a 304
+_REVALIDATE = "private, max-age=0, must-revalidate"
+
+
+def _etag(*parts) -> str:
+    """Weak ETag over the values a response is derived from."""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already holds this ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return etag in candidates or "*" in candidates
+
 
 @router.get("", response_model=BookListResponse)
 async def list_books(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     status_filter: Optional[BookStatusEnum] = Query(None, alias="status"),
@@ -37,59 +79,48 @@ async def list_books(
     db: AsyncSession = Depends(get_db)
 ):
     """List user's books with optional filtering."""
-    query = select(Ebook).where(Ebook.author_id == current_user.id)
+    conditions = [Ebook.author_id == current_user.id]
     
     # Apply filters
     if status_filter:
-        query = query.where(Ebook.status == status_filter)
+        conditions.append(Ebook.status == status_filter)
     if genre:
-        query = query.where(Ebook.genre == genre)
+        conditions.append(Ebook.genre == genre)
     if search:
-        query = query.where(Ebook.title.ilike(f"%{search}%"))
+        # Served by the ix_ebooks_title_trgm trigram index
+        conditions.append(Ebook.title.ilike(f"%{search}%"))
     
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+    # The total and the newest change identify this listing; a client
+    # that already has it gets a 304 without the page being loaded
+    summary = await db.execute(
+        select(func.count(), func.max(Ebook.updated_at))
+        .select_from(Ebook)
+        .where(*conditions)
+    )
+    total, last_updated = summary.one()
+    etag = _etag(total, last_updated, current_user.updated_at)
+    headers = {"ETag": etag, "Cache-Control": _REVALIDATE}
+    if _not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
     # Apply pagination
-    query = query.order_by(Ebook.updated_at.desc()).offset(skip).limit(limit)
+    query = (
+        select(Ebook)
+        .where(*conditions)
+        .order_by(Ebook.updated_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
     
     result = await db.execute(query)
     books = result.scalars().all()
     
-    # Build response with author info
-    items = []
-    for book in books:
-        items.append(BookResponse(
-            id=book.id,
-            author_id=book.author_id,
-            title=book.title,
-            description=book.description,
-            cover_image_url=book.cover_image_url,
-            status=book.status,
-            content=book.content,
-            genre=book.genre,
-            tags=book.tags or [],
-            version=book.version,
-            view_count=book.view_count,
-            download_count=book.download_count,
-            rating_average=book.rating_average,
-            rating_count=book.rating_count,
-            created_at=book.created_at,
-            updated_at=book.updated_at,
-            published_at=book.published_at,
-            author=UserPublicResponse(
-                id=current_user.id,
-                username=current_user.username,
-                full_name=current_user.full_name,
-                avatar_url=current_user.avatar_url,
-                bio=current_user.bio,
-                profile_visibility=current_user.profile_visibility,
-                created_at=current_user.created_at
-            ) if current_user else None
-        ))
+    items = _book_list_adapter.validate_python(
+        [_book_resp(book, current_user) for book in books],
+        from_attributes=True,
+    )
     
+    response.headers.update(headers)
     return BookListResponse(
         items=items,
         total=total,
@@ -106,7 +137,7 @@ async def create_book(
 ):
     """Create a new book."""
     book = Ebook(
-        author_id=current_user.id,
+        author=current_user,
         title=book_data.title,
         description=book_data.description,
         cover_image_url=book_data.cover_image_url,
@@ -117,41 +148,16 @@ async def create_book(
     )
     db.add(book)
     await db.commit()
-    await db.refresh(book)
-    
-    return BookResponse(
-        id=book.id,
-        author_id=book.author_id,
-        title=book.title,
-        description=book.description,
-        cover_image_url=book.cover_image_url,
-        status=book.status,
-        content=book.content,
-        genre=book.genre,
-        tags=book.tags or [],
-        version=book.version,
-        view_count=book.view_count,
-        download_count=book.download_count,
-        rating_average=book.rating_average,
-        rating_count=book.rating_count,
-        created_at=book.created_at,
-        updated_at=book.updated_at,
-        published_at=book.published_at,
-        author=UserPublicResponse(
-            id=current_user.id,
-            username=current_user.username,
-            full_name=current_user.full_name,
-            avatar_url=current_user.avatar_url,
-            bio=current_user.bio,
-            profile_visibility=current_user.profile_visibility,
-            created_at=current_user.created_at
-        )
-    )
+    await invalidate_user_stats(current_user.id)
+    
+    return _book_resp(book, current_user)
 
 
 @router.get("/{book_id}", response_model=BookResponse)
 async def get_book(
     book_id: uuid.UUID,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -170,34 +176,13 @@ async def get_book(
             detail="Book not found"
         )
     
-    return BookResponse(
-        id=book.id,
-        author_id=book.author_id,
-        title=book.title,
-        description=book.description,
-        cover_image_url=book.cover_image_url,
-        status=book.status,
-        content=book.content,
-        genre=book.genre,
-        tags=book.tags or [],
-        version=book.version,
-        view_count=book.view_count,
-        download_count=book.download_count,
-        rating_average=book.rating_average,
-        rating_count=book.rating_count,
-        created_at=book.created_at,
-        updated_at=book.updated_at,
-        published_at=book.published_at,
-        author=UserPublicResponse(
-            id=current_user.id,
-            username=current_user.username,
-            full_name=current_user.full_name,
-            avatar_url=current_user.avatar_url,
-            bio=current_user.bio,
-            profile_visibility=current_user.profile_visibility,
-            created_at=current_user.created_at
-        )
-    )
+    etag = _etag(book.updated_at, book.version, current_user.updated_at)
+    headers = {"ETag": etag, "Cache-Control": _REVALIDATE}
+    if _not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    return _book_resp(book, current_user)
 
 
 @router.put("/{book_id}", response_model=BookResponse)
@@ -230,44 +215,19 @@ async def update_book(
         if book.status != BookStatus.PUBLISHED:
             book.published_at = datetime.utcnow()
     
+    # Save the current version and increment it if content changed
+    if "content" in update_data and update_data["content"] != book.content:
+        await record_ebook_version(db, book)
+        book.version += 1
+    
     for field, value in update_data.items():
         setattr(book, field, value)
     
-    # Increment version if content changed
-    if "content" in update_data:
-        book.version += 1
-    
     await db.commit()
-    await db.refresh(book)
-    
-    return BookResponse(
-        id=book.id,
-        author_id=book.author_id,
-        title=book.title,
-        description=book.description,
-        cover_image_url=book.cover_image_url,
-        status=book.status,
-        content=book.content,
-        genre=book.genre,
-        tags=book.tags or [],
-        version=book.version,
-        view_count=book.view_count,
-        download_count=book.download_count,
-        rating_average=book.rating_average,
-        rating_count=book.rating_count,
-        created_at=book.created_at,
-        updated_at=book.updated_at,
-        published_at=book.published_at,
-        author=UserPublicResponse(
-            id=current_user.id,
-            username=current_user.username,
-            full_name=current_user.full_name,
-            avatar_url=current_user.avatar_url,
-            bio=current_user.bio,
-            profile_visibility=current_user.profile_visibility,
-            created_at=current_user.created_at
-        )
-    )
+    await invalidate_ebook(book_id)
+    await invalidate_user_stats(current_user.id)
+    
+    return _book_resp(book, current_user)
 
 
 @router.delete("/{book_id}", response_model=MessageResponse)
@@ -293,6 +253,8 @@ async def delete_book(
     
     await db.delete(book)
     await db.commit()
+    await invalidate_ebook(book_id)
+    await invalidate_user_stats(current_user.id)
     
     return MessageResponse(message="Book deleted successfully")
 
@@ -322,24 +284,13 @@ async def get_book_chapters(
     # Get chapters
     result = await db.execute(
         select(Chapter)
+        .options(selectinload(Chapter.body))
         .where(Chapter.ebook_id == book_id)
         .order_by(Chapter.chapter_number)
     )
     chapters = result.scalars().all()
     
-    items = [
-        ChapterInBookResponse(
-            id=ch.id,
-            ebook_id=ch.ebook_id,
-            chapter_number=ch.chapter_number,
-            title=ch.title,
-            content=ch.content,
-            version=ch.version,
-            created_at=ch.created_at,
-            updated_at=ch.updated_at
-        )
-        for ch in chapters
-    ]
+    items = [ChapterInBookResponse.model_validate(ch) for ch in chapters]
     
     return ChapterListResponse(
         items=items,
@@ -357,60 +308,164 @@ async def add_chapter(
     """Add a chapter to a book."""
     # Verify book belongs to user
     result = await db.execute(
-        select(Ebook).where(
+        select(Ebook.id).where(
             Ebook.id == book_id,
             Ebook.author_id == current_user.id
         )
     )
-    book = result.scalar_one_or_none()
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book not found"
+        )
     
-    if not book:
+    # Create chapter
+    chapter = Chapter(
+        ebook_id=book_id,
+        chapter_number=chapter_data.chapter_number,
+        title=chapter_data.title,
+        content=chapter_data.content,
+    )
+    db.add(chapter)
+    
+    # Append the chapter to the book's content in SQL, so the existing
+    # content is never transferred to the app and back
+    if chapter.content:
+        section = f"## {chapter_data.title}\n\n{chapter.content}"
+        await db.execute(
+            update(Ebook)
+            .where(Ebook.id == book_id)
+            .values(content=func.coalesce(func.nullif(Ebook.content, "") + "\n\n", "") + section)
+            .execution_options(synchronize_session=False)
+        )
+    try:
+        await db.commit()
+    except IntegrityError:
+        # uq_chapter_number_per_book
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chapter {chapter_data.chapter_number} already exists"
+        )
+    
+    if chapter.content:
+        await invalidate_ebook(book_id)
+        await invalidate_user_stats(current_user.id)
+    
+    return ChapterInBookResponse.model_validate(chapter)
+
+
+@router.post("/{book_id}/chapters/bulk", response_model=ChapterListResponse, status_code=status.HTTP_201_CREATED)
+async def import_chapters(
+    book_id: uuid.UUID,
+    chapter_data: ChapterBulkCreateInBook,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Import several chapters into a book at once."""
+    chapters = chapter_data.chapters
+    numbers = [chapter.chapter_number for chapter in chapters]
+    
+    if len(set(numbers)) != len(numbers):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Chapter numbers must be unique within an import"
+        )
+    
+    # Verify book belongs to user
+    result = await db.execute(
+        select(Ebook.id).where(
+            Ebook.id == book_id,
+            Ebook.author_id == current_user.id
+        )
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book not found"
         )
     
-    # Check if chapter number already exists
+    # Check if any of the chapter numbers already exist
     result = await db.execute(
-        select(Chapter).where(
+        select(Chapter.chapter_number)
+        .where(
             Chapter.ebook_id == book_id,
-            Chapter.chapter_number == chapter_data.chapter_number
+            Chapter.chapter_number.in_(numbers)
         )
+        .order_by(Chapter.chapter_number)
     )
-    existing = result.scalar_one_or_none()
+    existing = result.scalars().all()
     
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Chapter {chapter_data.chapter_number} already exists"
+            detail=f"Chapters {', '.join(map(str, existing))} already exist"
         )
     
-    # Create chapter
-    chapter = Chapter(
-        ebook_id=book_id,
-        chapter_number=chapter_data.chapter_number,
-        title=chapter_data.title,
-        content=chapter_data.content,
+    # COPY the rows straight into both tables on the session's own
+    # connection and transaction. Ids are generated here so the content
+    # rows can reference them; the remaining columns take their defaults.
+    chapter_ids = [uuid.uuid4() for _ in chapters]
+    connection = await db.connection()
+    raw_connection = (await connection.get_raw_connection()).driver_connection
+    try:
+        await raw_connection.copy_records_to_table(
+            Chapter.__tablename__,
+            records=[
+                (chapter_id, book_id, chapter.chapter_number, chapter.title, 1)
+                for chapter_id, chapter in zip(chapter_ids, chapters)
+            ],
+            columns=["id", "ebook_id", "chapter_number", "title", "version"],
+        )
+        await raw_connection.copy_records_to_table(
+            ChapterContent.__tablename__,
+            records=[
+                (chapter_id, chapter.content)
+                for chapter_id, chapter in zip(chapter_ids, chapters)
+            ],
+            columns=["chapter_id", "content"],
+        )
+    except asyncpg.UniqueViolationError:
+        # uq_chapter_number_per_book, from a concurrent add or import
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Chapters with these numbers already exist"
+        )
+    
+    # Append every imported chapter to the book's content in one UPDATE
+    sections = [
+        f"## {chapter.title}\n\n{chapter.content}"
+        for chapter in chapters
+        if chapter.content
+    ]
+    if sections:
+        await db.execute(
+            update(Ebook)
+            .where(Ebook.id == book_id)
+            .values(
+                content=func.coalesce(func.nullif(Ebook.content, "") + "\n\n", "")
+                + "\n\n".join(sections)
+            )
+            .execution_options(synchronize_session=False)
+        )
+    
+    result = await db.execute(
+        select(Chapter)
+        .options(selectinload(Chapter.body))
+        .where(Chapter.id.in_(chapter_ids))
+        .order_by(Chapter.chapter_number)
     )
-    db.add(chapter)
+    imported = result.scalars().all()
     await db.commit()
-    await db.refresh(chapter)
     
-    # Update book's content
-    if chapter.content:
-        if book.content:
-            book.content += f"\n\n## {chapter_data.title}\n\n{chapter.content}"
-        else:
-            book.content = f"## {chapter_data.title}\n\n{chapter.content}"
-        await db.commit()
+    if sections:
+        await invalidate_ebook(book_id)
+        await invalidate_user_stats(current_user.id)
+    
+    items = [ChapterInBookResponse.model_validate(ch) for ch in imported]
     
-    return ChapterInBookResponse(
-        id=chapter.id,
-        ebook_id=chapter.ebook_id,
-        chapter_number=chapter.chapter_number,
-        title=chapter.title,
-        content=chapter.content,
-        version=chapter.version,
-        created_at=chapter.created_at,
-        updated_at=chapter.updated_at
+    return ChapterListResponse(
+        items=items,
+        total=len(items)
     )
@@ -2,26 +2,132 @@
 import uuid
 from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, update, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from app.core.database import get_db
 from app.core.security import get_current_user, get_current_verified_user
+from app.core.ebook_cache import (
+    cache_ebook,
+    cache_list,
+    get_cached_ebook,
+    get_cached_list,
+    invalidate_ebook,
+    list_cache_key,
+)
+from app.core.user_stats_cache import invalidate_user_stats
+from app.core.versioning import load_ebook_version, load_ebook_versions, record_ebook_version
+from app.core.view_counts import record_view
 from app.models.user import User, Ebook, Chapter, BookStatus, UserProfileVisibility
 from app.schemas.schemas import (
     EbookCreate,
     EbookUpdate,
     EbookResponse,
+    EbookListItem,
     EbookListResponse,
     ChapterCreate,
     ChapterUpdate,
     ChapterResponse,
+    ChapterSummary,
+    ChapterSummaryListResponse,
+    EbookVersionHistoryResponse,
+    EbookVersionResponse,
     MessageResponse,
-    UserPublicResponse,
 )
 
 router = APIRouter(prefix="/ebooks", tags=["Ebooks"])
 
+# Columns behind EbookListItem; list queries leave out the content
+_LIST_COLUMNS = load_only(
+    Ebook.id,
+    Ebook.author_id,
+    Ebook.title,
+    Ebook.description,
+    Ebook.cover_image_url,
+    Ebook.status,
+    Ebook.genre,
+    Ebook.tags,
+    Ebook.version,
+    Ebook.view_count,
+    Ebook.download_count,
+    Ebook.rating_average,
+    Ebook.rating_count,
+    Ebook.created_at,
+    Ebook.updated_at,
+    Ebook.published_at,
+    raiseload=True,
+)
+
+
+async def _paginate(db: AsyncSession, query, skip: int, limit: int):
+    """Fetch a page of ebooks and the total match count in one query."""
+    page = (
+        query.add_columns(func.count().over().label("total"))
+        .order_by(Ebook.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = (await db.execute(page)).all()
+    
+    if rows:
+        return [row.Ebook for row in rows], rows[0].total
+    if skip == 0:
+        return [], 0
+    
+    # Past the last page there are no rows to carry the count
+    total_result = await db.execute(select(func.count()).select_from(query.subquery()))
+    return [], total_result.scalar()
+
+
+async def get_ebook_or_404(
+    ebook_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db)
+) -> Ebook:
+    """Load the ebook named in the path, or raise 404."""
+    result = await db.execute(
+        select(Ebook).options(raiseload("*")).where(Ebook.id == ebook_id)
+    )
+    ebook = result.scalar_one_or_none()
+    
+    if not ebook:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ebook not found"
+        )
+    
+    return ebook
+
+
+async def _raise_transition_error(db: AsyncSession, ebook_id: uuid.UUID, current_user: User, action: str):
+    """Raise 404 or 403 for a status change whose UPDATE matched no row."""
+    result = await db.execute(select(Ebook.author_id).where(Ebook.id == ebook_id))
+    author_id = result.scalar_one_or_none()
+    
+    if author_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ebook not found"
+        )
+    
+    if author_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to {action} this ebook"
+        )
+
+
+async def _with_author(db: AsyncSession, ebook: Ebook, current_user: User) -> EbookResponse:
+    """Build an ebook response, reusing the current user as the author if it is."""
+    if ebook.author_id == current_user.id:
+        author = current_user
+    else:
+        author = await db.get(User, ebook.author_id)
+    set_committed_value(ebook, "author", author)
+    return EbookResponse.model_validate(ebook)
+
 
 # Ebook CRUD Endpoints
 @router.get("", response_model=EbookListResponse)
@@ -34,7 +140,17 @@ async def list_ebooks(
     db: AsyncSession = Depends(get_db)
 ):
     """List all published ebooks with optional filtering."""
-    query = select(Ebook).where(Ebook.status == BookStatus.PUBLISHED)
+    cache_key = await list_cache_key(skip, limit, status, genre, search)
+    if cache_key:
+        cached = await get_cached_list(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+    
+    query = (
+        select(Ebook)
+        .options(_LIST_COLUMNS, joinedload(Ebook.author), raiseload("*"))
+        .where(Ebook.status == BookStatus.PUBLISHED)
+    )
     
     # Apply filters
     if status:
@@ -44,6 +160,8 @@ async def list_ebooks(
         query = query.where(Ebook.genre == genre)
     
     if search:
+        # Served by the ix_ebooks_title_trgm/ix_ebooks_description_trgm
+        # trigram indexes, which handle ILIKE without lower()
         search_term = f"%{search}%"
         query = query.where(
             or_(
@@ -52,23 +170,20 @@ async def list_ebooks(
             )
         )
     
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
-    # Apply pagination and ordering
-    query = query.order_by(Ebook.created_at.desc()).offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    ebooks = result.scalars().all()
+    # Apply pagination and ordering; the window count returns the total
+    # alongside the page
+    ebooks, total = await _paginate(db, query, skip, limit)
     
-    return EbookListResponse(
-        items=[EbookResponse.model_validate(e) for e in ebooks],
+    response = EbookListResponse(
+        items=[EbookListItem.model_validate(e) for e in ebooks],
         total=total,
         skip=skip,
         limit=limit
     )
+    if cache_key:
+        await cache_list(cache_key, response.model_dump_json())
+    
+    return response
 
 
 @router.get("/my", response_model=EbookListResponse)
@@ -80,24 +195,25 @@ async def list_my_ebooks(
     db: AsyncSession = Depends(get_db)
 ):
     """List current user's ebooks."""
-    query = select(Ebook).where(Ebook.author_id == current_user.id)
+    query = (
+        select(Ebook)
+        .options(_LIST_COLUMNS, raiseload("*"))
+        .where(Ebook.author_id == current_user.id)
+    )
     
     if status:
         query = query.where(Ebook.status == status)
     
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
-    
-    # Apply pagination and ordering
-    query = query.order_by(Ebook.created_at.desc()).offset(skip).limit(limit)
+    # Apply pagination and ordering; the window count returns the total
+    # alongside the page
+    ebooks, total = await _paginate(db, query, skip, limit)
     
-    result = await db.execute(query)
-    ebooks = result.scalars().all()
+    # Every ebook here is the current user's
+    for ebook in ebooks:
+        set_committed_value(ebook, "author", current_user)
     
     return EbookListResponse(
-        items=[EbookResponse.model_validate(e) for e in ebooks],
+        items=[EbookListItem.model_validate(e) for e in ebooks],
         total=total,
         skip=skip,
         limit=limit
@@ -110,37 +226,31 @@ async def get_ebook(
     db: AsyncSession = Depends(get_db)
 ):
     """Get ebook details."""
-    result = await db.execute(
-        select(Ebook).where(Ebook.id == ebook_id)
-    )
-    ebook = result.scalar_one_or_none()
-    
-    if not ebook:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ebook not found"
+    cached = await get_cached_ebook(ebook_id)
+    if cached is not None:
+        response = EbookResponse.model_validate_json(cached)
+    else:
+        # Load the author in the same query for the response
+        result = await db.execute(
+            select(Ebook)
+            .options(joinedload(Ebook.author), raiseload("*"))
+            .where(Ebook.id == ebook_id)
         )
+        ebook = result.scalar_one_or_none()
+        
+        if not ebook:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Ebook not found"
+            )
+        
+        response = EbookResponse.model_validate(ebook)
+        await cache_ebook(ebook_id, response.model_dump_json())
     
-    # Increment view count for published books
-    if ebook.status == BookStatus.PUBLISHED:
-        ebook.view_count += 1
-        await db.commit()
-    
-    # Include author info
-    author_result = await db.execute(select(User).where(User.id == ebook.author_id))
-    author = author_result.scalar_one_or_none()
-    
-    response = EbookResponse.model_validate(ebook)
-    if author:
-        response.author = UserPublicResponse(
-            id=author.id,
-            username=author.username,
-            full_name=author.full_name,
-            avatar_url=author.avatar_url,
-            bio=author.bio,
-            profile_visibility=author.profile_visibility,
-            created_at=author.created_at
-        )
+    # Count views of published books in Redis; they are added to
+    # view_count in the database by the flush_view_counts task
+    if response.status == BookStatus.PUBLISHED:
+        response.view_count += await record_view(ebook_id)
     
     return response
 
@@ -166,8 +276,9 @@ async def create_ebook(
     db.add(ebook)
     await db.commit()
     await db.refresh(ebook)
+    await invalidate_user_stats(current_user.id)
     
-    return EbookResponse.model_validate(ebook)
+    return await _with_author(db, ebook, current_user)
 
 
 @router.put("/{ebook_id}", response_model=EbookResponse)
@@ -175,20 +286,10 @@ async def update_ebook(
     ebook_id: uuid.UUID,
     ebook_data: EbookUpdate,
     current_user: User = Depends(get_current_user),
+    ebook: Ebook = Depends(get_ebook_or_404),
     db: AsyncSession = Depends(get_db)
 ):
     """Update an ebook."""
-    result = await db.execute(
-        select(Ebook).where(Ebook.id == ebook_id)
-    )
-    ebook = result.scalar_one_or_none()
-    
-    if not ebook:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ebook not found"
-        )
-    
     # Check ownership
     if ebook.author_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(
@@ -201,13 +302,7 @@ async def update_ebook(
     
     if "content" in update_data and update_data["content"] != ebook.content:
         # Save current version
-        previous_versions = ebook.previous_versions or []
-        previous_versions.append({
-            "version": ebook.version,
-            "content": ebook.content,
-            "updated_at": ebook.updated_at.isoformat() if ebook.updated_at else None
-        })
-        ebook.previous_versions = previous_versions
+        await record_ebook_version(db, ebook)
         ebook.version += 1
     
     # Update fields
@@ -216,28 +311,20 @@ async def update_ebook(
     
     await db.commit()
     await db.refresh(ebook)
+    await invalidate_ebook(ebook_id)
+    await invalidate_user_stats(ebook.author_id)
     
-    return EbookResponse.model_validate(ebook)
+    return await _with_author(db, ebook, current_user)
 
 
 @router.delete("/{ebook_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_ebook(
     ebook_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
+    ebook: Ebook = Depends(get_ebook_or_404),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete an ebook."""
-    result = await db.execute(
-        select(Ebook).where(Ebook.id == ebook_id)
-    )
-    ebook = result.scalar_one_or_none()
-    
-    if not ebook:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ebook not found"
-        )
-    
     # Check ownership
     if ebook.author_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(
@@ -247,6 +334,8 @@ async def delete_ebook(
     
     await db.delete(ebook)
     await db.commit()
+    await invalidate_ebook(ebook_id)
+    await invalidate_user_stats(ebook.author_id)
 
 
 @router.post("/{ebook_id}/publish", response_model=EbookResponse)
@@ -256,38 +345,35 @@ async def publish_ebook(
     db: AsyncSession = Depends(get_db)
 ):
     """Publish an ebook."""
+    # Ownership and required fields are checked in the UPDATE itself
+    conditions = [
+        Ebook.id == ebook_id,
+        Ebook.title != "",
+        Ebook.content != "",
+    ]
+    if not current_user.is_superuser:
+        conditions.append(Ebook.author_id == current_user.id)
+    
     result = await db.execute(
-        select(Ebook).where(Ebook.id == ebook_id)
+        update(Ebook)
+        .where(*conditions)
+        .values(status=BookStatus.PUBLISHED, published_at=datetime.utcnow())
+        .returning(Ebook)
     )
     ebook = result.scalar_one_or_none()
     
     if not ebook:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ebook not found"
-        )
-    
-    # Check ownership
-    if ebook.author_id != current_user.id and not current_user.is_superuser:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to publish this ebook"
-        )
-    
-    # Validate required fields
-    if not ebook.title or not ebook.content:
+        await _raise_transition_error(db, ebook_id, current_user, "publish")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Title and content are required for publishing"
         )
     
-    ebook.status = BookStatus.PUBLISHED
-    ebook.published_at = datetime.utcnow()
-    
     await db.commit()
-    await db.refresh(ebook)
+    await invalidate_ebook(ebook_id)
+    await invalidate_user_stats(ebook.author_id)
     
-    return EbookResponse.model_validate(ebook)
+    return await _with_author(db, ebook, current_user)
 
 
 @router.post("/{ebook_id}/archive", response_model=EbookResponse)
@@ -297,41 +383,39 @@ async def archive_ebook(
     db: AsyncSession = Depends(get_db)
 ):
     """Archive an ebook."""
+    conditions = [Ebook.id == ebook_id]
+    if not current_user.is_superuser:
+        conditions.append(Ebook.author_id == current_user.id)
+    
     result = await db.execute(
-        select(Ebook).where(Ebook.id == ebook_id)
+        update(Ebook)
+        .where(*conditions)
+        .values(status=BookStatus.ARCHIVED)
+        .returning(Ebook)
     )
     ebook = result.scalar_one_or_none()
     
     if not ebook:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ebook not found"
-        )
-    
-    # Check ownership
-    if ebook.author_id != current_user.id and not current_user.is_superuser:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to archive this ebook"
-        )
-    
-    ebook.status = BookStatus.ARCHIVED
+        await _raise_transition_error(db, ebook_id, current_user, "archive")
     
     await db.commit()
-    await db.refresh(ebook)
+    await invalidate_ebook(ebook_id)
+    await invalidate_user_stats(ebook.author_id)
     
-    return EbookResponse.model_validate(ebook)
+    return await _with_author(db, ebook, current_user)
 
 
 # Chapter Management Endpoints
-@router.get("/{ebook_id}/chapters")
+@router.get("/{ebook_id}/chapters", response_model=ChapterSummaryListResponse)
 async def list_chapters(
     ebook_id: uuid.UUID,
     db: AsyncSession = Depends(get_db)
 ):
     """List all chapters of an ebook."""
     result = await db.execute(
-        select(Ebook).where(Ebook.id == ebook_id)
+        select(Ebook)
+        .options(selectinload(Ebook.chapters), raiseload("*"))
+        .where(Ebook.id == ebook_id)
     )
     ebook = result.scalar_one_or_none()
     
@@ -341,25 +425,12 @@ async def list_chapters(
             detail="Ebook not found"
         )
     
-    result = await db.execute(
-        select(Chapter).where(Chapter.ebook_id == ebook_id).order_by(Chapter.chapter_number)
+    chapters = ebook.chapters
+    
+    return ChapterSummaryListResponse(
+        items=[ChapterSummary.model_validate(c) for c in chapters],
+        total=len(chapters)
     )
-    chapters = result.scalars().all()
-    
-    return {
-        "items": [
-            {
-                "id": c.id,
-                "chapter_number": c.chapter_number,
-                "title": c.title,
-                "version": c.version,
-                "created_at": c.created_at,
-                "updated_at": c.updated_at
-            }
-            for c in chapters
-        ],
-        "total": len(chapters)
-    }
 
 
 @router.get("/{ebook_id}/chapters/{chapter_id}", response_model=ChapterResponse)
@@ -370,7 +441,9 @@ async def get_chapter(
 ):
     """Get a specific chapter."""
     result = await db.execute(
-        select(Chapter).where(
+        select(Chapter)
+        .options(joinedload(Chapter.body), raiseload("*"))
+        .where(
             Chapter.id == chapter_id,
             Chapter.ebook_id == ebook_id
         )
@@ -391,20 +464,10 @@ async def create_chapter(
     ebook_id: uuid.UUID,
     chapter_data: ChapterCreate,
     current_user: User = Depends(get_current_user),
+    ebook: Ebook = Depends(get_ebook_or_404),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new chapter."""
-    result = await db.execute(
-        select(Ebook).where(Ebook.id == ebook_id)
-    )
-    ebook = result.scalar_one_or_none()
-    
-    if not ebook:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ebook not found"
-        )
-    
     # Check ownership
     if ebook.author_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(
@@ -412,19 +475,6 @@ async def create_chapter(
             detail="Not authorized to add chapters to this ebook"
         )
     
-    # Check if chapter number already exists
-    result = await db.execute(
-        select(Chapter).where(
-            Chapter.ebook_id == ebook_id,
-            Chapter.chapter_number == chapter_data.chapter_number
-        )
-    )
-    if result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Chapter number already exists"
-        )
-    
     chapter = Chapter(
         ebook_id=ebook_id,
         chapter_number=chapter_data.chapter_number,
@@ -433,8 +483,15 @@ async def create_chapter(
     )
     
     db.add(chapter)
-    await db.commit()
-    await db.refresh(chapter)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # uq_chapter_number_per_book
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Chapter number already exists"
+        )
     
     return ChapterResponse.model_validate(chapter)
 
@@ -448,25 +505,27 @@ async def update_chapter(
     db: AsyncSession = Depends(get_db)
 ):
     """Update a chapter."""
+    # Fetch the chapter with its ebook's author for the ownership check
     result = await db.execute(
-        select(Chapter).where(
+        select(Chapter, Ebook.author_id)
+        .join(Ebook, Chapter.ebook_id == Ebook.id)
+        .options(joinedload(Chapter.body), raiseload("*"))
+        .where(
             Chapter.id == chapter_id,
             Chapter.ebook_id == ebook_id
         )
     )
-    chapter = result.scalar_one_or_none()
+    row = result.first()
     
-    if not chapter:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chapter not found"
         )
     
-    # Get ebook to check ownership
-    result = await db.execute(select(Ebook).where(Ebook.id == ebook_id))
-    ebook = result.scalar_one_or_none()
+    chapter, author_id = row
     
-    if ebook.author_id != current_user.id and not current_user.is_superuser:
+    if author_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this chapter"
@@ -490,7 +549,6 @@ async def update_chapter(
         setattr(chapter, field, value)
     
     await db.commit()
-    await db.refresh(chapter)
     
     return ChapterResponse.model_validate(chapter)
 
@@ -503,25 +561,26 @@ async def delete_chapter(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete a chapter."""
+    # Fetch the chapter with its ebook's author for the ownership check
     result = await db.execute(
-        select(Chapter).where(
+        select(Chapter, Ebook.author_id)
+        .join(Ebook, Chapter.ebook_id == Ebook.id)
+        .where(
             Chapter.id == chapter_id,
             Chapter.ebook_id == ebook_id
         )
     )
-    chapter = result.scalar_one_or_none()
+    row = result.first()
     
-    if not chapter:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chapter not found"
         )
     
-    # Get ebook to check ownership
-    result = await db.execute(select(Ebook).where(Ebook.id == ebook_id))
-    ebook = result.scalar_one_or_none()
+    chapter, author_id = row
     
-    if ebook.author_id != current_user.id and not current_user.is_superuser:
+    if author_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this chapter"
@@ -532,24 +591,18 @@ async def delete_chapter(
 
 
 # Version History
-@router.get("/{ebook_id}/versions")
+@router.get(
+    "/{ebook_id}/versions",
+    response_model=EbookVersionHistoryResponse,
+    response_model_exclude_unset=True,
+)
 async def get_version_history(
     ebook_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
+    ebook: Ebook = Depends(get_ebook_or_404),
     db: AsyncSession = Depends(get_db)
 ):
     """Get version history of an ebook."""
-    result = await db.execute(
-        select(Ebook).where(Ebook.id == ebook_id)
-    )
-    ebook = result.scalar_one_or_none()
-    
-    if not ebook:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ebook not found"
-        )
-    
     # Check ownership
     if ebook.author_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(
@@ -557,31 +610,34 @@ async def get_version_history(
             detail="Not authorized to view version history"
         )
     
-    return {
-        "current_version": ebook.version,
-        "previous_versions": ebook.previous_versions or []
-    }
+    versions = await load_ebook_versions(db, ebook_id)
+    
+    return EbookVersionHistoryResponse(
+        current_version=ebook.version,
+        previous_versions=[
+            EbookVersionResponse(
+                version=v.version,
+                content=content,
+                updated_at=v.updated_at.isoformat() if v.updated_at else None
+            )
+            for v, content in versions
+        ]
+    )
 
 
-@router.get("/{ebook_id}/versions/{version}")
+@router.get(
+    "/{ebook_id}/versions/{version}",
+    response_model=EbookVersionResponse,
+    response_model_exclude_unset=True,
+)
 async def get_version(
     ebook_id: uuid.UUID,
     version: int,
     current_user: User = Depends(get_current_user),
+    ebook: Ebook = Depends(get_ebook_or_404),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific version of an ebook."""
-    result = await db.execute(
-        select(Ebook).where(Ebook.id == ebook_id)
-    )
-    ebook = result.scalar_one_or_none()
-    
-    if not ebook:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ebook not found"
-        )
-    
     # Check ownership
     if ebook.author_id != current_user.id and not current_user.is_superuser:
         raise HTTPException(
@@ -591,24 +647,25 @@ async def get_version(
     
     # Check if requested version is current
     if version == ebook.version:
-        return {
-            "version": version,
-            "content": ebook.content,
-            "is_current": True
-        }
+        return EbookVersionResponse(
+            version=version,
+            content=ebook.content,
+            is_current=True
+        )
     
     # Look in previous versions
-    previous_versions = ebook.previous_versions or []
-    for v in previous_versions:
-        if v.get("version") == version:
-            return {
-                "version": version,
-                "content": v.get("content"),
-                "is_current": False,
-                "updated_at": v.get("updated_at")
-            }
-    
-    raise HTTPException(
+    previous = await load_ebook_version(db, ebook_id, version)
+    
+    if not previous:
+        raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Version not found"
         )
+    
+    previous, content = previous
+    return EbookVersionResponse(
+        version=version,
+        content=content,
+        is_current=False,
+        updated_at=previous.updated_at.isoformat() if previous.updated_at else None
+    )
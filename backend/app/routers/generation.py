@@ -1,14 +1,26 @@
 """Book generation API endpoints."""
 import uuid
 import asyncio
+import logging
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.database import get_db
+from app.core.ebook_cache import invalidate_ebook
 from app.core.security import get_current_user
 from app.core.config import settings
+from app.core.generation_state import (
+    cancel_generation,
+    generation_events,
+    get_generation,
+    should_stop,
+    start_generation,
+    update_generation,
+)
+from app.core.user_stats_cache import invalidate_user_stats
 from app.models.user import User, Ebook, BookStatus
 from app.schemas.schemas import (
     GenerationRequest,
@@ -22,21 +34,25 @@ from app.schemas.schemas import (
     ErrorResponse,
 )
 
-router = APIRouter(prefix="/generation", tags=["Generation"])
-
+logger = logging.getLogger(__name__)
 
-# In-memory storage for generation tasks (in production, use Redis/Celery)
-generation_tasks = {}
+router = APIRouter(prefix="/generation", tags=["Generation"])
 
 
 async def generate_book_content(book_id: uuid.UUID, generation_id: uuid.UUID, request: GenerationRequest):
     """Background task to generate book content."""
     try:
+        total_chapters = request.chapter_count or 10
+        
         # Update status to processing
-        generation_tasks[generation_id]["status"] = GenerationStatusEnum.PROCESSING
-        generation_tasks[generation_id]["started_at"] = datetime.utcnow()
+        await update_generation(
+            book_id,
+            generation_id,
+            status=GenerationStatusEnum.PROCESSING,
+            started_at=datetime.utcnow(),
+            total_chapters=total_chapters,
+        )
         
-        total_chapters = request.chapter_count or 10
         target_words = request.target_word_count
         words_per_chapter = target_words // total_chapters
         
@@ -47,46 +63,75 @@ async def generate_book_content(book_id: uuid.UUID, generation_id: uuid.UUID, re
             book = result.scalar_one_or_none()
             
             if not book:
-                generation_tasks[generation_id]["status"] = GenerationStatusEnum.FAILED
-                generation_tasks[generation_id]["error_message"] = "Book not found"
+                await update_generation(
+                    book_id,
+                    generation_id,
+                    status=GenerationStatusEnum.FAILED,
+                    error_message="Book not found",
+                )
                 return
             
-            # Simulate chapter-by-chapter generation
-            for chapter_num in range(1, total_chapters + 1):
-                # Check if cancelled
-                if generation_tasks[generation_id].get("cancelled"):
-                    generation_tasks[generation_id]["status"] = GenerationStatusEnum.CANCELLED
-                    return
+            # Chapters only depend on the book, so generate them concurrently,
+            # bounded so a long book does not flood the LLM provider
+            semaphore = asyncio.Semaphore(settings.GENERATION_CONCURRENCY)
+            completed = 0
+            
+            async def generate_chapter(chapter_num: int):
+                nonlocal completed
+                async with semaphore:
+                    # Check if cancelled (or superseded by a retry)
+                    if await should_stop(book_id, generation_id):
+                        return None
+                    
+                    # Simulate content generation (in production, call LLM here)
+                    chapter_content = f"Chapter {chapter_num} content generated for {book.title}..."
+                    
+                    # Simulate processing time
+                    await asyncio.sleep(1)
                 
                 # Update progress
-                progress = int((chapter_num / total_chapters) * 100)
-                generation_tasks[generation_id]["progress_percent"] = progress
-                generation_tasks[generation_id]["current_chapter"] = chapter_num
-                generation_tasks[generation_id]["total_chapters"] = total_chapters
-                
-                # Simulate content generation (in production, call LLM here)
-                chapter_content = f"Chapter {chapter_num} content generated for {book.title}..."
-                
-                # Add chapter to book content
-                if book.content:
-                    book.content += f"\n\n## Chapter {chapter_num}\n\n{chapter_content}"
-                else:
-                    book.content = f"## Chapter {chapter_num}\n\n{chapter_content}"
-                
-                # Simulate processing time
-                await asyncio.sleep(1)
+                completed += 1
+                await update_generation(
+                    book_id,
+                    generation_id,
+                    progress_percent=int((completed / total_chapters) * 100),
+                    current_chapter=completed,
+                )
+                return f"## Chapter {chapter_num}\n\n{chapter_content}"
             
-            # Mark as completed
-            generation_tasks[generation_id]["status"] = GenerationStatusEnum.COMPLETED
-            generation_tasks[generation_id]["progress_percent"] = 100
-            generation_tasks[generation_id]["completed_at"] = datetime.utcnow()
+            chapters = await asyncio.gather(
+                *(generate_chapter(chapter_num) for chapter_num in range(1, total_chapters + 1))
+            )
+            # A cancelled or superseded generation leaves the content alone
+            if None in chapters or await should_stop(book_id, generation_id):
+                return
+            
+            # Join chapter sections once, after any existing content
+            sections = [book.content] if book.content else []
+            sections.extend(chapters)
             
             # Update book
+            book.content = "\n\n".join(sections)
             await db.commit()
+            await invalidate_ebook(book.id)
+            await invalidate_user_stats(book.author_id)
+            
+            # Mark as completed
+            await update_generation(
+                book_id,
+                generation_id,
+                status=GenerationStatusEnum.COMPLETED,
+                progress_percent=100,
+                completed_at=datetime.utcnow(),
+            )
             
     except Exception as e:
-        generation_tasks[generation_id]["status"] = GenerationStatusEnum.FAILED
-        generation_tasks[generation_id]["error_message"] = str(e)
+        await update_generation(
+            book_id,
+            generation_id,
+            status=GenerationStatusEnum.FAILED,
+            error_message=str(e),
+        )
 
 
 @router.post("/start", response_model=GenerationStartResponse, status_code=status.HTTP_201_CREATED)
@@ -108,22 +153,11 @@ async def start_book_generation(
         status=BookStatus.DRAFT,
     )
     db.add(book)
-    await db.flush()
+    await db.commit()
+    await invalidate_user_stats(current_user.id)
     
     # Create generation task record
-    generation_id = uuid.uuid4()
-    generation_tasks[generation_id] = {
-        "book_id": book.id,
-        "status": GenerationStatusEnum.PENDING,
-        "progress_percent": 0,
-        "current_chapter": None,
-        "total_chapters": request.chapter_count,
-        "error_message": None,
-        "started_at": None,
-        "completed_at": None,
-        "cancelled": False,
-        "created_at": datetime.utcnow(),
-    }
+    generation_id = await start_generation(book.id, request.chapter_count)
     
     # Start background generation
     background_tasks.add_task(
@@ -141,13 +175,18 @@ async def start_book_generation(
     )
 
 
-@router.get("/progress/{book_id}", response_model=GenerationProgressResponse)
+@router.get("/progress/{book_id}", response_model=GenerationProgressResponse, deprecated=True)
 async def get_generation_progress(
     book_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get generation progress for a book."""
+    """Get generation progress for a book.
+    
+    Deprecated: use /generation/stream/{book_id} instead of polling.
+    """
+    logger.info(f"Deprecated generation progress poll for {book_id}; use /generation/stream")
+    
     # Verify book belongs to user
     result = await db.execute(
         select(Ebook).where(
@@ -164,12 +203,7 @@ async def get_generation_progress(
         )
     
     # Find generation task
-    generation = None
-    for gen_id, gen_data in generation_tasks.items():
-        if gen_data["book_id"] == book_id:
-            generation = gen_data
-            generation["id"] = gen_id
-            break
+    generation = await get_generation(book_id)
     
     if not generation:
         # No active generation, check if book has content
@@ -199,17 +233,49 @@ async def get_generation_progress(
             created_at=book.created_at
         )
     
-    return GenerationProgressResponse(
-        id=generation.get("id", uuid.UUID("00000000-0000-0000-0000-000000000000")),
-        book_id=generation["book_id"],
-        status=generation["status"],
-        progress_percent=generation["progress_percent"],
-        current_chapter=generation.get("current_chapter"),
-        total_chapters=generation.get("total_chapters"),
-        error_message=generation.get("error_message"),
-        started_at=generation.get("started_at"),
-        completed_at=generation.get("completed_at"),
-        created_at=generation.get("created_at", datetime.utcnow())
+    return GenerationProgressResponse.model_validate(generation)
+
+
+@router.get("/stream/{book_id}")
+async def stream_generation_progress(
+    book_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream generation progress for a book as server-sent events.
+    
+    Sends the current progress, then every change until the generation
+    finishes. The stream ends at once if the book has no generation.
+    """
+    # Verify book belongs to user
+    result = await db.execute(
+        select(Ebook.id).where(
+            Ebook.id == book_id,
+            Ebook.author_id == current_user.id
+        )
+    )
+    
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Book not found"
+        )
+    
+    # Return the connection to the pool; the stream can stay open for minutes
+    await db.close()
+    
+    async def events():
+        async for generation in generation_events(book_id):
+            if generation is None:
+                yield ": keepalive\n\n"
+            else:
+                data = GenerationProgressResponse.model_validate(generation).model_dump_json()
+                yield f"data: {data}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -236,15 +302,7 @@ async def cancel_book_generation(
         )
     
     # Find and cancel generation task
-    generation = None
-    for gen_id, gen_data in generation_tasks.items():
-        if gen_data["book_id"] == book_id:
-            generation = gen_data
-            generation["cancelled"] = True
-            generation["status"] = GenerationStatusEnum.CANCELLED
-            break
-    
-    if not generation:
+    if not await cancel_generation(book_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No active generation found for this book"
@@ -280,34 +338,15 @@ async def retry_book_generation(
             detail="Book not found"
         )
     
-    # Check if there's a failed generation
-    generation = None
-    for gen_id, gen_data in generation_tasks.items():
-        if gen_data["book_id"] == book_id:
-            if gen_data["status"] == GenerationStatusEnum.FAILED:
-                generation = gen_data
-                # Remove old generation
-                del generation_tasks[gen_id]
-                break
-    
-    # Create new generation task
-    generation_id = uuid.uuid4()
-    generation_tasks[generation_id] = {
-        "book_id": book_id,
-        "status": GenerationStatusEnum.PENDING,
-        "progress_percent": 0,
-        "current_chapter": None,
-        "total_chapters": request.chapter_count,
-        "error_message": None,
-        "started_at": None,
-        "completed_at": None,
-        "cancelled": False,
-        "created_at": datetime.utcnow(),
-    }
+    # Create new generation task; it replaces the earlier one, which stops
+    # at its next chapter if it is still running
+    generation_id = await start_generation(book_id, request.chapter_count)
     
     # Clear book content for regeneration
     book.content = ""
     await db.commit()
+    await invalidate_ebook(book.id)
+    await invalidate_user_stats(current_user.id)
     
     # Start background generation
     background_tasks.add_task(
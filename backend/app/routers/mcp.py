@@ -1,18 +1,20 @@
 """MCP Integration endpoints for Google Drive and PDF manipulation."""
+import asyncio
 import os
 import uuid
 import io
 import json
-from datetime import datetime
+import aiofiles
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.database import get_db
+from app.core.database import get_db, get_db_tx
 from app.core.security import get_current_user
 from app.core.config import settings
 from app.models.user import User
+from app.models.stored_file import StoredFile
 from app.schemas.schemas import (
     GoogleDriveUploadRequest,
     GoogleDriveUploadResponse,
@@ -32,25 +34,106 @@ from app.schemas.schemas import (
 
 router = APIRouter(prefix="/mcp", tags=["MCP Integration"])
 
-# In-memory storage for file metadata (use database in production)
-stored_files = {}
+# Uploads are copied to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
 
 # Storage directory
 STORAGE_DIR = settings.LOCAL_STORAGE_PATH if settings.LOCAL_STORAGE_PATH else "/tmp/vibepdf"
 os.makedirs(STORAGE_DIR, exist_ok=True)
 
+# Fan-out directories already created by this process
+_storage_dirs = set()
+
 
 def get_file_id() -> str:
     """Generate a unique file ID."""
     return str(uuid.uuid4())
 
 
+async def _storage_path(file_id: str, file_name: str) -> str:
+    """Path for a stored file, under STORAGE_DIR/<id[:2]>/<id[2:4]>/.
+
+    Files share at most 256 * 256 fan-out directories instead of getting
+    one each; a directory is only created the first time it is used.
+    """
+    directory = os.path.join(STORAGE_DIR, file_id[:2], file_id[2:4])
+    if directory not in _storage_dirs:
+        await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+        _storage_dirs.add(directory)
+    return os.path.join(directory, f"{file_id}_{os.path.basename(file_name)}")
+
+
+def _write_file(path: str, content: bytes) -> int:
+    """Write a file and return its size; run through asyncio.to_thread."""
+    with open(path, "wb") as f:
+        f.write(content)
+    return len(content)
+
+
+async def _exists(path: str) -> bool:
+    """os.path.exists off the event loop."""
+    return await asyncio.to_thread(os.path.exists, path)
+
+
+async def _remove(path: str) -> None:
+    """os.remove off the event loop."""
+    await asyncio.to_thread(os.remove, path)
+
+
+def _file_info(stored: StoredFile) -> GoogleDriveFileResponse:
+    """Build the file info response for a stored file."""
+    return GoogleDriveFileResponse(
+        file_id=stored.file_id,
+        file_name=stored.file_name,
+        mime_type=stored.mime_type,
+        size_bytes=stored.size_bytes,
+        web_view_link=f"/api/v1/mcp/files/{stored.file_id}",
+        created_time=stored.created_time,
+        modified_time=stored.modified_time
+    )
+
+
+async def _get_user_file(db: AsyncSession, file_id: str, current_user: User) -> StoredFile:
+    """Get a stored file, raising 404 if it is missing or 403 if it is not the user's."""
+    result = await db.execute(select(StoredFile).where(StoredFile.file_id == file_id))
+    stored = result.scalar_one_or_none()
+    
+    if not stored:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    
+    if stored.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return stored
+
+
+def _store_output(db: AsyncSession, output_id: str, output_name: str, output_path: str, size_bytes: int, current_user: User) -> StoredFile:
+    """Record a PDF produced by a manipulation endpoint."""
+    stored = StoredFile(
+        file_id=output_id,
+        user_id=current_user.id,
+        file_name=output_name,
+        mime_type="application/pdf",
+        size_bytes=size_bytes,
+        file_path=output_path,
+    )
+    db.add(stored)
+    return stored
+
+
 # ==================== Google Drive Integration ====================
 
 @router.post("/drive/upload", response_model=GoogleDriveUploadResponse)
 async def upload_to_drive(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_tx)
 ):
     """Upload a file to Google Drive (simulated)."""
     # In production, this would use Google Drive API
@@ -59,56 +142,47 @@ async def upload_to_drive(
     file_id = get_file_id()
     file_name = file.filename or f"file_{file_id}"
     
-    # Save file locally
-    file_path = os.path.join(STORAGE_DIR, file_id)
-    os.makedirs(file_path, exist_ok=True)
-    
-    content = await file.read()
-    actual_file_path = os.path.join(file_path, file_name)
-    with open(actual_file_path, "wb") as f:
-        f.write(content)
+    # Stream to disk so only one chunk of the upload is in memory at a time
+    actual_file_path = await _storage_path(file_id, file_name)
+    size_bytes = 0
+    async with aiofiles.open(actual_file_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await f.write(chunk)
+            size_bytes += len(chunk)
     
     # Store metadata
-    stored_files[file_id] = {
-        "file_id": file_id,
-        "file_name": file_name,
-        "mime_type": file.content_type or "application/pdf",
-        "size_bytes": len(content),
-        "web_view_link": f"/files/{file_id}",
-        "download_link": f"/files/{file_id}/download",
-        "created_time": datetime.utcnow(),
-        "modified_time": datetime.utcnow(),
-        "user_id": str(current_user.id),
-        "file_path": actual_file_path
-    }
+    stored = StoredFile(
+        file_id=file_id,
+        user_id=current_user.id,
+        file_name=file_name,
+        mime_type=file.content_type or "application/pdf",
+        size_bytes=size_bytes,
+        file_path=actual_file_path,
+    )
+    db.add(stored)
+    await db.flush()
     
     return GoogleDriveUploadResponse(
         file_id=file_id,
         file_name=file_name,
         web_view_link=f"/api/v1/mcp/files/{file_id}",
         download_link=f"/api/v1/mcp/files/{file_id}/download",
-        created_time=datetime.utcnow()
+        created_time=stored.created_time
     )
 
 
 @router.get("/drive/files", response_model=PDFListResponse)
 async def list_drive_files(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """List user's files from Google Drive (simulated)."""
-    user_files = [
-        GoogleDriveFileResponse(
-            file_id=data["file_id"],
-            file_name=data["file_name"],
-            mime_type=data["mime_type"],
-            size_bytes=data["size_bytes"],
-            web_view_link=data["web_view_link"],
-            created_time=data["created_time"],
-            modified_time=data["modified_time"]
-        )
-        for file_id, data in stored_files.items()
-        if data.get("user_id") == str(current_user.id)
-    ]
+    result = await db.execute(
+        select(StoredFile)
+        .where(StoredFile.user_id == current_user.id)
+        .order_by(StoredFile.created_time)
+    )
+    user_files = [_file_info(stored) for stored in result.scalars()]
     
     return PDFListResponse(
         items=user_files,
@@ -119,56 +193,26 @@ async def list_drive_files(
 @router.get("/drive/files/{file_id}", response_model=GoogleDriveFileResponse)
 async def get_drive_file(
     file_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get file info from Google Drive."""
-    if file_id not in stored_files:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found"
-        )
+    data = await _get_user_file(db, file_id, current_user)
     
-    data = stored_files[file_id]
-    
-    if data.get("user_id") != str(current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
-    return GoogleDriveFileResponse(
-        file_id=data["file_id"],
-        file_name=data["file_name"],
-        mime_type=data["mime_type"],
-        size_bytes=data["size_bytes"],
-        web_view_link=data["web_view_link"],
-        created_time=data["created_time"],
-        modified_time=data["modified_time"]
-    )
+    return _file_info(data)
 
 
 @router.get("/drive/files/{file_id}/download")
 async def download_drive_file(
     file_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Download a file from Google Drive."""
-    if file_id not in stored_files:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found"
-        )
+    data = await _get_user_file(db, file_id, current_user)
     
-    data = stored_files[file_id]
-    
-    if data.get("user_id") != str(current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
-    
-    file_path = data.get("file_path")
-    if not file_path or not os.path.exists(file_path):
+    file_path = data.file_path
+    if not file_path or not await _exists(file_path):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found on disk"
@@ -176,43 +220,27 @@ async def download_drive_file(
     
     return FileResponse(
         path=file_path,
-        filename=data["file_name"],
-        media_type=data["mime_type"]
+        filename=data.file_name,
+        media_type=data.mime_type
     )
 
 
 @router.delete("/drive/files/{file_id}", response_model=MessageResponse)
 async def delete_drive_file(
     file_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_tx)
 ):
     """Delete a file from Google Drive."""
-    if file_id not in stored_files:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found"
-        )
-    
-    data = stored_files[file_id]
-    
-    if data.get("user_id") != str(current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
+    data = await _get_user_file(db, file_id, current_user)
     
     # Delete file from disk
-    file_path = data.get("file_path")
-    if file_path and os.path.exists(file_path):
-        os.remove(file_path)
-        # Try to remove directory
-        try:
-            os.rmdir(os.path.dirname(file_path))
-        except:
-            pass
+    file_path = data.file_path
+    if file_path and await _exists(file_path):
+        await _remove(file_path)
     
     # Remove from storage
-    del stored_files[file_id]
+    await db.delete(data)
     
     return MessageResponse(message="File deleted successfully")
 
@@ -222,19 +250,25 @@ async def delete_drive_file(
 @router.post("/pdf/merge", response_model=PDFManipulationResponse)
 async def merge_pdfs(
     request: PDFMergeRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_tx)
 ):
     """Merge multiple PDF files into one."""
     # Validate all files exist and belong to user
+    result = await db.execute(
+        select(StoredFile).where(StoredFile.file_id.in_(request.file_ids))
+    )
+    found = {stored.file_id: stored for stored in result.scalars()}
+    
     file_contents = []
     for file_id in request.file_ids:
-        if file_id not in stored_files:
+        data = found.get(file_id)
+        if data is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"File {file_id} not found"
             )
-        data = stored_files[file_id]
-        if data.get("user_id") != str(current_user.id):
+        if data.user_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Access denied to file {file_id}"
@@ -246,27 +280,16 @@ async def merge_pdfs(
     
     output_id = get_file_id()
     output_name = request.output_name or "merged.pdf"
-    output_path = os.path.join(STORAGE_DIR, output_id, output_name)
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    output_path = await _storage_path(output_id, output_name)
     
     # Create placeholder merged content
-    with open(output_path, "wb") as f:
-        # Write placeholder - in production, actual PDF merge
-        f.write(b"%PDF-1.4\n%Merged PDF placeholder\n")
+    # Write placeholder - in production, actual PDF merge
+    size_bytes = await asyncio.to_thread(
+        _write_file, output_path, b"%PDF-1.4\n%Merged PDF placeholder\n"
+    )
     
     # Store output file
-    stored_files[output_id] = {
-        "file_id": output_id,
-        "file_name": output_name,
-        "mime_type": "application/pdf",
-        "size_bytes": os.path.getsize(output_path),
-        "web_view_link": f"/api/v1/mcp/files/{output_id}",
-        "download_link": f"/api/v1/mcp/files/{output_id}/download",
-        "created_time": datetime.utcnow(),
-        "modified_time": datetime.utcnow(),
-        "user_id": str(current_user.id),
-        "file_path": output_path
-    }
+    _store_output(db, output_id, output_name, output_path, size_bytes, current_user)
     
     return PDFManipulationResponse(
         operation="merge",
@@ -281,46 +304,23 @@ async def merge_pdfs(
 @router.post("/pdf/split", response_model=PDFManipulationResponse)
 async def split_pdf(
     request: PDFSplitRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_tx)
 ):
     """Split a PDF file."""
     # Validate file exists
-    if request.file_id not in stored_files:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found"
-        )
-    
-    data = stored_files[request.file_id]
-    if data.get("user_id") != str(current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
+    data = await _get_user_file(db, request.file_id, current_user)
     
     # In production, use PyPDF2 to split PDF
     # For simulation
     
     output_id = get_file_id()
-    output_name = f"split_{data['file_name']}"
-    output_path = os.path.join(STORAGE_DIR, output_id, output_name)
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    with open(output_path, "wb") as f:
-        f.write(b"%PDF-1.4\n%Split PDF placeholder\n")
-    
-    stored_files[output_id] = {
-        "file_id": output_id,
-        "file_name": output_name,
-        "mime_type": "application/pdf",
-        "size_bytes": os.path.getsize(output_path),
-        "web_view_link": f"/api/v1/mcp/files/{output_id}",
-        "download_link": f"/api/v1/mcp/files/{output_id}/download",
-        "created_time": datetime.utcnow(),
-        "modified_time": datetime.utcnow(),
-        "user_id": str(current_user.id),
-        "file_path": output_path
-    }
+    output_name = f"split_{data.file_name}"
+    output_path = await _storage_path(output_id, output_name)
+    
+    size_bytes = await asyncio.to_thread(_write_file, output_path, b"%PDF-1.4\n%Split PDF placeholder\n")
+    
+    _store_output(db, output_id, output_name, output_path, size_bytes, current_user)
     
     return PDFManipulationResponse(
         operation="split",
@@ -335,45 +335,22 @@ async def split_pdf(
 @router.post("/pdf/extract", response_model=PDFManipulationResponse)
 async def extract_pdf_pages(
     request: PDFExtractRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_tx)
 ):
     """Extract specific pages from a PDF."""
     # Validate file
-    if request.file_id not in stored_files:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found"
-        )
-    
-    data = stored_files[request.file_id]
-    if data.get("user_id") != str(current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
+    data = await _get_user_file(db, request.file_id, current_user)
     
     # In production, extract pages
     
     output_id = get_file_id()
-    output_name = request.output_name or f"extracted_pages_{data['file_name']}"
-    output_path = os.path.join(STORAGE_DIR, output_id, output_name)
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    with open(output_path, "wb") as f:
-        f.write(b"%PDF-1.4\n%Extracted PDF placeholder\n")
-    
-    stored_files[output_id] = {
-        "file_id": output_id,
-        "file_name": output_name,
-        "mime_type": "application/pdf",
-        "size_bytes": os.path.getsize(output_path),
-        "web_view_link": f"/api/v1/mcp/files/{output_id}",
-        "download_link": f"/api/v1/mcp/files/{output_id}/download",
-        "created_time": datetime.utcnow(),
-        "modified_time": datetime.utcnow(),
-        "user_id": str(current_user.id),
-        "file_path": output_path
-    }
+    output_name = request.output_name or f"extracted_pages_{data.file_name}"
+    output_path = await _storage_path(output_id, output_name)
+    
+    size_bytes = await asyncio.to_thread(_write_file, output_path, b"%PDF-1.4\n%Extracted PDF placeholder\n")
+    
+    _store_output(db, output_id, output_name, output_path, size_bytes, current_user)
     
     return PDFManipulationResponse(
         operation="extract",
@@ -388,45 +365,22 @@ async def extract_pdf_pages(
 @router.post("/pdf/compress", response_model=PDFManipulationResponse)
 async def compress_pdf(
     request: PDFCompressRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_tx)
 ):
     """Compress a PDF file."""
     # Validate file
-    if request.file_id not in stored_files:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found"
-        )
-    
-    data = stored_files[request.file_id]
-    if data.get("user_id") != str(current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
+    data = await _get_user_file(db, request.file_id, current_user)
     
     # In production, compress PDF
     
     output_id = get_file_id()
-    output_name = f"compressed_{data['file_name']}"
-    output_path = os.path.join(STORAGE_DIR, output_id, output_name)
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    with open(output_path, "wb") as f:
-        f.write(b"%PDF-1.4\n%Compressed PDF placeholder\n")
-    
-    stored_files[output_id] = {
-        "file_id": output_id,
-        "file_name": output_name,
-        "mime_type": "application/pdf",
-        "size_bytes": os.path.getsize(output_path),
-        "web_view_link": f"/api/v1/mcp/files/{output_id}",
-        "download_link": f"/api/v1/mcp/files/{output_id}/download",
-        "created_time": datetime.utcnow(),
-        "modified_time": datetime.utcnow(),
-        "user_id": str(current_user.id),
-        "file_path": output_path
-    }
+    output_name = f"compressed_{data.file_name}"
+    output_path = await _storage_path(output_id, output_name)
+    
+    size_bytes = await asyncio.to_thread(_write_file, output_path, b"%PDF-1.4\n%Compressed PDF placeholder\n")
+    
+    _store_output(db, output_id, output_name, output_path, size_bytes, current_user)
     
     return PDFManipulationResponse(
         operation="compress",
@@ -441,45 +395,22 @@ async def compress_pdf(
 @router.post("/pdf/watermark", response_model=PDFManipulationResponse)
 async def add_watermark(
     request: PDFWatermarkRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db_tx)
 ):
     """Add watermark to a PDF."""
     # Validate file
-    if request.file_id not in stored_files:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found"
-        )
-    
-    data = stored_files[request.file_id]
-    if data.get("user_id") != str(current_user.id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
+    data = await _get_user_file(db, request.file_id, current_user)
     
     # In production, add watermark
     
     output_id = get_file_id()
-    output_name = f"watermarked_{data['file_name']}"
-    output_path = os.path.join(STORAGE_DIR, output_id, output_name)
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    with open(output_path, "wb") as f:
-        f.write(b"%PDF-1.4\n%Watermarked PDF placeholder\n")
-    
-    stored_files[output_id] = {
-        "file_id": output_id,
-        "file_name": output_name,
-        "mime_type": "application/pdf",
-        "size_bytes": os.path.getsize(output_path),
-        "web_view_link": f"/api/v1/mcp/files/{output_id}",
-        "download_link": f"/api/v1/mcp/files/{output_id}/download",
-        "created_time": datetime.utcnow(),
-        "modified_time": datetime.utcnow(),
-        "user_id": str(current_user.id),
-        "file_path": output_path
-    }
+    output_name = f"watermarked_{data.file_name}"
+    output_path = await _storage_path(output_id, output_name)
+    
+    size_bytes = await asyncio.to_thread(_write_file, output_path, b"%PDF-1.4\n%Watermarked PDF placeholder\n")
+    
+    _store_output(db, output_id, output_name, output_path, size_bytes, current_user)
     
     return PDFManipulationResponse(
         operation="watermark",
@@ -496,16 +427,18 @@ async def add_watermark(
 @router.get("/files/{file_id}", response_model=GoogleDriveFileResponse)
 async def get_file_info(
     file_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get file info (alias for drive/files/{file_id})."""
-    return await get_drive_file(file_id, current_user)
+    return await get_drive_file(file_id, current_user, db)
 
 
 @router.get("/files/{file_id}/download")
 async def download_file(
     file_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Download file (alias for drive/files/{file_id}/download)."""
-    return await download_drive_file(file_id, current_user)
+    return await download_drive_file(file_id, current_user, db)
@@ -1,12 +1,14 @@
 """User profile API endpoints."""
+import asyncio
 import uuid
 from datetime import datetime, timedelta
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_
-from app.core.database import get_db
-from app.core.security import get_current_user
+from sqlalchemy import select, or_, and_, func, cast, null, literal_column, union_all, Float
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.security import get_current_user, invalidate_cached_user
+from app.core.user_stats_cache import cache_stats, get_cached_stats
 from app.models.user import User, UserProfileVisibility, Ebook, ReadingProgress, Chapter, Review
 from app.schemas.schemas import (
     ProfileResponse,
@@ -54,19 +56,24 @@ async def update_profile(
     db: AsyncSession = Depends(get_db)
 ):
     """Update current user's profile."""
-    # Check for username uniqueness
+    # Check username and email uniqueness in one query
+    conditions = []
     if profile_data.username and profile_data.username != current_user.username:
-        result = await db.execute(select(User).where(User.username == profile_data.username))
-        if result.scalar_one_or_none():
+        conditions.append(User.username == profile_data.username)
+    if profile_data.email and profile_data.email != current_user.email:
+        conditions.append(User.email == profile_data.email)
+    
+    if conditions:
+        result = await db.execute(
+            select(User.username, User.email).where(or_(*conditions)).limit(2)
+        )
+        taken = result.all()
+        if any(row.username == profile_data.username for row in taken):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already taken"
             )
-    
-    # Check for email uniqueness
-    if profile_data.email and profile_data.email != current_user.email:
-        result = await db.execute(select(User).where(User.email == profile_data.email))
-        if result.scalar_one_or_none():
+        if taken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -78,6 +85,7 @@ async def update_profile(
         setattr(current_user, field, value)
     
     await db.commit()
+    await invalidate_cached_user(current_user.id)
     await db.refresh(current_user)
     
     return ProfileResponse(
@@ -145,157 +153,153 @@ async def update_reading_preferences(
     return user_preferences[user_id]
 
 
+async def _fetch_rows(stmt) -> list:
+    """Run a query on its own session, so several can run concurrently."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(stmt)
+        return result.all()
+
+
+def _activity_description(row) -> str:
+    """Describe an activity row from get_user_activity."""
+    if row.activity_type == "reading":
+        return f"Read {row.book_title} - {row.detail}% complete"
+    if row.activity_type == "review":
+        return f"Reviewed {row.book_title} - {int(row.detail)}/5 stars"
+    return f"Created book: {row.book_title}"
+
+
 @router.get("/activity", response_model=ActivityListResponse)
 async def get_user_activity(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """Get user's reading and writing activity."""
-    activities = []
-    
-    # Get reading progress activities
-    result = await db.execute(
-        select(ReadingProgress)
-        .where(ReadingProgress.user_id == current_user.id)
-        .order_by(ReadingProgress.last_read_at.desc())
-        .limit(limit)
-    )
-    progress_items = result.scalars().all()
-    
-    # Get book info for each progress item
-    for progress in progress_items:
-        # Get book title
-        book_result = await db.execute(
-            select(Ebook).where(Ebook.id == progress.ebook_id)
+    # All three activity sources share one row shape so the database can
+    # sort and page them together; detail is the progress percent or rating
+    activity = union_all(
+        select(
+            ReadingProgress.id,
+            literal_column("'reading'").label("activity_type"),
+            ReadingProgress.ebook_id.label("book_id"),
+            Ebook.title.label("book_title"),
+            ReadingProgress.chapter_id,
+            Chapter.title.label("chapter_title"),
+            cast(ReadingProgress.progress_percent, Float).label("detail"),
+            ReadingProgress.last_read_at.label("created_at"),
         )
-        book = book_result.scalar_one_or_none()
-        
-        chapter_title = None
-        if progress.chapter_id:
-            chapter_result = await db.execute(
-                select(Chapter).where(Chapter.id == progress.chapter_id)
-            )
-            chapter = chapter_result.scalar_one_or_none()
-            if chapter:
-                chapter_title = chapter.title
-        
-        if book:
-            activities.append(ActivityItem(
-                id=progress.id,
-                activity_type="reading",
-                book_id=book.id,
-                book_title=book.title,
-                chapter_id=progress.chapter_id,
-                chapter_title=chapter_title,
-                description=f"Read {book.title} - {progress.progress_percent}% complete",
-                created_at=progress.last_read_at
-            ))
-    
-    # Get review activities
-    result = await db.execute(
-        select(Review)
-        .where(Review.user_id == current_user.id)
-        .order_by(Review.created_at.desc())
-        .limit(limit)
-    )
-    review_items = result.scalars().all()
-    
-    for review in review_items:
-        # Get book title
-        book_result = await db.execute(
-            select(Ebook).where(Ebook.id == review.ebook_id)
+        .join(Ebook, Ebook.id == ReadingProgress.ebook_id)
+        .outerjoin(Chapter, Chapter.id == ReadingProgress.chapter_id)
+        .where(ReadingProgress.user_id == current_user.id),
+        select(
+            Review.id,
+            literal_column("'review'"),
+            Review.ebook_id,
+            Ebook.title,
+            null(),
+            null(),
+            cast(Review.rating, Float),
+            Review.created_at,
+        )
+        .join(Ebook, Ebook.id == Review.ebook_id)
+        .where(Review.user_id == current_user.id),
+        select(
+            Ebook.id,
+            literal_column("'created'"),
+            Ebook.id,
+            Ebook.title,
+            null(),
+            null(),
+            null(),
+            Ebook.created_at,
         )
-        book = book_result.scalar_one_or_none()
-        
-        if book:
-            activities.append(ActivityItem(
-                id=review.id,
-                activity_type="review",
-                book_id=book.id,
-                book_title=book.title,
-                chapter_id=None,
-                chapter_title=None,
-                description=f"Reviewed {book.title} - {review.rating}/5 stars",
-                created_at=review.created_at
-            ))
+        .where(Ebook.author_id == current_user.id),
+    ).subquery()
     
-    # Get book creation activities
-    result = await db.execute(
-        select(Ebook)
-        .where(Ebook.author_id == current_user.id)
-        .order_by(Ebook.created_at.desc())
-        .limit(limit)
+    # Fetch the page and the total concurrently
+    rows, total_rows = await asyncio.gather(
+        _fetch_rows(
+            select(activity)
+            .order_by(activity.c.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+        ),
+        _fetch_rows(select(func.count()).select_from(activity)),
     )
-    ebook_items = result.scalars().all()
-    
-    for ebook in ebook_items:
-        activities.append(ActivityItem(
-            id=ebook.id,
-            activity_type="created",
-            book_id=ebook.id,
-            book_title=ebook.title,
-            chapter_id=None,
-            chapter_title=None,
-            description=f"Created book: {ebook.title}",
-            created_at=ebook.created_at
-        ))
-    
-    # Sort all activities by date
-    activities.sort(key=lambda x: x.created_at, reverse=True)
     
-    # Apply pagination
-    total = len(activities)
-    paginated_activities = activities[skip:skip + limit]
+    activities = [
+        ActivityItem(
+            id=row.id,
+            activity_type=row.activity_type,
+            book_id=row.book_id,
+            book_title=row.book_title,
+            chapter_id=row.chapter_id,
+            chapter_title=row.chapter_title,
+            description=_activity_description(row),
+            created_at=row.created_at
+        )
+        for row in rows
+    ]
     
     return ActivityListResponse(
-        items=paginated_activities,
-        total=total,
+        items=activities,
+        total=total_rows[0][0],
         skip=skip,
         limit=limit
     )
 
 
-@router.get("/stats")
-async def get_user_stats(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get user statistics."""
-    # Count books
-    result = await db.execute(
-        select(Ebook).where(Ebook.author_id == current_user.id)
-    )
-    books = result.scalars().all()
-    total_books = len(books)
-    published_books = sum(1 for b in books if b.status.value == "published")
-    draft_books = sum(1 for b in books if b.status.value == "draft")
-    
-    # Count reviews given
-    result = await db.execute(
-        select(Review).where(Review.user_id == current_user.id)
-    )
-    reviews_given = len(result.scalars().all())
-    
-    # Count reading progress entries
-    result = await db.execute(
-        select(ReadingProgress).where(ReadingProgress.user_id == current_user.id)
+async def _count_user_stats(user_id) -> dict:
+    """Count a user's books, words, reviews and reading entries."""
+    # Book counts and words written per status, review count and reading
+    # entry count, counted in the database and fetched concurrently. Words
+    # are runs of non-whitespace, as str.split() counts them
+    status_rows, review_rows, reading_rows = await asyncio.gather(
+        _fetch_rows(
+            select(
+                Ebook.status,
+                func.count(),
+                func.coalesce(func.sum(func.regexp_count(Ebook.content, r"\S+")), 0),
+            )
+            .where(Ebook.author_id == user_id)
+            .group_by(Ebook.status)
+        ),
+        _fetch_rows(
+            select(func.count()).select_from(Review).where(Review.user_id == user_id)
+        ),
+        _fetch_rows(
+            select(func.count()).select_from(ReadingProgress).where(ReadingProgress.user_id == user_id)
+        ),
     )
-    reading_entries = len(result.scalars().all())
     
-    # Total words written
-    total_words = sum(len((b.content or "").split()) for b in books)
+    books_by_status = {book_status: count for book_status, count, _ in status_rows}
     
     return {
         "books": {
-            "total": total_books,
-            "published": published_books,
-            "draft": draft_books
+            "total": sum(books_by_status.values()),
+            "published": books_by_status.get("published", 0),
+            "draft": books_by_status.get("draft", 0)
         },
-        "reviews_given": reviews_given,
-        "reading_entries": reading_entries,
-        "total_words_written": total_words,
+        "reviews_given": review_rows[0][0],
+        "reading_entries": reading_rows[0][0],
+        "total_words_written": sum(int(words) for _, _, words in status_rows)
+    }
+
+
+@router.get("/stats")
+async def get_user_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Get user statistics."""
+    # Counters are cached briefly and dropped when the user writes
+    stats = await get_cached_stats(current_user.id)
+    if stats is None:
+        stats = await _count_user_stats(current_user.id)
+        await cache_stats(current_user.id, stats)
+    
+    return {
+        **stats,
         "member_since": current_user.created_at,
         "last_active": current_user.last_login or current_user.updated_at
     }
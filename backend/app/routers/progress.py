@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
 from app.core.database import get_db
 from app.core.security import get_current_user
+from app.core.user_stats_cache import invalidate_user_stats
 from app.models.user import User, Ebook, ReadingProgress, Bookmark, Highlight, Note, Chapter, BookStatus
 from app.schemas.schemas import (
     ReadingProgressCreate,
@@ -105,6 +106,7 @@ async def create_or_update_reading_progress(
     
     await db.commit()
     await db.refresh(progress)
+    await invalidate_user_stats(current_user.id)
     
     return ReadingProgressResponse.model_validate(progress)
 
@@ -134,6 +136,7 @@ async def delete_reading_progress(
     
     await db.delete(progress)
     await db.commit()
+    await invalidate_user_stats(current_user.id)
 
 
 # ==================== Bookmarks ====================
@@ -6,7 +6,9 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func
 from app.core.database import get_db
+from app.core.ebook_cache import invalidate_ebook
 from app.core.security import get_current_user
+from app.core.user_stats_cache import invalidate_user_stats
 from app.models.user import User, Ebook, Review, ReviewReaction, BookStatus
 from app.schemas.schemas import (
     ReviewCreate,
@@ -261,6 +263,7 @@ async def create_review(
     
     await db.commit()
     await db.refresh(review)
+    await invalidate_user_stats(current_user.id)
     
     return ReviewResponse(
         id=review.id,
@@ -371,6 +374,7 @@ async def delete_review(
         await db.delete(review)
     
     await db.commit()
+    await invalidate_user_stats(current_user.id)
 
 
 # ==================== Review Reactions ====================
@@ -635,3 +639,4 @@ async def update_ebook_rating(ebook: Ebook, db: AsyncSession):
         ebook.rating_count = 0
     
     await db.commit()
+    await invalidate_ebook(ebook.id)
@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.security import get_current_user, invalidate_cached_user
 from app.core.config import settings
 from app.models.user import User, UserProfileVisibility
 from app.schemas.schemas import (
@@ -56,6 +56,7 @@ async def update_my_profile(
         setattr(current_user, field, value)
     
     await db.commit()
+    await invalidate_cached_user(current_user.id)
     await db.refresh(current_user)
     
     return current_user
@@ -99,6 +100,7 @@ async def upload_avatar(
     current_user.avatar_url = avatar_url
     
     await db.commit()
+    await invalidate_cached_user(current_user.id)
     await db.refresh(current_user)
     
     return current_user
@@ -122,6 +124,7 @@ async def delete_avatar(
         
         current_user.avatar_url = None
         await db.commit()
+        await invalidate_cached_user(current_user.id)
         await db.refresh(current_user)
     
     return current_user
@@ -133,7 +136,7 @@ async def get_visibility_settings(
 ):
     """Get profile visibility settings."""
     return {
-        "profile_visibility": current_user.profile_visibility.value
+        "profile_visibility": current_user.profile_visibility
     }
 
 
@@ -146,6 +149,7 @@ async def update_visibility_settings(
     """Update profile visibility settings."""
     current_user.profile_visibility = visibility
     await db.commit()
+    await invalidate_cached_user(current_user.id)
     
     return MessageResponse(message="Visibility settings updated")
 
@@ -144,6 +144,24 @@ class ChapterResponse(BaseModel):
     updated_at: datetime
 
 
+class ChapterSummary(BaseModel):
+    """Schema for a chapter in an ebook's chapter list (no content)."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: UUID
+    chapter_number: int
+    title: str
+    version: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class ChapterSummaryListResponse(BaseModel):
+    """Schema for an ebook's chapter list."""
+    items: List[ChapterSummary]
+    total: int
+
+
 class EbookBase(BaseModel):
     """Base ebook schema."""
     title: str
@@ -169,8 +187,8 @@ class EbookUpdate(BaseModel):
     status: Optional[BookStatusEnum] = None
 
 
-class EbookResponse(BaseModel):
-    """Schema for ebook response."""
+class EbookListItem(BaseModel):
+    """Schema for ebook list items (no content)."""
     model_config = ConfigDict(from_attributes=True)
     
     id: UUID
@@ -179,7 +197,6 @@ class EbookResponse(BaseModel):
     description: Optional[str]
     cover_image_url: Optional[str]
     status: BookStatusEnum
-    content: Optional[str]
     genre: Optional[str]
     tags: List[str]
     version: int
@@ -193,14 +210,33 @@ class EbookResponse(BaseModel):
     author: Optional[UserPublicResponse] = None
 
 
+class EbookResponse(EbookListItem):
+    """Schema for ebook response."""
+    content: Optional[str]
+
+
 class EbookListResponse(BaseModel):
     """Schema for ebook list response."""
-    items: List[EbookResponse]
+    items: List[EbookListItem]
     total: int
     skip: int
     limit: int
 
 
+class EbookVersionResponse(BaseModel):
+    """Schema for one version of an ebook's content."""
+    version: int
+    content: Optional[str]
+    is_current: bool = False
+    updated_at: Optional[str] = None
+
+
+class EbookVersionHistoryResponse(BaseModel):
+    """Schema for an ebook's version history."""
+    current_version: int
+    previous_versions: List[EbookVersionResponse]
+
+
 # Progress Schemas
 class ReadingProgressBase(BaseModel):
     """Base reading progress schema."""
@@ -555,6 +591,11 @@ class ChapterCreateInBook(BaseModel):
     chapter_number: int
 
 
+class ChapterBulkCreateInBook(BaseModel):
+    """Schema for importing several chapters into a book at once."""
+    chapters: List[ChapterCreateInBook] = Field(..., min_length=1, max_length=1000)
+
+
 # Profile Schemas
 class ProfileResponse(BaseModel):
     """Schema for profile response."""
@@ -5,7 +5,7 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.models.user import User, Ebook, Chapter, BookStatus
 from app.core.config import settings
@@ -261,7 +261,6 @@ class BookService:
         book.updated_at = datetime.utcnow()
         
         await self.db.commit()
-        await self.db.refresh(chapter)
         
         logger.info(f"Created chapter: {chapter.id} for book {book_id}")
         return chapter
@@ -279,7 +278,9 @@ class BookService:
             Chapter instance or None
         """
         result = await self.db.execute(
-            select(Chapter).where(Chapter.id == chapter_id)
+            select(Chapter)
+            .options(joinedload(Chapter.body))
+            .where(Chapter.id == chapter_id)
         )
         return result.scalar_one_or_none()
     
@@ -297,6 +298,7 @@ class BookService:
         """
         result = await self.db.execute(
             select(Chapter)
+            .options(selectinload(Chapter.body))
             .where(Chapter.ebook_id == book_id)
             .order_by(Chapter.chapter_number)
         )
@@ -328,7 +330,6 @@ class BookService:
         chapter.updated_at = datetime.utcnow()
         
         await self.db.commit()
-        await self.db.refresh(chapter)
         
         logger.info(f"Updated chapter: {chapter.id}")
         return chapter
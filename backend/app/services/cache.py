@@ -18,7 +18,7 @@ from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.models import Book, BookStatus, User
+from app.models import Ebook, BookStatus, User
 
 logger = logging.getLogger(__name__)
 
@@ -248,7 +248,7 @@ class CacheService:
     async def warm_book_cache(self, db: AsyncSession, book_id: uuid.UUID) -> None:
         """Warm cache for a book."""
         result = await db.execute(
-            select(Book).where(Book.id == book_id)
+            select(Ebook).where(Ebook.id == book_id)
         )
         book = result.scalar_one_or_none()
 
@@ -259,7 +259,7 @@ class CacheService:
                     "id": str(book.id),
                     "title": book.title,
                     "topic": book.topic,
-                    "status": book.status.value,
+                    "status": book.status,
                     "progress_percentage": book.progress_percentage,
                 },
                 ttl=CacheTTL.MEDIUM,
@@ -269,7 +269,7 @@ class CacheService:
         self,
         db: AsyncSession,
         user_id: uuid.UUID,
-        recommendations: list[Book],
+        recommendations: list[Ebook],
     ) -> None:
         """Warm cache for user recommendations."""
         await self.set(
@@ -279,7 +279,7 @@ class CacheService:
                     "id": str(book.id),
                     "title": book.title,
                     "topic": book.topic,
-                    "status": book.status.value,
+                    "status": book.status,
                 }
                 for book in recommendations
             ],
@@ -294,15 +294,15 @@ class CacheService:
         """Warm cache for dashboard statistics."""
         # Get book counts by status
         result = await db.execute(
-            select(Book.status, func.count(Book.id))
-            .where(Book.user_id == user_id)
-            .group_by(Book.status)
+            select(Ebook.status, func.count(Ebook.id))
+            .where(Ebook.user_id == user_id)
+            .group_by(Ebook.status)
         )
 
-        stats = {row[0].value: row[1] for row in result.all()}
+        stats = {row[0]: row[1] for row in result.all()}
 
         # Get total books
-        total_query = select(func.count(Book.id)).where(Book.user_id == user_id)
+        total_query = select(func.count(Ebook.id)).where(Ebook.user_id == user_id)
         total_result = await db.execute(total_query)
         stats["total"] = total_result.scalar()
 
@@ -314,7 +314,7 @@ class CacheService:
 
     async def warm_popular_books(
         self,
-        books: list[Book],
+        books: list[Ebook],
         category: Optional[str] = None,
     ) -> None:
         """Warm cache for popular books."""
@@ -326,7 +326,7 @@ class CacheService:
                     "id": str(book.id),
                     "title": book.title,
                     "topic": book.topic,
-                    "status": book.status.value,
+                    "status": book.status,
                 }
                 for book in books
             ],
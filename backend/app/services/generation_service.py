@@ -304,7 +304,7 @@ class GenerationService:
         }
         
         for task in tasks:
-            stats[task.status.value] += 1
+            stats[task.status] += 1
         
         return stats
 
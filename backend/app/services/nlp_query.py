@@ -14,7 +14,7 @@ import numpy as np
 from sqlalchemy import and_, asc, desc, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Book, BookStatus, Chapter, User
+from app.models import Ebook, BookStatus, Chapter, User
 
 
 class QueryIntent(str, Enum):
@@ -51,7 +51,7 @@ class QueryUnderstanding:
 @dataclass
 class SearchResult:
     """Search result with relevance score."""
-    book: Book
+    book: Ebook
     relevance_score: float
     matched_fields: list[str]
 
@@ -170,16 +170,16 @@ class NLPQueryService:
 
         # Build base query
         if understanding.intent == QueryIntent.COUNT:
-            base_query = select(func.count(Book.id))
-            conditions = [Book.user_id == user_id]
+            base_query = select(func.count(Ebook.id))
+            conditions = [Ebook.user_id == user_id]
         else:
-            base_query = select(Book)
-            conditions = [Book.user_id == user_id]
+            base_query = select(Ebook)
+            conditions = [Ebook.user_id == user_id]
 
         # Add filters
         for field, value in understanding.filters.items():
-            if hasattr(Book, field):
-                column = getattr(Book, field)
+            if hasattr(Ebook, field):
+                column = getattr(Ebook, field)
                 if isinstance(value, list):
                     conditions.append(column.in_(value))
                 elif isinstance(value, str) and "%" in value:
@@ -196,8 +196,8 @@ class NLPQueryService:
             sort_field = understanding.sort.get("field", "created_at")
             sort_order = understanding.sort.get("order", "desc")
 
-            if hasattr(Book, sort_field):
-                sort_column = getattr(Book, sort_field)
+            if hasattr(Ebook, sort_field):
+                sort_column = getattr(Ebook, sort_field)
                 if sort_order == "asc":
                     base_query = base_query.order_by(asc(sort_column))
                 else:
@@ -238,15 +238,15 @@ class NLPQueryService:
 
         # Search in books
         book_conditions = [
-            Book.user_id == user_id,
-            Book.status == BookStatus.COMPLETED,
+            Ebook.user_id == user_id,
+            Ebook.status == BookStatus.COMPLETED,
             or_(
-                Book.title.ilike(f"%{term}%")
+                Ebook.title.ilike(f"%{term}%")
                 for term in search_terms
             ),
         ]
 
-        book_query = select(Book).where(and_(*book_conditions))
+        book_query = select(Ebook).where(and_(*book_conditions))
         result = await self.db.execute(book_query)
         books = result.scalars().all()
 
@@ -281,9 +281,9 @@ class NLPQueryService:
 
         # Get user's recent book titles
         result = await self.db.execute(
-            select(Book.title)
-            .where(Book.user_id == user_id)
-            .order_by(Book.created_at.desc())
+            select(Ebook.title)
+            .where(Ebook.user_id == user_id)
+            .order_by(Ebook.created_at.desc())
             .limit(5)
         )
         recent_titles = result.scalars().all()
@@ -423,13 +423,13 @@ class NLPQueryService:
         user_id: uuid.UUID,
     ) -> dict[str, Any]:
         """Execute a count query."""
-        query = select(func.count(Book.id)).where(Book.user_id == user_id)
+        query = select(func.count(Ebook.id)).where(Ebook.user_id == user_id)
 
         # Apply filters
         conditions = []
         for field, value in understanding.filters.items():
-            if hasattr(Book, field):
-                conditions.append(getattr(Book, field) == value)
+            if hasattr(Ebook, field):
+                conditions.append(getattr(Ebook, field) == value)
 
         if conditions:
             query = query.where(and_(*conditions))
@@ -445,23 +445,23 @@ class NLPQueryService:
         user_id: uuid.UUID,
     ) -> dict[str, Any]:
         """Execute a list query."""
-        query = select(Book).where(Book.user_id == user_id)
+        query = select(Ebook).where(Ebook.user_id == user_id)
 
         # Apply filters
         for field, value in understanding.filters.items():
-            if hasattr(Book, field):
+            if hasattr(Ebook, field):
                 if isinstance(value, list):
-                    query = query.where(getattr(Book, field).in_(value))
+                    query = query.where(getattr(Ebook, field).in_(value))
                 else:
-                    query = query.where(getattr(Book, field) == value)
+                    query = query.where(getattr(Ebook, field) == value)
 
         # Apply sorting
         if understanding.sort:
             sort_field = understanding.sort.get("field", "created_at")
             sort_order = understanding.sort.get("order", "desc")
 
-            if hasattr(Book, sort_field):
-                sort_column = getattr(Book, sort_field)
+            if hasattr(Ebook, sort_field):
+                sort_column = getattr(Ebook, sort_field)
                 if sort_order == "asc":
                     query = query.order_by(asc(sort_column))
                 else:
@@ -476,7 +476,7 @@ class NLPQueryService:
         books = result.scalars().all()
 
         # Get total count
-        count_query = select(func.count(Book.id)).where(Book.user_id == user_id)
+        count_query = select(func.count(Ebook.id)).where(Ebook.user_id == user_id)
         total_result = await self.db.execute(count_query)
         total = total_result.scalar()
 
@@ -505,14 +505,14 @@ class NLPQueryService:
             search_query = "%"
 
         query = (
-            select(Book)
+            select(Ebook)
             .where(
                 and_(
-                    Book.user_id == user_id,
-                    Book.status == BookStatus.COMPLETED,
+                    Ebook.user_id == user_id,
+                    Ebook.status == BookStatus.COMPLETED,
                     or_(
-                        Book.title.ilike(f"%{search_query}%"),
-                        Book.topic.ilike(f"%{search_query}%"),
+                        Ebook.title.ilike(f"%{search_query}%"),
+                        Ebook.topic.ilike(f"%{search_query}%"),
                     ),
                 )
             )
@@ -528,7 +528,7 @@ class NLPQueryService:
             "query": understanding,
         }
 
-    def _calculate_relevance(self, book: Book, search_terms: list[str]) -> float:
+    def _calculate_relevance(self, book: Ebook, search_terms: list[str]) -> float:
         """Calculate relevance score for a book."""
         score = 0.0
 
@@ -565,7 +565,7 @@ class NLPQueryService:
 
     def _get_matched_fields(
         self,
-        book: Book,
+        book: Ebook,
         search_terms: list[str],
     ) -> list[str]:
         """Get list of fields that matched the search terms."""
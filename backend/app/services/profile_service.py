@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 
+from app.core.security import invalidate_cached_user
 from app.models.user import User, UserProfileVisibility, Ebook, Review, ReadingProgress
 from app.models.oauth import OAuthAccount
 from app.models.user_session import UserSession
@@ -92,6 +93,7 @@ class ProfileService:
         user.updated_at = datetime.utcnow()
         
         await self.db.commit()
+        await invalidate_cached_user(user_id)
         await self.db.refresh(user)
         
         logger.info(f"Updated profile for user: {user_id}")
@@ -136,7 +138,7 @@ class ProfileService:
             "created_at": user.created_at.isoformat() if user.created_at else None,
             "ebook_count": ebook_count,
             "review_count": review_count,
-            "profile_visibility": user.profile_visibility.value,
+            "profile_visibility": user.profile_visibility,
         }
     
     async def _count_user_ebooks(
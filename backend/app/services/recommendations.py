@@ -15,7 +15,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import expression
 
 from app.core.config import settings
-from app.models import Book, BookStatus, InteractionType, User, UserInteraction
+from app.models import Ebook, BookStatus, InteractionType, User, UserInteraction
 
 
 class RecommendationEngine:
@@ -31,7 +31,7 @@ class RecommendationEngine:
         user_id: uuid.UUID,
         limit: int = 10,
         exclude_book_ids: Optional[list[uuid.UUID]] = None,
-    ) -> list[Book]:
+    ) -> list[Ebook]:
         """
         Get personalized recommendations for a user.
 
@@ -66,11 +66,11 @@ class RecommendationEngine:
         self,
         book_id: uuid.UUID,
         limit: int = 5,
-    ) -> list[Book]:
+    ) -> list[Ebook]:
         """Get books similar to the given book based on content and interactions."""
         # Get the source book
         result = await self.db.execute(
-            select(Book).where(Book.id == book_id)
+            select(Ebook).where(Ebook.id == book_id)
         )
         source_book = result.scalar_one_or_none()
 
@@ -99,7 +99,7 @@ class RecommendationEngine:
         limit: int = 10,
         category: Optional[str] = None,
         exclude_book_ids: Optional[list[uuid.UUID]] = None,
-    ) -> list[Book]:
+    ) -> list[Ebook]:
         """Get popular books based on interaction counts."""
         return await self._get_popular_books(limit, exclude_book_ids, category)
 
@@ -107,21 +107,21 @@ class RecommendationEngine:
         self,
         days: int = 7,
         limit: int = 10,
-    ) -> list[Book]:
+    ) -> list[Ebook]:
         """Get trending books based on recent interactions."""
         cutoff_date = datetime.utcnow() - timedelta(days=days)
 
         # Query books with most recent interactions
         query = (
-            select(Book)
-            .join(UserInteraction, UserInteraction.book_id == Book.id)
+            select(Ebook)
+            .join(UserInteraction, UserInteraction.book_id == Ebook.id)
             .where(
                 and_(
                     UserInteraction.created_at >= cutoff_date,
-                    Book.status == BookStatus.COMPLETED,
+                    Ebook.status == BookStatus.COMPLETED,
                 )
             )
-            .group_by(Book.id)
+            .group_by(Ebook.id)
             .order_by(func.count(UserInteraction.id).desc())
             .limit(limit)
         )
@@ -163,7 +163,7 @@ class RecommendationEngine:
         user_id: uuid.UUID,
         limit: int,
         exclude_book_ids: Optional[list[uuid.UUID]] = None,
-    ) -> list[tuple[Book, float]]:
+    ) -> list[tuple[Ebook, float]]:
         """
         Collaborative filtering using user-user similarity.
 
@@ -208,26 +208,26 @@ class RecommendationEngine:
 
         # Get books liked by similar users
         rec_query = (
-            select(Book, func.count(UserInteraction.id).label("score"))
-            .join(UserInteraction, UserInteraction.book_id == Book.id)
+            select(Ebook, func.count(UserInteraction.id).label("score"))
+            .join(UserInteraction, UserInteraction.book_id == Ebook.id)
             .where(
                 and_(
                     UserInteraction.user_id.in_(similar_user_ids),
                     UserInteraction.interaction_type.in_(
                         [InteractionType.LIKE, InteractionType.DOWNLOAD]
                     ),
-                    Book.status == BookStatus.COMPLETED,
-                    Book.user_id != user_id,
+                    Ebook.status == BookStatus.COMPLETED,
+                    Ebook.user_id != user_id,
                 )
             )
-            .group_by(Book.id)
+            .group_by(Ebook.id)
             .order_by(func.count(UserInteraction.id).desc())
             .limit(limit * 2)
         )
 
         # Exclude books if specified
         if exclude_book_ids:
-            rec_query = rec_query.where(Book.id.not_in(exclude_book_ids))
+            rec_query = rec_query.where(Ebook.id.not_in(exclude_book_ids))
 
         result = await self.db.execute(rec_query)
         return [(row[0], float(row[1])) for row in result.all()]
@@ -237,7 +237,7 @@ class RecommendationEngine:
         user_id: uuid.UUID,
         limit: int,
         exclude_book_ids: Optional[list[uuid.UUID]] = None,
-    ) -> list[tuple[Book, float]]:
+    ) -> list[tuple[Ebook, float]]:
         """
         Content-based filtering using book attributes.
 
@@ -245,12 +245,12 @@ class RecommendationEngine:
         """
         # Get user's interacted books
         query = (
-            select(Book)
-            .join(UserInteraction, UserInteraction.book_id == Book.id)
+            select(Ebook)
+            .join(UserInteraction, UserInteraction.book_id == Ebook.id)
             .where(
                 and_(
                     UserInteraction.user_id == user_id,
-                    Book.status == BookStatus.COMPLETED,
+                    Ebook.status == BookStatus.COMPLETED,
                 )
             )
             .limit(20)
@@ -272,23 +272,23 @@ class RecommendationEngine:
 
         # Score other books based on tag/category similarity
         category_score = case(
-            (Book.category.in_(user_categories), 3.0),
+            (Ebook.category.in_(user_categories), 3.0),
             else_=0.0
         )
         tag_score = case(
-            (Book.tags.overlap(list(user_tags)), 5.0),
+            (Ebook.tags.overlap(list(user_tags)), 5.0),
             else_=0.0
         )
 
         # Build query for candidate books
         book_ids = [b.id for b in user_books]
         candidate_query = (
-            select(Book, (category_score + tag_score).label("score"))
+            select(Ebook, (category_score + tag_score).label("score"))
             .where(
                 and_(
-                    Book.id.not_in(book_ids),
-                    Book.status == BookStatus.COMPLETED,
-                    Book.user_id != user_id,
+                    Ebook.id.not_in(book_ids),
+                    Ebook.status == BookStatus.COMPLETED,
+                    Ebook.user_id != user_id,
                 )
             )
             .order_by((category_score + tag_score).desc())
@@ -297,7 +297,7 @@ class RecommendationEngine:
 
         if exclude_book_ids:
             candidate_query = candidate_query.where(
-                Book.id.not_in(exclude_book_ids)
+                Ebook.id.not_in(exclude_book_ids)
             )
 
         result = await self.db.execute(candidate_query)
@@ -305,10 +305,10 @@ class RecommendationEngine:
 
     def _combine_recommendations(
         self,
-        collab_recs: list[tuple[Book, float]],
-        content_recs: list[tuple[Book, float]],
+        collab_recs: list[tuple[Ebook, float]],
+        content_recs: list[tuple[Ebook, float]],
         user_interactions: dict[uuid.UUID, float],
-    ) -> list[Book]:
+    ) -> list[Ebook]:
         """Combine collaborative and content-based recommendations."""
         # Use weighted scoring
         collab_weight = 0.6
@@ -335,8 +335,8 @@ class RecommendationEngine:
         return [book for book, _ in sorted_books]
 
     async def _find_content_similar_books(
-        self, source_book: Book, limit: int
-    ) -> list[tuple[Book, float]]:
+        self, source_book: Ebook, limit: int
+    ) -> list[tuple[Ebook, float]]:
         """Find books similar based on content attributes."""
         user_categories = {source_book.category} if source_book.category else set()
         user_tags = set(source_book.tags) if source_book.tags else set()
@@ -345,20 +345,20 @@ class RecommendationEngine:
             return []
 
         category_score = case(
-            (Book.category.in_(user_categories), 3.0),
+            (Ebook.category.in_(user_categories), 3.0),
             else_=0.0
         )
         tag_score = case(
-            (Book.tags.overlap(list(user_tags)), 5.0),
+            (Ebook.tags.overlap(list(user_tags)), 5.0),
             else_=0.0
         )
 
         query = (
-            select(Book, (category_score + tag_score).label("score"))
+            select(Ebook, (category_score + tag_score).label("score"))
             .where(
                 and_(
-                    Book.id != source_book.id,
-                    Book.status == BookStatus.COMPLETED,
+                    Ebook.id != source_book.id,
+                    Ebook.status == BookStatus.COMPLETED,
                 )
             )
             .order_by((category_score + tag_score).desc())
@@ -370,7 +370,7 @@ class RecommendationEngine:
 
     async def _find_collaborative_similar_books(
         self, book_id: uuid.UUID, limit: int
-    ) -> list[tuple[Book, float]]:
+    ) -> list[tuple[Ebook, float]]:
         """Find books similar based on user interaction patterns."""
         # Get users who liked this book
         query = select(UserInteraction.user_id).where(
@@ -387,17 +387,17 @@ class RecommendationEngine:
 
         # Find other books they liked
         rec_query = (
-            select(Book, func.count(UserInteraction.id).label("score"))
-            .join(UserInteraction, UserInteraction.book_id == Book.id)
+            select(Ebook, func.count(UserInteraction.id).label("score"))
+            .join(UserInteraction, UserInteraction.book_id == Ebook.id)
             .where(
                 and_(
                     UserInteraction.user_id.in_(users_who_liked),
                     UserInteraction.book_id != book_id,
                     UserInteraction.interaction_type == InteractionType.LIKE,
-                    Book.status == BookStatus.COMPLETED,
+                    Ebook.status == BookStatus.COMPLETED,
                 )
             )
-            .group_by(Book.id)
+            .group_by(Ebook.id)
             .orderInteraction.id).desc_by(func.count(User())
             .limit(limit)
         )
@@ -407,10 +407,10 @@ class RecommendationEngine:
 
     def _combine_similar_books(
         self,
-        content_similar: list[tuple[Book, float]],
-        collab_similar: list[tuple[Book, float]],
+        content_similar: list[tuple[Ebook, float]],
+        collab_similar: list[tuple[Ebook, float]],
         source_book_id: uuid.UUID,
-    ) -> list[Book]:
+    ) -> list[Ebook]:
         """Combine content and collaborative similar books."""
         scores = {}
 
@@ -432,22 +432,22 @@ class RecommendationEngine:
         limit: int,
         exclude_book_ids: Optional[list[uuid.UUID]] = None,
         category: Optional[str] = None,
-    ) -> list[Book]:
+    ) -> list[Ebook]:
         """Get popular books based on total interactions."""
         query = (
-            select(Book)
+            select(Ebook)
             .outerjoin(UserInteraction)
-            .where(Book.status == BookStatus.COMPLETED)
-            .group_by(Book.id)
+            .where(Ebook.status == BookStatus.COMPLETED)
+            .group_by(Ebook.id)
             .order_by(func.count(UserInteraction.id).desc())
             .limit(limit)
         )
 
         if category:
-            query = query.where(Book.category == category)
+            query = query.where(Ebook.category == category)
 
         if exclude_book_ids:
-            query = query.where(Book.id.not_in(exclude_book_ids))
+            query = query.where(Ebook.id.not_in(exclude_book_ids))
 
         result = await self.db.execute(query)
         return list(result.scalars().all())
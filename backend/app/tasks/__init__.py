@@ -6,6 +6,8 @@ from app.tasks.generation_tasks import (
     generate_summary,
     generate_outline,
     cleanup_expired_sessions,
+    flush_view_counts,
+    create_interaction_partitions,
     process_pending_generations,
 )
 
@@ -16,5 +18,7 @@ __all__ = [
     "generate_summary",
     "generate_outline",
     "cleanup_expired_sessions",
+    "flush_view_counts",
+    "create_interaction_partitions",
     "process_pending_generations",
 ]
@@ -27,6 +27,16 @@ celery_app.conf.update(
     task_track_started=True,
     task_acks_late=True,
     worker_prefetch_multiplier=1,
+    beat_schedule={
+        "flush-view-counts": {
+            "task": "flush_view_counts",
+            "schedule": 60.0,
+        },
+        "create-interaction-partitions": {
+            "task": "create_interaction_partitions",
+            "schedule": 86400.0,
+        },
+    },
 )
 
 # Database session for tasks
@@ -379,6 +389,133 @@ def cleanup_expired_sessions():
         session.close()
 
 
+async def _add_view_counts(views: Dict[Any, int]) -> None:
+    """Add view counts to ebooks.view_count in one transaction.
+    
+    DATABASE_URL names an async driver, so the update runs on its own
+    async engine; it has no pool because every flush runs in a new event
+    loop.
+    """
+    from sqlalchemy import update
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+    from app.models.user import Ebook
+    
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.begin() as conn:
+            for ebook_id, count in views.items():
+                await conn.execute(
+                    update(Ebook)
+                    .where(Ebook.id == ebook_id)
+                    .values(view_count=Ebook.view_count + count)
+                )
+    finally:
+        await engine.dispose()
+
+
+@celery_app.task(name="flush_view_counts")
+def flush_view_counts():
+    """Add the view counts buffered in Redis to ebooks.view_count."""
+    import asyncio
+    import uuid
+    import redis
+    from app.core.ebook_cache import detail_cache_key
+    from app.core.view_counts import VIEW_COUNT_KEY_PREFIX
+    
+    client = redis.Redis.from_url(settings.REDIS_URL)
+    try:
+        # GETDEL takes each counter atomically; views recorded afterwards start
+        # a new counter for the next flush
+        views = {}
+        for key in client.scan_iter(match=f"{VIEW_COUNT_KEY_PREFIX}*", count=500):
+            count = client.getdel(key)
+            if count:
+                views[key] = int(count)
+        
+        if not views:
+            return {"flushed": 0}
+        
+        ebook_views = {
+            uuid.UUID(key.decode()[len(VIEW_COUNT_KEY_PREFIX):]): count
+            for key, count in views.items()
+        }
+        try:
+            asyncio.run(_add_view_counts(ebook_views))
+        except Exception as e:
+            logger.error(f"View count flush failed: {e}")
+            # Put the taken counts back so the next flush retries them
+            with client.pipeline(transaction=False) as pipe:
+                for key, count in views.items():
+                    pipe.incrby(key, count)
+                pipe.execute()
+            raise
+        
+        # Cached detail responses still hold the old view_count, and their
+        # pending counters were just reset
+        client.delete(*(detail_cache_key(ebook_id) for ebook_id in ebook_views))
+        logger.info(f"Flushed views for {len(views)} ebooks")
+        return {"flushed": len(views)}
+    finally:
+        client.close()
+
+
+# Months of user_interactions partitions kept created ahead of the current one
+INTERACTION_PARTITIONS_AHEAD = 3
+
+
+async def _create_interaction_partitions(months: int) -> int:
+    """Create the monthly user_interactions partitions that do not exist yet.
+    
+    Covers the current month and the next ``months``; returns how many
+    partitions the range spans. Does nothing if the table does not exist.
+    """
+    from datetime import date
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+    
+    today = date.today()
+    bounds = []
+    year, month = today.year, today.month
+    for _ in range(months + 2):
+        bounds.append(date(year, month, 1))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.begin() as conn:
+            exists = await conn.scalar(text("SELECT to_regclass('user_interactions') IS NOT NULL"))
+            if not exists:
+                return 0
+            for start, end in zip(bounds, bounds[1:]):
+                await conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS user_interactions_{start:%Y_%m} "
+                    f"PARTITION OF user_interactions FOR VALUES FROM ('{start}') TO ('{end}')"
+                ))
+        return len(bounds) - 1
+    finally:
+        await engine.dispose()
+
+
+@celery_app.task(name="create_interaction_partitions")
+def create_interaction_partitions():
+    """Keep monthly user_interactions partitions created ahead of time.
+    
+    A month without its partition sends its rows to the default partition,
+    after which that month's partition can no longer be attached.
+    """
+    import asyncio
+    
+    try:
+        months = asyncio.run(_create_interaction_partitions(INTERACTION_PARTITIONS_AHEAD))
+    except Exception as e:
+        logger.error(f"Interaction partition creation failed: {e}")
+        raise
+    logger.info(f"Checked {months} user_interactions partitions")
+    return {"months": months}
+
+
 @celery_app.task(name="process_pending_generations")
 def process_pending_generations():
     """Process pending generation tasks."""
@@ -0,0 +1,151 @@
+"""
+Unit tests for refresh token rotation.
+"""
+
+import time
+import uuid
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from redis.exceptions import RedisError
+
+
+class FakePipeline:
+    """Pipeline that queues commands and runs them against a FakeRedis."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, *args, **kwargs):
+        self.commands.append(self.redis.set(*args, **kwargs))
+
+    def get(self, *args):
+        self.commands.append(self.redis.get(*args))
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+
+class FakeRedis:
+    """In-memory stand-in for the async Redis client."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value).encode()
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def _payload(user_id, issued_at=None):
+    """Decoded refresh token payload."""
+    now = time.time()
+    return {
+        "sub": str(user_id),
+        "jti": uuid.uuid4().hex,
+        "iat": now if issued_at is None else issued_at,
+        "exp": now + 3600,
+        "type": "refresh",
+    }
+
+
+class TestSpendRefreshToken:
+    """Test cases for spending refresh tokens in Redis."""
+
+    @pytest.fixture
+    def redis(self):
+        """Patch the security module onto an empty fake Redis."""
+        redis = FakeRedis()
+        with patch("app.core.security.get_redis", return_value=redis):
+            yield redis
+
+    async def test_replayed_token_rejected(self, redis):
+        """Test a refresh token can only be spent once."""
+        from app.core.security import spend_refresh_token
+
+        payload = _payload(uuid.uuid4())
+
+        assert await spend_refresh_token(payload) is True
+        assert await spend_refresh_token(payload) is False
+
+    async def test_token_issued_before_cutoff_rejected(self, redis):
+        """Test revoking a user's tokens rejects those issued earlier only."""
+        from app.core.security import revoke_user_refresh_tokens, spend_refresh_token
+
+        user_id = uuid.uuid4()
+        old_payload = _payload(user_id)
+
+        await revoke_user_refresh_tokens(user_id)
+        new_payload = _payload(user_id)
+
+        assert await spend_refresh_token(old_payload) is False
+        assert await spend_refresh_token(new_payload) is True
+
+
+class TestRefreshEndpoint:
+    """Test cases for the refresh endpoint."""
+
+    @pytest.fixture
+    def user(self):
+        """Active user the refreshed tokens are issued to."""
+        user = Mock()
+        user.id = uuid.uuid4()
+        user.is_active = True
+        return user
+
+    @pytest.fixture
+    def auth_router(self, user):
+        """Auth router module with token issuing and user loading patched."""
+        from app.routers import auth
+
+        with patch.object(auth, "load_user", AsyncMock(return_value=user)), \
+                patch.object(auth, "create_access_token", return_value="access"), \
+                patch.object(auth, "create_refresh_token", return_value="refresh"):
+            yield auth
+
+    async def test_legacy_token_accepted_through_table(self, auth_router, user):
+        """Test a token without a jti is checked and revoked in the table."""
+        stored_token = Mock()
+        stored_token.expires_at = datetime.utcnow() + timedelta(days=1)
+        stored_token.is_revoked = False
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = stored_token
+        db = AsyncMock()
+        db.add = Mock()
+        db.execute.return_value = result
+        payload = {"sub": str(user.id), "type": "refresh"}
+
+        with patch.object(auth_router, "decode_token", return_value=payload), \
+                patch.object(auth_router, "spend_refresh_token", AsyncMock()) as spend:
+            response = await auth_router.refresh_token(Mock(refresh_token="legacy"), db)
+
+        assert response.access_token == "access"
+        assert response.refresh_token == "refresh"
+        assert stored_token.is_revoked is True
+        spend.assert_not_called()
+        db.commit.assert_awaited_once()
+
+    async def test_redis_error_returns_503(self, auth_router, user):
+        """Test the endpoint fails closed with 503 when Redis is down."""
+        from fastapi import HTTPException
+
+        redis = MagicMock()
+        redis.pipeline.return_value.execute = AsyncMock(side_effect=RedisError("down"))
+        db = AsyncMock()
+
+        with patch.object(auth_router, "decode_token", return_value=_payload(user.id)), \
+                patch("app.core.security.get_redis", return_value=redis):
+            with pytest.raises(HTTPException) as exc_info:
+                await auth_router.refresh_token(Mock(refresh_token="token"), db)
+
+        assert exc_info.value.status_code == 503
+        db.commit.assert_not_called()
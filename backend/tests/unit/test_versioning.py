@@ -0,0 +1,60 @@
+"""
+Unit tests for ebook version deltas.
+"""
+
+import pytest
+
+
+class FakeVersion:
+    """Stand-in for an EbookVersion row."""
+
+    def __init__(self, version, content=None, delta=None):
+        self.version = version
+        self.content = content
+        self.delta = delta
+
+
+class TestVersionDeltas:
+    """Test cases for reverse line deltas."""
+
+    @pytest.fixture
+    def versioning(self):
+        """Import the versioning helpers."""
+        from app.core import versioning
+        return versioning
+
+    def test_delta_round_trip(self, versioning):
+        """Test a delta rebuilds the older text from the newer one."""
+        older = "# Title\n\nFirst paragraph.\nSecond paragraph.\n"
+        newer = "# New title\n\nFirst paragraph.\nSecond paragraph.\nThird.\n"
+
+        assert versioning.apply_delta(newer, versioning.make_delta(newer, older)) == older
+
+    def test_delta_without_trailing_newline(self, versioning):
+        """Test texts that do not end in a newline."""
+        older = "alpha\nbeta"
+        newer = "alpha\ngamma\nbeta"
+
+        assert versioning.apply_delta(newer, versioning.make_delta(newer, older)) == older
+
+    def test_delta_from_empty_text(self, versioning):
+        """Test rebuilding from and to empty content."""
+        assert versioning.apply_delta("", versioning.make_delta("", "text\n")) == "text\n"
+        assert versioning.apply_delta("text\n", versioning.make_delta("text\n", "")) == ""
+
+    def test_identical_texts_have_empty_delta(self, versioning):
+        """Test unchanged text produces no ops."""
+        assert versioning.make_delta("same\n", "same\n") == []
+
+    def test_rebuild_chain(self, versioning):
+        """Test rebuilding a chain of deltas down from a full row."""
+        v1, v2, v3 = "one\n", "one\ntwo\n", "one\ntwo\nthree\n"
+        rows = [
+            FakeVersion(3, content=v3),
+            FakeVersion(2, delta=versioning.make_delta(v3, v2)),
+            FakeVersion(1, delta=versioning.make_delta(v2, v1)),
+        ]
+
+        rebuilt = versioning._rebuild(rows)
+
+        assert [content for _, content in rebuilt] == [v3, v2, v1]
@@ -0,0 +1,74 @@
+"""
+Unit tests for the view count flush task.
+"""
+
+import uuid
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine, text
+
+
+class TestFlushViewCounts:
+    """Test cases for flushing buffered views to the database."""
+
+    @pytest.fixture
+    def database_url(self, tmp_path, monkeypatch):
+        """Point the task at a SQLite database holding one ebook."""
+        path = tmp_path / "views.db"
+        monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{path}")
+
+        from app.core.config import settings
+        from app.tasks import generation_tasks
+
+        ebook_id = uuid.uuid4()
+        with create_engine(f"sqlite:///{path}").begin() as conn:
+            conn.execute(text("CREATE TABLE ebooks (id CHAR(32) PRIMARY KEY, view_count INTEGER, updated_at TIMESTAMP)"))
+            conn.execute(
+                text("INSERT INTO ebooks (id, view_count) VALUES (:id, 5)"),
+                {"id": ebook_id.hex},
+            )
+        test_settings = settings.model_copy(update={"DATABASE_URL": f"sqlite+aiosqlite:///{path}"})
+        with patch.object(generation_tasks, "settings", test_settings):
+            yield path, ebook_id
+
+    @pytest.fixture
+    def redis_client(self):
+        """Redis client holding no pending views."""
+        client = MagicMock()
+        client.scan_iter.return_value = []
+        return client
+
+    def _view_count(self, path, ebook_id):
+        with create_engine(f"sqlite:///{path}").connect() as conn:
+            return conn.execute(
+                text("SELECT view_count FROM ebooks WHERE id = :id"),
+                {"id": ebook_id.hex},
+            ).scalar_one()
+
+    def test_flush_adds_pending_views(self, database_url, redis_client):
+        """Test pending views are added to view_count and the detail cache dropped."""
+        from app.tasks.generation_tasks import flush_view_counts
+
+        path, ebook_id = database_url
+        key = f"ebooks:views:{ebook_id}".encode()
+        redis_client.scan_iter.return_value = [key]
+        redis_client.getdel.return_value = b"3"
+
+        with patch("redis.Redis.from_url", return_value=redis_client):
+            assert flush_view_counts() == {"flushed": 1}
+
+        assert self._view_count(path, ebook_id) == 8
+        redis_client.getdel.assert_called_once_with(key)
+        redis_client.delete.assert_called_once_with(f"ebook:{ebook_id}")
+
+    def test_flush_without_views(self, database_url, redis_client):
+        """Test nothing is written when no views are pending."""
+        from app.tasks.generation_tasks import flush_view_counts
+
+        path, ebook_id = database_url
+
+        with patch("redis.Redis.from_url", return_value=redis_client):
+            assert flush_view_counts() == {"flushed": 0}
+
+        assert self._view_count(path, ebook_id) == 5
+        redis_client.delete.assert_not_called()